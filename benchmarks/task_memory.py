@@ -0,0 +1,79 @@
+""" Memory footprint of TaskMe tasks
+
+Decodes N tasks (1M by default) from JSON, the way they come out of a TaskMe data file,
+and reports the memory kept alive by the resulting Task objects, strings included.
+
+Usage:
+    PYTHONPATH=. python benchmarks/task_memory.py [task_count]
+"""
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from src.TaskList.Task import Task
+
+DEFAULT_TASK_COUNT = 1_000_000
+PRIORITIES = ["LOW", "MEDIUM", "HIGH"]
+PROGRESS_STATUSES = ["PENDING", "IN_PROGRESS", "COMPLETED"]
+
+
+# -----------------------------------------------------------------------------
+# generate_task_data
+# -----------------------------------------------------------------------------
+def generate_task_data(task_count: int) -> str:
+    """ Generates the JSON representation of task dictionaries
+
+    Args:
+        task_count (int): number of tasks to generate
+
+    Returns:
+        str: the JSON encoded task dictionaries
+    """
+    return json.dumps([
+        {
+            "assignee": f"Assignee {task_id % 50}",
+            "name": f"Task {task_id}",
+            "due_date": f"{task_id % 28 + 1:02d}/{task_id % 12 + 1:02d}/2024",
+            "priority": PRIORITIES[task_id % 3],
+            "description": "",
+            "progress_status": PROGRESS_STATUSES[task_id % 3],
+            "id": task_id
+        }
+        for task_id in range(1, task_count + 1)
+    ])
+
+
+# -----------------------------------------------------------------------------
+# main
+# -----------------------------------------------------------------------------
+def main():
+    task_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_TASK_COUNT
+    task_data = generate_task_data(task_count)
+
+    start = time.perf_counter()
+    tasks = [Task.from_dict(task_dict) for task_dict in json.loads(task_data)]
+    elapsed = time.perf_counter() - start
+    del tasks
+    gc.collect()
+
+    # Measured on a second run, tracemalloc slows allocations down
+    tracemalloc.start()
+    task_dicts = json.loads(task_data)
+    tasks = [Task.from_dict(task_dict) for task_dict in task_dicts]
+
+    # Task dictionaries are dropped, only the memory kept alive by the Task objects remains
+    del task_dicts
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Tasks:         {len(tasks):,}")
+    print(f"Load time:     {elapsed:.2f} s")
+    print(f"Retained:      {current / 2 ** 20:.1f} MiB ({current / len(tasks):.0f} bytes/task)")
+    print(f"Peak:          {peak / 2 ** 20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
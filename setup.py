@@ -13,5 +13,12 @@ setup(
         "pytest==7.4.3",
         "pytest-cov == 4.1.0",
         "pytest-mock == 3.12.0"
-    ]
+    ],
+    extras_require={
+        "msgpack": ["msgpack>=1.0"],
+        "numpy": ["numpy>=1.20"]
+    },
+    entry_points={
+        "console_scripts": ["taskme=src.TaskListCLi.TaskMeCli:main"]
+    }
 )
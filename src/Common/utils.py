@@ -1,3 +1,91 @@
+from datetime import date
+from functools import lru_cache
+
 # Validation variables
 VALID_PRIORITIES = ['LOW', 'MEDIUM', 'HIGH']
 VALID_PROGRESS_STATUSES = ['PENDING', 'IN_PROGRESS', 'COMPLETED']
+
+# Number of distinct due dates whose parsing / formatting is cached
+DUE_DATE_CACHE_SIZE = 4096
+
+# Due date ordinal of the stored tasks whose due date isn't a valid dd/mm/yyyy date (written before due dates
+# were validated): past every date, such tasks sort last and are never due before a date
+NO_DUE_ORDINAL = date.max.toordinal() + 1
+
+# Options of the storage, query, display and transfer modules. They are defined here, away from their modules,
+# so that building the command parser doesn't import them
+
+# On-disk formats of the json storage data file, always detected from the file header when reading
+DATA_FORMATS = ["compact", "pretty", "msgpack"]
+
+# Concurrency control between processes sharing the data file:
+#   blocking   - transactions hold an exclusive lock, concurrent writers wait for each other
+#   optimistic - no lock is held between read and write, conflicting writes are detected and rejected
+CONCURRENCY_MODES = ["blocking", "optimistic"]
+DEFAULT_LOCK_TIMEOUT = 10.0
+
+# Available durability modes:
+#   always   - every write is fsynced before returning
+#   interval - replaced files are fsynced before the rename, the renames and appends are fsynced
+#              in groups at most interval_ms later
+#   never    - fsync is left to the operating system, a system crash may truncate a data file
+DURABILITY_MODES = ["always", "interval", "never"]
+DEFAULT_FSYNC_INTERVAL_MS = 100
+
+# Sort keys of the task queries
+QUERY_SORT_KEYS = {
+    "id": lambda task: task.task_id,
+    "due_date": lambda task: (task.due_ordinal, task.task_id),
+    "priority": lambda task: (VALID_PRIORITIES.index(task.priority), task.task_id),
+    "status": lambda task: (VALID_PROGRESS_STATUSES.index(task.progress_status), task.task_id),
+    "assignee": lambda task: (task.assignee, task.task_id),
+    "name": lambda task: (task.name, task.task_id)
+}
+
+# Number of tasks per page of the task list display, when a page is requested without a limit
+DISPLAY_PAGE_SIZE = 50
+
+# Formats of the exported / imported files, json being the whole data file and only supported by export
+TRANSFER_FORMATS = ["json", "jsonl", "csv"]
+
+
+# -----------------------------------------------------------------------------
+# parse_due_date
+# -----------------------------------------------------------------------------
+@lru_cache(maxsize=DUE_DATE_CACHE_SIZE)
+def parse_due_date(due_date: str) -> int:
+    """ Parses a dd/mm/yyyy due date (dd-mm-yyyy is accepted too) into its proleptic Gregorian ordinal
+
+    Args:
+        due_date (str): due date to parse
+
+    Returns:
+        int: the ordinal of the due date
+
+    Raises:
+        ValueError: if due_date isn't a valid dd/mm/yyyy date
+    """
+    try:
+        day, month, year = due_date.replace("-", "/").split("/")
+        if len(day) > 2 or len(month) > 2 or len(year) != 4 or not (day + month + year).isdecimal():
+            raise ValueError(due_date)
+        return date(int(year), int(month), int(day)).toordinal()
+    except (AttributeError, ValueError):
+        raise ValueError("Invalid due_date format. Expected format is 'dd/mm/yyyy'.") from None
+
+
+# -----------------------------------------------------------------------------
+# format_due_date
+# -----------------------------------------------------------------------------
+@lru_cache(maxsize=DUE_DATE_CACHE_SIZE)
+def format_due_date(ordinal: int) -> str:
+    """ Formats a due date ordinal as dd/mm/yyyy
+
+    Args:
+        ordinal (int): proleptic Gregorian ordinal of the due date
+
+    Returns:
+        str: the dd/mm/yyyy due date
+    """
+    due_date = date.fromordinal(ordinal)
+    return f"{due_date.day:02d}/{due_date.month:02d}/{due_date.year:04d}"
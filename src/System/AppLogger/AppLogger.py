@@ -2,9 +2,25 @@ import logging
 from pathlib import Path
 
 
+class _LazyFileHandler(logging.FileHandler):  # pragma: no cover
+    def __init__(self, filename) -> None:
+        """FileHandler only creating its log file, and the logs directory, when the first record is emitted.
+
+        Args:
+            filename: path of the log file
+        """
+        super().__init__(filename, delay=True)
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(exist_ok=True)
+        return super()._open()
+
+
 def setup_logger(name):  # pragma: no cover
     """Setup of the TaskMe Logger.
 
+    Log files are only opened on first use, invocations that don't log don't touch the disk.
+
     Args:
         name: name of the TaskMe logger
 
@@ -12,9 +28,8 @@ def setup_logger(name):  # pragma: no cover
         Task Me Logger object
     """
 
-    # Logs Directory definition, directory will be created  if not existing
+    # Logs Directory definition, directory will be created on first use if not existing
     logs_dir = Path(__file__).resolve().parents[3] / "logs"
-    logs_dir.mkdir(exist_ok=True)
 
     logger = logging.getLogger(name)
     if not logger.hasHandlers():
@@ -23,7 +38,7 @@ def setup_logger(name):  # pragma: no cover
 
         # Debug handler Init
         debug_log_file = logs_dir / "debug.log"
-        debug_handler = logging.FileHandler(debug_log_file)
+        debug_handler = _LazyFileHandler(debug_log_file)
         debug_handler.setLevel(logging.DEBUG)
         debug_formatter = logging.Formatter('%(asctime)s - [%(levelname)s]: %(message)s')
         debug_handler.setFormatter(debug_formatter)
@@ -31,7 +46,7 @@ def setup_logger(name):  # pragma: no cover
 
         # Error Handler Init
         error_log_file = logs_dir / "error.log"
-        error_handler = logging.FileHandler(error_log_file)
+        error_handler = _LazyFileHandler(error_log_file)
         error_handler.setLevel(logging.ERROR)
         error_formatter = logging.Formatter('%(asctime)s - [%(levelname)s]: %(message)s')
         error_handler.setFormatter(error_formatter)
@@ -0,0 +1,165 @@
+import atexit
+import os
+import stat
+import tempfile
+import threading
+
+from src import logger
+from src.Common.utils import DURABILITY_MODES, DEFAULT_FSYNC_INTERVAL_MS
+
+
+# -----------------------------------------------------------------------------
+# DurabilityPolicy
+# -----------------------------------------------------------------------------
+class DurabilityPolicy:
+    def __init__(self, mode: str = "always", interval_ms: int = DEFAULT_FSYNC_INTERVAL_MS) -> None:
+        """Initializes the durability policy applied to TaskMe data file writes.
+
+        Files are always replaced atomically. In "always" and "interval" modes their content is
+        fsynced before the rename, so a crash never leaves a truncated data file behind, at worst
+        the previous version of the file ("interval" mode only delays the fsync of the rename).
+        The "never" mode leaves every fsync to the operating system: the rename may reach the
+        disk before the content, and a system crash may leave an empty or truncated data file.
+
+        Args:
+            mode: one of DURABILITY_MODES
+            interval_ms: maximum delay before pending writes are fsynced in "interval" mode
+
+        Raises:
+            ValueError: if the mode is unknown
+        """
+        if mode not in DURABILITY_MODES:
+            logger.error(f"Invalid durability mode. Expected one of the following: {DURABILITY_MODES}"
+                         f" and got {mode}")
+            raise ValueError(f"Invalid durability mode. Expected one of the following: {DURABILITY_MODES}"
+                             f" and got {mode}")
+
+        self.__mode = mode
+        self.__interval = interval_ms / 1000
+        self.__pending = {}
+        self.__timer = None
+        self.__lock = threading.Lock()
+
+        if mode == "interval":
+            atexit.register(self.flush)
+
+    # -----------------------------------------------------------------------------
+    # mode getter
+    # -----------------------------------------------------------------------------
+    @property
+    def mode(self) -> str:
+        return self.__mode
+
+    # -----------------------------------------------------------------------------
+    # __fsync_directory
+    # -----------------------------------------------------------------------------
+    @staticmethod
+    def __fsync_directory(path) -> None:
+        """Persists a rename by fsyncing the parent directory (no-op where unsupported).
+
+        Args:
+            path: path of the renamed file
+        """
+        if os.name == "nt":  # pragma: no cover
+            return
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    # -----------------------------------------------------------------------------
+    # __schedule
+    # -----------------------------------------------------------------------------
+    def __schedule(self, path, fsync_file: bool) -> None:
+        """Registers a path to be fsynced by the next group commit (internal).
+
+        Args:
+            path: path of the written file
+            fsync_file (bool): whether the content of the file is not fsynced yet, otherwise only
+                its directory entry is
+        """
+        with self.__lock:
+            path = os.fspath(path)
+            self.__pending[path] = self.__pending.get(path, False) or fsync_file
+            if self.__timer is None:
+                self.__timer = threading.Timer(self.__interval, self.flush)
+                self.__timer.daemon = True
+                self.__timer.start()
+
+    # -----------------------------------------------------------------------------
+    # atomic_write
+    # -----------------------------------------------------------------------------
+    def atomic_write(self, path, data: bytes, force_fsync: bool = False) -> None:
+        """Atomically replaces a file: data goes to a temporary file which is renamed over it.
+
+        Args:
+            path: path of the file to replace
+            data (bytes): new content of the file
+            force_fsync (bool): fsync before returning, whatever the mode
+        """
+        directory, name = os.path.split(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".tmp")
+        try:
+            # Temporary files are private, keep the permissions of the replaced file
+            if os.path.exists(path):
+                os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+                file.flush()
+                # The content must be on disk before the rename, even if the latter is delayed
+                if self.__mode != "never" or force_fsync:
+                    os.fsync(file.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        if self.__mode == "always" or force_fsync:
+            self.__fsync_directory(path)
+        elif self.__mode == "interval":
+            self.__schedule(path, fsync_file=False)
+
+    # -----------------------------------------------------------------------------
+    # append
+    # -----------------------------------------------------------------------------
+    def append(self, path, data: bytes, force_fsync: bool = False) -> None:
+        """Appends data to a file.
+
+        Args:
+            path: path of the file to append to
+            data (bytes): data to append
+            force_fsync (bool): fsync before returning, whatever the mode
+        """
+        with open(path, 'ab') as file:
+            file.write(data)
+            file.flush()
+            if self.__mode == "always" or force_fsync:
+                os.fsync(file.fileno())
+
+        if self.__mode == "interval" and not force_fsync:
+            self.__schedule(path, fsync_file=True)
+
+    # -----------------------------------------------------------------------------
+    # flush
+    # -----------------------------------------------------------------------------
+    def flush(self) -> None:
+        """Fsyncs every pending write at once (group commit)."""
+        with self.__lock:
+            pending, self.__pending = self.__pending, {}
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+
+        for path, fsync_file in pending.items():
+            try:
+                if fsync_file:
+                    with open(path, 'rb') as file:
+                        os.fsync(file.fileno())
+                self.__fsync_directory(path)
+            except OSError as e:
+                logger.error(f"Unable to fsync '{path}': {e}")
+
+        if pending:
+            logger.debug(f"Group commit of {len(pending)} file(s)")
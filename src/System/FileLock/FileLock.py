@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from src import logger
+from src.Common.utils import DEFAULT_LOCK_TIMEOUT
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # Advisory locks aren't available (e.g. Windows), locking becomes a no-op
+    fcntl = None
+
+# Bounds of the exponential backoff between two lock attempts, in seconds
+_MIN_RETRY_DELAY = 0.001
+_MAX_RETRY_DELAY = 0.05
+
+
+# -----------------------------------------------------------------------------
+# FileLock
+# -----------------------------------------------------------------------------
+class FileLock:
+    def __init__(self, lock_path, timeout: float = DEFAULT_LOCK_TIMEOUT) -> None:
+        """Initializes an advisory, cross-process lock backed by a lock file.
+
+        Readers share the lock while writers hold it exclusively. Each acquisition opens its
+        own file descriptor, so threads of a same process exclude each other as well. The lock
+        is re-entrant within a thread: nested acquisitions reuse the outer lock.
+
+        Args:
+            lock_path: path of the lock file, created if needed
+            timeout: seconds to wait for the lock before giving up
+        """
+        self.__lock_path = lock_path
+        self.__timeout = timeout
+        self.__held = threading.local()
+
+        # Without advisory locks, threads of this process still exclude each other
+        self.__thread_lock = threading.RLock()
+
+    # -----------------------------------------------------------------------------
+    # lock_path getter
+    # -----------------------------------------------------------------------------
+    @property
+    def lock_path(self):
+        return self.__lock_path
+
+    # -----------------------------------------------------------------------------
+    # __acquire
+    # -----------------------------------------------------------------------------
+    @contextmanager
+    def __acquire(self, operation: int, kind: str):
+        """Holds the lock file with the given flock operation (internal).
+
+        Args:
+            operation (int): fcntl.LOCK_SH or fcntl.LOCK_EX
+            kind (str): "shared" or "exclusive", for messages
+
+        Yields:
+            None: once the lock is held.
+
+        Raises:
+            TimeoutError: if the lock couldn't be acquired within the timeout
+            RuntimeError: if an exclusive lock is requested while holding a shared one
+        """
+        held = getattr(self.__held, "kind", None)
+        if held is not None:
+            if held == "shared" and kind == "exclusive":
+                logger.error(f"Cannot upgrade a shared lock on {self.__lock_path} to an exclusive one")
+                raise RuntimeError(f"Cannot upgrade a shared lock on {self.__lock_path} to an exclusive one")
+            yield
+            return
+
+        fd = os.open(self.__lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            deadline = time.monotonic() + self.__timeout
+            delay = _MIN_RETRY_DELAY
+            while True:
+                try:
+                    fcntl.flock(fd, operation | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        logger.error(f"Timed out after {self.__timeout}s waiting for a {kind} lock"
+                                     f" on {self.__lock_path}")
+                        raise TimeoutError(f"Timed out after {self.__timeout}s waiting for a {kind} lock"
+                                           f" on {self.__lock_path}")
+                    time.sleep(delay)
+                    delay = min(delay * 2, _MAX_RETRY_DELAY)
+
+            self.__held.kind = kind
+            try:
+                yield
+            finally:
+                self.__held.kind = None
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    # -----------------------------------------------------------------------------
+    # shared
+    # -----------------------------------------------------------------------------
+    @contextmanager
+    def shared(self):
+        """Holds the lock in shared mode, other readers may hold it at the same time.
+
+        Yields:
+            None: once the lock is held.
+        """
+        if fcntl is None:  # pragma: no cover
+            with self.__thread_lock:
+                yield
+            return
+        with self.__acquire(fcntl.LOCK_SH, "shared"):
+            yield
+
+    # -----------------------------------------------------------------------------
+    # exclusive
+    # -----------------------------------------------------------------------------
+    @contextmanager
+    def exclusive(self):
+        """Holds the lock in exclusive mode, excluding every other reader and writer.
+
+        Yields:
+            None: once the lock is held.
+        """
+        if fcntl is None:  # pragma: no cover
+            with self.__thread_lock:
+                yield
+            return
+        with self.__acquire(fcntl.LOCK_EX, "exclusive"):
+            yield
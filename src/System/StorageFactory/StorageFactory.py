@@ -0,0 +1,61 @@
+import importlib
+
+from src import logger
+
+
+# -----------------------------------------------------------------------------
+# _lazy_backend
+# -----------------------------------------------------------------------------
+def _lazy_backend(module_name: str, class_name: str):
+    """ Wraps a storage backend class so that its module only gets imported when instantiated
+
+    Args:
+        module_name (str): module defining the backend
+        class_name (str): name of the backend class
+
+    Returns:
+        a callable creating the backend, with the same arguments as the backend class
+    """
+    def create_backend(*args, **kwargs):
+        return getattr(importlib.import_module(module_name), class_name)(*args, **kwargs)
+
+    create_backend.__name__ = class_name
+    return create_backend
+
+
+# -----------------------------------------------------------------------------
+# initialize_storage_backends
+# -----------------------------------------------------------------------------
+def initialize_storage_backends():
+    # Storage backends mapping, every backend exposes read / read_all / write
+    # Backends are imported lazily, only the selected one pays its import cost
+    return {
+        "json": _lazy_backend("src.System.TaskMeFileHandler.TaskMeFileHandler", "TaskMeFileHandler"),
+        "journal": _lazy_backend("src.System.TaskMeJournalHandler.TaskMeJournalHandler", "TaskMeJournalHandler"),
+        "sharded": _lazy_backend("src.System.TaskMeShardedHandler.TaskMeShardedHandler", "TaskMeShardedHandler"),
+        "sqlite": _lazy_backend("src.System.TaskMeSQLiteHandler.TaskMeSQLiteHandler", "TaskMeSQLiteHandler")
+    }
+
+
+# -----------------------------------------------------------------------------
+# create_file_handler
+# -----------------------------------------------------------------------------
+def create_file_handler(storage: str = "json", **handler_options):
+    """ Creates the file handler of the requested storage backend
+
+    Args:
+        storage (str): name of the storage backend
+        **handler_options: Keyword arguments forwarded to the storage backend constructor
+
+    Returns:
+        the initialized file handler object
+
+    Raises:
+        ValueError: if the storage backend is unknown
+    """
+    backends = initialize_storage_backends()
+    if storage not in backends:
+        logger.error(f"Unknown storage backend: {storage}")
+        raise ValueError(f"Unknown storage backend: {storage}")
+
+    return backends[storage](**handler_options)
@@ -1,17 +1,242 @@
+import hashlib
+import io
 import json
 import os
+import struct
+from contextlib import contextmanager
 from pathlib import Path
 
 from src import logger
+from src.Common.utils import CONCURRENCY_MODES, DATA_FORMATS, DEFAULT_LOCK_TIMEOUT
+from src.System.DurabilityPolicy.DurabilityPolicy import DurabilityPolicy
+from src.System.FileLock.FileLock import FileLock
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+# Layout of the JSON formats: (document head, TaskList separator, document tail, empty document)
+# "pretty" is identical to json.dump(..., indent=4). Exports share it, see encode_json_task_list
+JSON_LAYOUTS = {
+    "pretty": ('{\n    "taskLists": [\n', ",\n", "\n    ]\n}", '{\n    "taskLists": []\n}'),
+    "compact": ('{"taskLists":[', ",", "]}", '{"taskLists":[]}')
+}
+_PRETTY_TASK_LIST_INDENT = " " * 8
+
+# msgpack format: magic header followed by length-prefixed msgpack TaskLists
+_MSGPACK_MAGIC = b"TMMP\x01"
+_MSGPACK_FRAME_HEADER = struct.Struct(">I")
+
+# The name index is only a hint validated against the data file stamp, it doesn't need fsyncs
+_INDEX_DURABILITY = DurabilityPolicy("never")
+
+# Initial read size of the streaming parser
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+# -----------------------------------------------------------------------------
+# encode_json_task_list
+# -----------------------------------------------------------------------------
+def encode_json_task_list(task_list: dict, data_format: str) -> str:
+    """Serializes a single TaskList as laid out in a JSON data file, ASCII-only.
+
+    Args:
+        task_list (dict): The TaskList dictionary.
+        data_format (str): "compact" or "pretty", a key of JSON_LAYOUTS.
+
+    Returns:
+        str: The serialized TaskList, to be placed between the parts of JSON_LAYOUTS.
+    """
+    if data_format == "pretty":
+        return _PRETTY_TASK_LIST_INDENT + json.dumps(task_list, indent=4).replace("\n", "\n" + _PRETTY_TASK_LIST_INDENT)
+    return json.dumps(task_list, separators=(",", ":"))
+
+
+# -----------------------------------------------------------------------------
+# _JsonStreamReader
+# -----------------------------------------------------------------------------
+class _JsonStreamReader:
+    def __init__(self, file, chunk_size=None):
+        """Initializes a buffered reader decoding JSON values one at a time from a text file.
+
+        Args:
+            file: text file object
+            chunk_size: initial read size, doubled whenever a value doesn't fit in the buffer,
+                defaults to _STREAM_CHUNK_SIZE
+        """
+        chunk_size = chunk_size if chunk_size is not None else _STREAM_CHUNK_SIZE
+        self.__file = file
+        self.__decoder = json.JSONDecoder()
+        self.__buffer = ""
+        self.__position = 0
+        self.__eof = False
+        self.__initial_chunk_size = chunk_size
+        self.__chunk_size = chunk_size
+
+    def __fill(self) -> None:
+        """Drops the consumed part of the buffer and appends the next chunk of the file."""
+        chunk = self.__file.read(self.__chunk_size)
+        if not chunk:
+            self.__eof = True
+        self.__buffer = self.__buffer[self.__position:] + chunk
+        self.__position = 0
+
+    def next_char(self) -> str:
+        """Skips whitespace and returns the next character without consuming it.
+
+        Returns:
+            str: the next non-whitespace character.
+
+        Raises:
+            ValueError: if the end of the file is reached
+        """
+        while True:
+            self.__position = json.decoder.WHITESPACE.match(self.__buffer, self.__position).end()
+            if self.__position < len(self.__buffer):
+                return self.__buffer[self.__position]
+            if self.__eof:
+                raise ValueError("Unexpected end of TaskMe data file")
+            self.__fill()
+
+    def expect(self, char: str) -> None:
+        """Consumes the next non-whitespace character, which must be the given one.
+
+        Args:
+            char (str): expected character.
+
+        Raises:
+            ValueError: if the next character is a different one
+        """
+        if self.next_char() != char:
+            raise ValueError(f"Expected '{char}' in TaskMe data file")
+        self.__position += 1
+
+    def decode_value(self):
+        """Decodes the next JSON value, reading more of the file until it is complete.
+
+        Returns:
+            The decoded value.
+        """
+        self.next_char()
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(self.__buffer, self.__position)
+                # A value ending with the buffer may be truncated (e.g. numbers), confirm with more data
+                if end < len(self.__buffer) or self.__eof:
+                    self.__position = end
+                    self.__chunk_size = self.__initial_chunk_size
+                    return value
+            except json.JSONDecodeError:
+                if self.__eof:
+                    raise
+            self.__chunk_size *= 2
+            self.__fill()
+
+
+# -----------------------------------------------------------------------------
+# _iter_json_task_lists
+# -----------------------------------------------------------------------------
+def _iter_json_task_lists(file):
+    """Incrementally parses a JSON data file, yielding its TaskLists one at a time.
+
+    Only the current TaskList and a read buffer are kept in memory, parsing stops as soon
+    as the "taskLists" array is closed.
+
+    Args:
+        file: text file object positioned at the start of the JSON document
+
+    Yields:
+        dict: TaskList dictionaries, in file order.
+    """
+    reader = _JsonStreamReader(file)
+    reader.expect("{")
+    if reader.next_char() == "}":
+        return
+
+    while True:
+        key = reader.decode_value()
+        reader.expect(":")
+        if key != "taskLists":
+            reader.decode_value()
+        else:
+            reader.expect("[")
+            if reader.next_char() == "]":
+                return
+            while True:
+                yield reader.decode_value()
+                if reader.next_char() == "]":
+                    return
+                reader.expect(",")
+
+        if reader.next_char() == "}":
+            return
+        reader.expect(",")
+
+
+# -----------------------------------------------------------------------------
+# TaskMeConflictError
+# -----------------------------------------------------------------------------
+class TaskMeConflictError(Exception):
+    """Raised in optimistic mode when a TaskList was modified by someone else since it was read."""
 
 
 class TaskMeFileHandler:
-    def __init__(self):
-        """Initialize a file handler for TaskMe JSON storage."""
-        self.__file_path = self.__get_data_file_path()
+    def __init__(self, file_path=None, data_format="compact", durability=None, concurrency="blocking",
+                 lock_timeout=DEFAULT_LOCK_TIMEOUT, search_index=True):
+        """Initialize a file handler for TaskMe JSON storage.
+
+        Args:
+            file_path: path of the JSON data file, defaults to data/.taskme_data.json
+            data_format: on-disk format used when writing, one of DATA_FORMATS
+            durability: DurabilityPolicy applied to writes, defaults to an fsync on every write
+            concurrency: concurrency control between processes, one of CONCURRENCY_MODES
+            lock_timeout: seconds to wait for the data file lock before giving up
+            search_index: maintain a cross-list search index next to the data file, updated on every write
+
+        Raises:
+            ValueError: if the data format or the concurrency mode is unknown, or a dependency is missing
+        """
+        if concurrency not in CONCURRENCY_MODES:
+            logger.error(f"Invalid concurrency mode. Expected one of the following: {CONCURRENCY_MODES}"
+                         f" and got {concurrency}")
+            raise ValueError(f"Invalid concurrency mode. Expected one of the following: {CONCURRENCY_MODES}"
+                             f" and got {concurrency}")
+        if data_format not in DATA_FORMATS:
+            logger.error(f"Invalid data format. Expected one of the following: {DATA_FORMATS} and got {data_format}")
+            raise ValueError(f"Invalid data format. Expected one of the following: {DATA_FORMATS}"
+                             f" and got {data_format}")
+        if data_format == "msgpack":
+            self.__require_msgpack()
+        self.__data_format = data_format
+        self.__durability = durability if durability is not None else DurabilityPolicy()
+
+        self.__file_path = file_path if file_path is not None else self.__get_data_file_path()
+        self.__index_path = f"{self.__file_path}.index"
         logger.debug(f"Data file path: {self.__file_path}")
-        if not os.path.isfile(self.__file_path):
-            self.__initialize_data_file()
+
+        # Advisory lock shared by every process using the data file
+        self.__concurrency = concurrency
+        self.__lock = FileLock(f"{self.__file_path}.lock", lock_timeout)
+
+        # Optimistic mode: TaskList name -> version it had when last read by this handler
+        self.__versions = {}
+
+        # Parsed TaskLists kept in memory, revalidated against the data file stamp
+        self.__cache = None
+        self.__cache_by_name = None
+        self.__cache_stamp = None
+
+        # Name -> (offset, length) index of the TaskLists inside the data file
+        self.__index = None
+
+        # Cross-list search index, opened on first use
+        self.__search_index_path = f"{self.__file_path}.search.db" if search_index else None
+        self.__search_index = None
+
+        with self.__lock.exclusive():
+            if not os.path.isfile(self.__file_path):
+                self.__initialize_data_file()
 
     # -----------------------------------------------------------------------------
     # __get_data_file_path
@@ -29,15 +254,124 @@ class TaskMeFileHandler:
         # Define the file path inside the data directory
         return data_dir / ".taskme_data.json"
 
+    # -----------------------------------------------------------------------------
+    # __require_msgpack
+    # -----------------------------------------------------------------------------
+    @staticmethod
+    def __require_msgpack() -> None:
+        """Checks that the optional msgpack dependency is installed.
+
+        Raises:
+            ValueError: if msgpack isn't installed
+        """
+        if msgpack is None:
+            logger.error("The msgpack data format requires the 'msgpack' package.")
+            raise ValueError("The msgpack data format requires the 'msgpack' package.")
+
+    # -----------------------------------------------------------------------------
+    # __get_file_stamp
+    # -----------------------------------------------------------------------------
+    def __get_file_stamp(self):
+        """Cheap fingerprint of the data file, changing whenever another process rewrites it.
+
+        Returns:
+            tuple: (mtime in ns, size, inode) of the data file, None if it can't be stat'ed.
+        """
+        try:
+            stat = os.stat(self.__file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
     # -----------------------------------------------------------------------------
     # __initialize_data_file
     # -----------------------------------------------------------------------------
     def __initialize_data_file(self) -> None:
         """Initialize the data file with default values.
         """
-        default_data = {"taskLists": []}
-        with open(self.__file_path, 'w') as file:
-            json.dump(default_data, file, indent=4)
+        self.__write_all([])
+
+    # -----------------------------------------------------------------------------
+    # __encode_task_list
+    # -----------------------------------------------------------------------------
+    def __encode_task_list(self, task_list: dict) -> bytes:
+        """Serializes a single TaskList in the configured data format (internal).
+
+        Args:
+            task_list (dict): The TaskList dictionary.
+
+        Returns:
+            bytes: The serialized TaskList.
+        """
+        if self.__data_format == "msgpack":
+            return msgpack.packb(task_list)
+        return encode_json_task_list(task_list, self.__data_format).encode("ascii")
+
+    # -----------------------------------------------------------------------------
+    # __encode_document
+    # -----------------------------------------------------------------------------
+    def __encode_document(self, task_lists: list):
+        """Serializes all TaskLists in the configured data format (internal).
+
+        TaskLists are serialized one by one to record their position in the document,
+        JSON is kept ASCII-only so that characters and bytes stay aligned.
+
+        Args:
+            task_lists (list): A list of TaskList dictionaries.
+
+        Returns:
+            tuple: The serialized document (bytes) and the TaskList name -> (offset, length) mapping.
+        """
+        offsets = {}
+        if self.__data_format == "msgpack":
+            parts = [_MSGPACK_MAGIC]
+            position = len(_MSGPACK_MAGIC)
+            for task_list in task_lists:
+                payload = self.__encode_task_list(task_list)
+                position += _MSGPACK_FRAME_HEADER.size
+                offsets.setdefault(task_list["taskListName"], (position, len(payload)))
+                parts.append(_MSGPACK_FRAME_HEADER.pack(len(payload)))
+                parts.append(payload)
+                position += len(payload)
+            return b"".join(parts), offsets
+
+        head, separator, tail, empty = (part.encode("ascii") for part in JSON_LAYOUTS[self.__data_format])
+        if not task_lists:
+            return empty, offsets
+
+        chunks = []
+        position = len(head)
+        for task_list in task_lists:
+            chunk = self.__encode_task_list(task_list)
+            offsets.setdefault(task_list["taskListName"], (position, len(chunk)))
+            chunks.append(chunk)
+            position += len(chunk) + len(separator)
+        return head + separator.join(chunks) + tail, offsets
+
+    # -----------------------------------------------------------------------------
+    # __decode_document
+    # -----------------------------------------------------------------------------
+    def __decode_document(self, data: bytes) -> list:
+        """Parses a data file content, whatever its format (internal).
+
+        Args:
+            data (bytes): content of the data file.
+
+        Returns:
+            list: A list of TaskList dictionaries.
+        """
+        if not data.startswith(_MSGPACK_MAGIC):
+            return json.loads(data)["taskLists"]
+
+        self.__require_msgpack()
+        task_lists = []
+        position = len(_MSGPACK_MAGIC)
+        while position < len(data):
+            (length,) = _MSGPACK_FRAME_HEADER.unpack_from(data, position)
+            position += _MSGPACK_FRAME_HEADER.size
+            task_lists.append(msgpack.unpackb(data[position:position + length]))
+            position += length
+        return task_lists
 
     # -----------------------------------------------------------------------------
     # __write_all
@@ -48,26 +382,317 @@ class TaskMeFileHandler:
         Args:
             task_lists (list): A list of TaskList dictionaries.
         """
-        data = {"taskLists": task_lists}
+        document, offsets = self.__encode_document(task_lists)
+
+        # Never truncate the data file in place, a crash would leave it corrupted
+        self.__durability.atomic_write(self.__file_path, document)
+
+        stamp = self.__get_file_stamp()
+        self.__set_cache(task_lists, stamp)
+        self.__write_index(offsets, stamp)
+
+    # -----------------------------------------------------------------------------
+    # __set_cache
+    # -----------------------------------------------------------------------------
+    def __set_cache(self, task_lists: list, stamp) -> None:
+        """Keeps the parsed TaskLists in memory along with the data file stamp (internal).
+
+        Args:
+            task_lists (list): A list of TaskList dictionaries.
+            stamp: data file stamp the TaskLists were read from / written to.
+        """
+        self.__cache = task_lists
+        self.__cache_by_name = None
+        self.__cache_stamp = stamp
 
-        with open(self.__file_path, 'w') as file:
-            json.dump(data, file, indent=4)
+    # -----------------------------------------------------------------------------
+    # __write_index
+    # -----------------------------------------------------------------------------
+    def __write_index(self, offsets: dict, stamp) -> None:
+        """Persists the TaskList name index next to the data file (internal).
+
+        Args:
+            offsets (dict): TaskList name -> (offset, length) in the data file.
+            stamp: data file stamp the offsets are valid for.
+        """
+        self.__index = {"stamp": list(stamp) if stamp is not None else None,
+                        "format": self.__data_format,
+                        "offsets": offsets}
+        _INDEX_DURABILITY.atomic_write(self.__index_path, json.dumps(self.__index).encode("utf-8"))
+
+    # -----------------------------------------------------------------------------
+    # __load_index
+    # -----------------------------------------------------------------------------
+    def __load_index(self, stamp):
+        """Loads the TaskList name index if it matches the current data file (internal).
+
+        Args:
+            stamp: current data file stamp.
+
+        Returns:
+            dict: The index (stamp, format and TaskList name -> (offset, length)), None if missing or stale.
+        """
+        if stamp is None:
+            return None
+
+        if self.__index is None or self.__index["stamp"] != list(stamp):
+            try:
+                with open(self.__index_path, 'r') as file:
+                    self.__index = json.load(file)
+            except (OSError, ValueError):
+                self.__index = None
+                return None
+
+        if self.__index["stamp"] != list(stamp):
+            return None
+        return self.__index
+
+    # -----------------------------------------------------------------------------
+    # __get_search_index
+    # -----------------------------------------------------------------------------
+    def __get_search_index(self):
+        """Opens the search index on first use (internal).
+
+        Returns:
+            TaskMeSearchIndex: The search index, None if disabled.
+        """
+        if self.__search_index is None and self.__search_index_path is not None:
+            # Imported on use, commands never searching don't pay for SQLite
+            from src.System.TaskMeSearchIndex.TaskMeSearchIndex import TaskMeSearchIndex
+            self.__search_index = TaskMeSearchIndex(self.__search_index_path)
+        return self.__search_index
+
+    # -----------------------------------------------------------------------------
+    # __update_search_index
+    # -----------------------------------------------------------------------------
+    def __update_search_index(self, task_list_dicts: list, all_task_lists: list, previous_stamp) -> None:
+        """Re-indexes the written TaskLists, must be called with the exclusive lock held (internal).
+
+        The data file is the reference: failing to update the index doesn't fail the write, the
+        index is then left stale and synchronized by the next search.
+
+        Args:
+            task_list_dicts (list): The written TaskList dictionaries.
+            all_task_lists (list): Every TaskList dictionary of the data file, once written.
+            previous_stamp: data file stamp before the write.
+        """
+        if self.__search_index_path is None:
+            return
+
+        import sqlite3
+        try:
+            search_index = self.__get_search_index()
+            # An index missing earlier writes (e.g. by another tool) gets fully synchronized
+            if search_index.is_current(previous_stamp):
+                search_index.update(task_list_dicts, self.__cache_stamp)
+            else:
+                search_index.sync(all_task_lists, self.__cache_stamp)
+        except sqlite3.Error as e:
+            logger.warning(f"Search index update failed, it will be synchronized on next search: {e}")
+
+    # -----------------------------------------------------------------------------
+    # __get_version
+    # -----------------------------------------------------------------------------
+    @staticmethod
+    def __get_version(task_list):
+        """Version of a TaskList, changing whenever its content changes (internal).
+
+        Args:
+            task_list: The TaskList dictionary, None if the TaskList doesn't exist.
+
+        Returns:
+            str: A digest of the TaskList content, None if the TaskList doesn't exist.
+        """
+        if task_list is None:
+            return None
+        return hashlib.sha1(json.dumps(task_list, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+    # -----------------------------------------------------------------------------
+    # __check_version
+    # -----------------------------------------------------------------------------
+    def __check_version(self, task_list_name: str, stored) -> None:
+        """Checks that a TaskList didn't change since this handler read it (internal).
+
+        Must be called with the exclusive lock held. TaskLists never read are written blindly.
+
+        Args:
+            task_list_name (str): The name of the TaskList.
+            stored: The TaskList dictionary currently stored, None if it doesn't exist.
+
+        Raises:
+            TaskMeConflictError: if the stored TaskList isn't the one that was read
+        """
+        if task_list_name not in self.__versions:
+            return
+        if self.__versions[task_list_name] != self.__get_version(stored):
+            logger.error(f"TaskList {task_list_name} was modified concurrently, read it again before writing")
+            raise TaskMeConflictError(f"TaskList {task_list_name} was modified concurrently,"
+                                      f" read it again before writing")
+
+    # -----------------------------------------------------------------------------
+    # __read
+    # -----------------------------------------------------------------------------
+    def __read(self, task_list_name: str):
+        """Reads a specific TaskList, must be called with the lock held (internal).
+
+        Args:
+            task_list_name (str): The name of the TaskList.
+
+        Returns:
+            dict: The desired dictionary if successful, None otherwise.
+        """
+        stamp = self.__get_file_stamp()
+
+        # Already parsed: lookup in memory
+        if stamp is not None and stamp == self.__cache_stamp:
+            if self.__cache_by_name is None:
+                self.__cache_by_name = {}
+                for task_list in self.__cache:
+                    self.__cache_by_name.setdefault(task_list["taskListName"], task_list)
+            return self.__cache_by_name.get(task_list_name)
+
+        # Only parse the requested TaskList using the name index
+        index = self.__load_index(stamp)
+        if index is not None:
+            if task_list_name not in index["offsets"]:
+                return None
+            offset, length = index["offsets"][task_list_name]
+            with open(self.__file_path, 'rb') as file:
+                file.seek(offset)
+                payload = file.read(length)
+            if index.get("format") == "msgpack":
+                self.__require_msgpack()
+                return msgpack.unpackb(payload)
+            return json.loads(payload)
+
+        # No usable index (e.g. file written by another tool), stream until the first match
+        for task_list in self.iter_task_lists():
+            if task_list["taskListName"] == task_list_name:
+                return task_list
+        return None
 
     # -----------------------------------------------------------------------------
     # Interface
     # -----------------------------------------------------------------------------
+    # -----------------------------------------------------------------------------
+    # transaction
+    # -----------------------------------------------------------------------------
+    @contextmanager
+    def transaction(self):
+        """Groups a read-modify-write of the data file, e.g. a whole CLI command.
+
+        In blocking mode the exclusive lock is held for the whole transaction, so concurrent
+        writers are serialized. In optimistic mode nothing is held, conflicting writes are
+        rejected by write instead.
+
+        Yields:
+            None: once the transaction started.
+        """
+        if self.__concurrency == "optimistic":
+            yield
+            return
+        with self.__lock.exclusive():
+            yield
+
     # -----------------------------------------------------------------------------
     # read_all
     # -----------------------------------------------------------------------------
     def read_all(self) -> list:
         """Reads all TaskLists from the data file.
 
+        The parsed content is cached and only re-parsed when the data file changed on disk,
+        the returned dictionaries are therefore shared and must not be mutated.
+
         Returns:
             list: A list of TaskList dictionaries.
         """
-        with open(self.__file_path, 'r') as file:
-            data = json.load(file)
-            return data["taskLists"]
+        with self.__lock.shared():
+            # Stamp is taken before reading, a concurrent rewrite then invalidates the cache on next call
+            stamp = self.__get_file_stamp()
+            if stamp is not None and stamp == self.__cache_stamp:
+                return self.__cache
+
+            with open(self.__file_path, 'rb') as file:
+                task_lists = self.__decode_document(file.read())
+
+            self.__set_cache(task_lists, stamp)
+            return self.__cache
+
+    # -----------------------------------------------------------------------------
+    # iter_task_lists
+    # -----------------------------------------------------------------------------
+    def iter_task_lists(self):
+        """Streams the TaskLists of the data file one at a time.
+
+        Unless the data file is already cached, it is parsed incrementally so that memory
+        stays bounded by the largest TaskList rather than the whole document.
+
+        Yields:
+            dict: TaskList dictionaries, in file order.
+        """
+        stamp = self.__get_file_stamp()
+        if stamp is not None and stamp == self.__cache_stamp:
+            yield from self.__cache
+            return
+
+        # The data file is only ever replaced by a rename, the opened file therefore stays a
+        # consistent snapshot and the lock doesn't need to be held while streaming
+        with self.__lock.shared():
+            file = open(self.__file_path, 'rb')
+
+        with file:
+            if file.read(len(_MSGPACK_MAGIC)) == _MSGPACK_MAGIC:
+                self.__require_msgpack()
+                while True:
+                    header = file.read(_MSGPACK_FRAME_HEADER.size)
+                    if not header:
+                        return
+                    (length,) = _MSGPACK_FRAME_HEADER.unpack(header)
+                    yield msgpack.unpackb(file.read(length))
+
+            file.seek(0)
+            yield from _iter_json_task_lists(io.TextIOWrapper(file, encoding="utf-8"))
+
+    # -----------------------------------------------------------------------------
+    # search
+    # -----------------------------------------------------------------------------
+    def search(self, **criteria) -> list:
+        """Searches the tasks of every TaskList through the search index, without parsing the data file.
+
+        An index out of date with the data file (e.g. written by another tool) is first synchronized,
+        only the changed tasks get re-indexed.
+
+        Args:
+            **criteria: search criteria, see TaskMeSearchIndex.search
+
+        Returns:
+            list: (TaskList name, Task dictionary) pairs of the matching tasks.
+
+        Raises:
+            ValueError: if the search index is disabled or no criterion is given
+        """
+        search_index = self.__get_search_index()
+        if search_index is None:
+            logger.error("The search index is disabled for this data file.")
+            raise ValueError("The search index is disabled for this data file.")
+
+        with self.__lock.shared():
+            is_current = search_index.is_current(self.__get_file_stamp())
+
+        if not is_current:
+            # Synchronizing writes the index: like writers do, with the exclusive lock held so that
+            # concurrent searches don't synchronize it at the same time
+            import sqlite3
+            from src.System.TaskMeSearchIndex.TaskMeSearchIndex import search_task_lists
+            with self.__lock.exclusive():
+                stamp = self.__get_file_stamp()
+                try:
+                    if not search_index.is_current(stamp):
+                        search_index.sync(self.iter_task_lists(), stamp)
+                except sqlite3.Error as e:
+                    logger.warning(f"Search index synchronization failed, searching without it: {e}")
+                    return search_task_lists(self.iter_task_lists(), **criteria)
+        return search_index.search(**criteria)
 
     # -----------------------------------------------------------------------------
     # read
@@ -75,19 +700,20 @@ class TaskMeFileHandler:
     def read(self, task_list_name: str) -> dict:
         """Reads a specific TaskList.
 
+        In optimistic mode, the version of the TaskList is remembered to detect conflicts on write.
+
         Args:
             task_list_name (str): The name of the TaskList.
 
         Returns:
             dict: The desired dictionary if successful, None otherwise.
         """
-        read_tl = []
-        all_task_lists = self.read_all()
-        for task_list in all_task_lists:
-            if task_list["taskListName"] == task_list_name:
-                read_tl = task_list
+        with self.__lock.shared():
+            task_list = self.__read(task_list_name)
 
-        return read_tl
+        if self.__concurrency == "optimistic":
+            self.__versions[task_list_name] = self.__get_version(task_list)
+        return task_list
 
     # -----------------------------------------------------------------------------
     # write
@@ -98,18 +724,71 @@ class TaskMeFileHandler:
         Args:
             task_list_dict: The TaskList dictionary to write.
         """
-        # TODO: might be expensive as the file grows, replace by database in the futur
-        all_task_lists = self.read_all()
-        updated = False
-        for idx, task_list in enumerate(all_task_lists):
-            if task_list["taskListName"] == task_list_dict["taskListName"]:
-                all_task_lists[idx] = task_list_dict
-                updated = True
-                break
-
-        # If the TaskList wasn't found, add it.
-        if not updated:
-            logger.info(f"TaskList {task_list_dict['taskListName']} wasn't found - hence got created")
-            all_task_lists.append(task_list_dict)
-
-        self.__write_all(all_task_lists)
+        self.write_many([task_list_dict])
+
+    # -----------------------------------------------------------------------------
+    # write_many
+    # -----------------------------------------------------------------------------
+    def write_many(self, task_list_dicts: list) -> None:
+        """Adds or updates several TaskLists with a single rewrite of the data file.
+
+        Args:
+            task_list_dicts (list): The TaskList dictionaries to write.
+
+        Raises:
+            TaskMeConflictError: in optimistic mode, if one of the TaskLists changed since it was read
+        """
+        with self.__lock.exclusive():
+            # Shallow copy, the cached list must stay untouched if the write fails
+            stored_task_lists = self.read_all()
+            previous_stamp = self.__cache_stamp
+            all_task_lists = list(stored_task_lists)
+            positions = {}
+            for idx, task_list in enumerate(stored_task_lists):
+                positions.setdefault(task_list["taskListName"], idx)
+
+            for task_list_dict in task_list_dicts:
+                task_list_name = task_list_dict["taskListName"]
+                idx = positions.get(task_list_name)
+                if self.__concurrency == "optimistic":
+                    stored = stored_task_lists[idx] if idx is not None and idx < len(stored_task_lists) else None
+                    self.__check_version(task_list_name, stored)
+
+                if idx is not None:
+                    all_task_lists[idx] = task_list_dict
+                else:
+                    # If the TaskList wasn't found, add it.
+                    logger.info(f"TaskList {task_list_name} wasn't found - hence got created")
+                    positions[task_list_name] = len(all_task_lists)
+                    all_task_lists.append(task_list_dict)
+
+            self.__write_all(all_task_lists)
+            self.__update_search_index(task_list_dicts, all_task_lists, previous_stamp)
+
+        if self.__concurrency == "optimistic":
+            for task_list_dict in task_list_dicts:
+                self.__versions[task_list_dict["taskListName"]] = self.__get_version(task_list_dict)
+
+
+# -----------------------------------------------------------------------------
+# read_data_file
+# -----------------------------------------------------------------------------
+def read_data_file(file_path) -> list:
+    """Reads every TaskList of an existing TaskMe data file, whatever its data format.
+
+    Lets the other storage backends migrate a data file, no search index is built for it.
+
+    Args:
+        file_path: path of the TaskMe data file.
+
+    Returns:
+        list: A list of TaskList dictionaries.
+
+    Raises:
+        ValueError: if the data file doesn't exist
+    """
+    if not os.path.isfile(file_path):
+        logger.error(f"TaskMe data file {file_path} wasn't found")
+        raise ValueError(f"TaskMe data file {file_path} wasn't found")
+
+    return TaskMeFileHandler(file_path, search_index=False).read_all()
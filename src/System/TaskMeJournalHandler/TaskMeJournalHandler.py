@@ -0,0 +1,496 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+from src import logger
+from src.System.DurabilityPolicy.DurabilityPolicy import DurabilityPolicy
+from src.System.FileLock.FileLock import FileLock
+from src.System.TaskMeFileHandler.TaskMeFileHandler import read_data_file
+
+# Journal size (in bytes) above which it gets compacted into a new snapshot
+DEFAULT_COMPACTION_THRESHOLD = 1024 * 1024
+
+# TaskList level fields only journaled when present (data written before they existed lacks them)
+OPTIONAL_TASK_LIST_FIELDS = ("nextTaskId",)
+
+# TaskList level fields journaled by update_list records
+TASK_LIST_FIELDS = ("owners", "tags") + OPTIONAL_TASK_LIST_FIELDS
+
+
+class TaskMeJournalHandler:
+    def __init__(self, snapshot_path=None, journal_path=None, compaction_threshold=DEFAULT_COMPACTION_THRESHOLD,
+                 durability=None):
+        """Initialize a file handler for TaskMe journaled storage.
+
+        Every mutation is appended to the journal as a small record, the journal is
+        replayed on top of the last snapshot at load time and compacted into a new
+        snapshot once it grows past the compaction threshold. Task records address tasks
+        by their ID, the tasks of each TaskList are kept in memory indexed by ID. The
+        handler can be shared between threads, and processes may share the storage: every
+        access holds a lock file and first replays the records appended by other processes.
+
+        Args:
+            snapshot_path: path of the snapshot file, defaults to data/.taskme_snapshot.json
+            journal_path: path of the journal file, defaults to data/.taskme_data.journal
+            compaction_threshold: journal size in bytes triggering a compaction
+            durability: DurabilityPolicy applied to journal appends, defaults to an fsync on every append
+        """
+        self.__durability = durability if durability is not None else DurabilityPolicy()
+        data_dir = None
+        if snapshot_path is None or journal_path is None:
+            data_dir = self.__get_data_dir_path()
+        self.__snapshot_path = snapshot_path if snapshot_path is not None else data_dir / ".taskme_snapshot.json"
+        self.__journal_path = journal_path if journal_path is not None else data_dir / ".taskme_data.journal"
+        self.__compaction_threshold = compaction_threshold
+        logger.debug(f"Snapshot file path: {self.__snapshot_path}, journal file path: {self.__journal_path}")
+
+        self.__task_lists = {}
+        self.__sequence = 0
+
+        # Snapshot the in-memory TaskLists were loaded from, journal size replayed on top of it
+        self.__snapshot_stamp = None
+        self.__journal_offset = 0
+
+        self.__lock = threading.RLock()
+        self.__file_lock = FileLock(f"{self.__journal_path}.lock")
+        with self.__lock, self.__file_lock.exclusive():
+            self.__refresh(truncate=True)
+
+    # -----------------------------------------------------------------------------
+    # __get_data_dir_path
+    # -----------------------------------------------------------------------------
+    @staticmethod
+    def __get_data_dir_path():
+        # Retrieve the root TaskMe directory
+        parent_dir = Path(__file__).resolve().parents[3]
+
+        data_dir = parent_dir / "data"
+
+        # If the directory doesn't exist, create it
+        data_dir.mkdir(exist_ok=True)
+
+        return data_dir
+
+    # -----------------------------------------------------------------------------
+    # __get_snapshot_stamp
+    # -----------------------------------------------------------------------------
+    def __get_snapshot_stamp(self):
+        """Identifies the current snapshot file, a compaction replaces it (internal).
+
+        Returns:
+            tuple: (inode, modification time, size) of the snapshot, None if there's none yet.
+        """
+        try:
+            stat = os.stat(self.__snapshot_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    # -----------------------------------------------------------------------------
+    # __load_snapshot
+    # -----------------------------------------------------------------------------
+    def __load_snapshot(self) -> None:
+        """Loads the last snapshot, dropping the in-memory TaskLists (internal)."""
+        self.__task_lists = {}
+        self.__sequence = 0
+        self.__journal_offset = 0
+        self.__snapshot_stamp = self.__get_snapshot_stamp()
+        if self.__snapshot_stamp is None:
+            return
+
+        with open(self.__snapshot_path, 'r') as file:
+            snapshot = json.load(file)
+        self.__task_lists = {task_list["taskListName"]: dict(task_list, tasks=self.__index_tasks(task_list["tasks"]))
+                             for task_list in snapshot["taskLists"]}
+        self.__sequence = snapshot.get("journalSequence", 0)
+
+    # -----------------------------------------------------------------------------
+    # __refresh
+    # -----------------------------------------------------------------------------
+    def __refresh(self, truncate: bool = False) -> None:
+        """Catches up with the storage, the lock file must be held (internal).
+
+        The snapshot is reloaded if another process compacted the journal, then the journal
+        records appended since the last refresh are replayed.
+
+        Args:
+            truncate (bool): True to cut a torn journal tail off, the lock file must then be held exclusively.
+        """
+        journal_size = os.path.getsize(self.__journal_path) if os.path.isfile(self.__journal_path) else 0
+        if self.__get_snapshot_stamp() != self.__snapshot_stamp or journal_size < self.__journal_offset:
+            self.__load_snapshot()
+        if journal_size == self.__journal_offset:
+            return
+
+        valid_size = self.__journal_offset
+        with open(self.__journal_path, 'rb') as file:
+            file.seek(self.__journal_offset)
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn record from an interrupted append, everything after it is dropped
+                    if truncate:
+                        logger.warning(f"Discarding corrupted journal tail at offset {valid_size}")
+                    break
+                valid_size += len(line)
+
+                # Records already folded into the snapshot are skipped
+                if record["seq"] > self.__sequence:
+                    try:
+                        self.__apply(record)
+                    except (KeyError, IndexError):
+                        logger.warning(f"Skipping journal record #{record['seq']} ({record['op']}),"
+                                       f" its TaskList or task doesn't exist")
+                    self.__sequence = record["seq"]
+
+        self.__journal_offset = valid_size
+        if truncate and valid_size != journal_size:
+            os.truncate(self.__journal_path, valid_size)
+
+    # -----------------------------------------------------------------------------
+    # __index_tasks
+    # -----------------------------------------------------------------------------
+    @staticmethod
+    def __index_tasks(tasks: list) -> dict:
+        """Indexes tasks by ID, in list order (internal).
+
+        Tasks without ID (legacy data) or with an already used ID get a key of their own,
+        they can only be changed by rewriting all the tasks of their TaskList.
+
+        Args:
+            tasks (list): Task dictionaries.
+
+        Returns:
+            dict: copies of the Task dictionaries, by ID.
+        """
+        indexed_tasks = {}
+        for task in tasks:
+            key = task.get("id")
+            if key is None or key in indexed_tasks:
+                key = object()
+            indexed_tasks[key] = dict(task)
+        return indexed_tasks
+
+    # -----------------------------------------------------------------------------
+    # __apply
+    # -----------------------------------------------------------------------------
+    def __apply(self, record: dict) -> None:
+        """Applies a journal record to the in-memory TaskLists (internal).
+
+        Args:
+            record (dict): journal record to apply.
+        """
+        op = record["op"]
+        if op == "create_list":
+            self.__task_lists[record["list"]] = {
+                "taskListName": record["list"],
+                "owners": list(record["owners"]),
+                "tags": list(record["tags"]),
+                "tasks": {}
+            }
+            for key in OPTIONAL_TASK_LIST_FIELDS:
+                if key in record:
+                    self.__task_lists[record["list"]][key] = record[key]
+            return
+
+        task_list = self.__task_lists[record["list"]]
+        if "task_id" in record:
+            # Journals written before task IDs addressed tasks by their 1-based position
+            tasks = list(task_list["tasks"].values())
+            if op == "add_task":
+                tasks.insert(record["task_id"] - 1, record["fields"])
+            elif op == "update_task":
+                tasks[record["task_id"] - 1] = dict(tasks[record["task_id"] - 1], **record["fields"])
+            else:
+                tasks.pop(record["task_id"] - 1)
+            task_list["tasks"] = self.__index_tasks(tasks)
+        elif op == "update_list":
+            # Fields no longer stored (e.g. the validation marker of older versions) are dropped
+            task_list.update({key: list(value) if isinstance(value, list) else value
+                              for key, value in record["fields"].items() if key in TASK_LIST_FIELDS})
+        elif op == "set_tasks":
+            task_list["tasks"] = self.__index_tasks(record["tasks"])
+        elif op == "add_task":
+            task_list["tasks"][record["fields"]["id"]] = dict(record["fields"])
+        elif op == "update_task":
+            # Copied rather than updated in place, stored tasks may be shared with the snapshot being written
+            task_list["tasks"][record["id"]] = dict(task_list["tasks"][record["id"]], **record["fields"])
+        elif op == "remove_task":
+            del task_list["tasks"][record["id"]]
+
+    # -----------------------------------------------------------------------------
+    # __diff
+    # -----------------------------------------------------------------------------
+    def __diff(self, task_list_dict: dict) -> list:
+        """Computes the journal records turning the stored TaskList into the given one (internal).
+
+        Tasks are matched by ID: as long as the kept tasks stay in order and the new ones are
+        appended, each change is journaled as its own record. Otherwise (tasks without ID,
+        reordered tasks) all the tasks are journaled at once by a set_tasks record.
+
+        Args:
+            task_list_dict (dict): The TaskList dictionary to write.
+
+        Returns:
+            list: The journal records (without sequence numbers), in application order.
+        """
+        name = task_list_dict["taskListName"]
+        new_tasks = task_list_dict.get("tasks", [])
+
+        records = []
+        stored = self.__task_lists.get(name)
+        if stored is None:
+            record = {"op": "create_list", "list": name,
+                      "owners": task_list_dict["owners"], "tags": task_list_dict["tags"]}
+            for key in OPTIONAL_TASK_LIST_FIELDS:
+                if key in task_list_dict:
+                    record[key] = task_list_dict[key]
+            records.append(record)
+            stored_tasks = {}
+        else:
+            fields = {key: task_list_dict[key] for key in TASK_LIST_FIELDS
+                      if key in task_list_dict and stored.get(key) != task_list_dict[key]}
+            if fields:
+                records.append({"op": "update_list", "list": name, "fields": fields})
+            stored_tasks = stored["tasks"]
+
+        task_ids = [task.get("id") for task in new_tasks]
+        new_ids = set(task_ids)
+        kept_ids = [task_id for task_id in stored_tasks if task_id in new_ids]
+        if (None in new_ids or len(new_ids) != len(task_ids) or task_ids[:len(kept_ids)] != kept_ids
+                or any("id" not in task for task in stored_tasks.values())):
+            if list(stored_tasks.values()) != new_tasks:
+                records.append({"op": "set_tasks", "list": name, "tasks": new_tasks})
+            return records
+
+        for task_id in stored_tasks:
+            if task_id not in new_ids:
+                records.append({"op": "remove_task", "list": name, "id": task_id})
+        for task in new_tasks[:len(kept_ids)]:
+            stored_task = stored_tasks[task["id"]]
+            fields = {key: value for key, value in task.items() if stored_task.get(key) != value}
+            if fields:
+                records.append({"op": "update_task", "list": name, "id": task["id"], "fields": fields})
+        for task in new_tasks[len(kept_ids):]:
+            records.append({"op": "add_task", "list": name, "fields": task})
+
+        return records
+
+    # -----------------------------------------------------------------------------
+    # __append
+    # -----------------------------------------------------------------------------
+    def __append(self, records: list) -> None:
+        """Appends records to the journal and applies them in memory (internal).
+
+        Args:
+            records (list): journal records (without sequence numbers).
+        """
+        lines = []
+        for record in records:
+            self.__sequence += 1
+            record["seq"] = self.__sequence
+            lines.append(json.dumps(record) + "\n")
+
+        self.__durability.append(self.__journal_path, "".join(lines).encode("utf-8"))
+        self.__journal_offset = os.path.getsize(self.__journal_path)
+
+        for record in records:
+            self.__apply(record)
+
+        if self.__journal_offset > self.__compaction_threshold:
+            self.compact()
+
+    # -----------------------------------------------------------------------------
+    # __copy_task_list
+    # -----------------------------------------------------------------------------
+    @staticmethod
+    def __copy_task_list(task_list: dict) -> dict:
+        """Copies a stored TaskList for its readers, which may then freely change it (internal).
+
+        Args:
+            task_list (dict): The stored TaskList.
+
+        Returns:
+            dict: The TaskList dictionary.
+        """
+        return {key: [dict(task) for task in value.values()] if key == "tasks"
+                else list(value) if isinstance(value, list) else value
+                for key, value in task_list.items()}
+
+    # -----------------------------------------------------------------------------
+    # Interface
+    # -----------------------------------------------------------------------------
+    # -----------------------------------------------------------------------------
+    # read_all
+    # -----------------------------------------------------------------------------
+    def read_all(self) -> list:
+        """Reads all TaskLists.
+
+        Returns:
+            list: A list of TaskList dictionaries.
+        """
+        with self.__lock, self.__file_lock.shared():
+            self.__refresh()
+            return [self.__copy_task_list(task_list) for task_list in self.__task_lists.values()]
+
+    # -----------------------------------------------------------------------------
+    # iter_task_lists
+    # -----------------------------------------------------------------------------
+    def iter_task_lists(self):
+        """Streams the TaskLists one at a time.
+
+        Yields:
+            dict: TaskList dictionaries, in creation order.
+        """
+        yield from self.read_all()
+
+    # -----------------------------------------------------------------------------
+    # read
+    # -----------------------------------------------------------------------------
+    def read(self, task_list_name: str) -> dict:
+        """Reads a specific TaskList.
+
+        Args:
+            task_list_name (str): The name of the TaskList.
+
+        Returns:
+            dict: The desired dictionary if successful, None otherwise.
+        """
+        with self.__lock, self.__file_lock.shared():
+            self.__refresh()
+            task_list = self.__task_lists.get(task_list_name)
+            return self.__copy_task_list(task_list) if task_list is not None else None
+
+    # -----------------------------------------------------------------------------
+    # write
+    # -----------------------------------------------------------------------------
+    def write(self, task_list_dict: dict) -> None:
+        """Adds or updates a TaskList by journaling the differences with its stored version.
+
+        Args:
+            task_list_dict: The TaskList dictionary to write.
+        """
+        self.write_many([task_list_dict])
+
+    # -----------------------------------------------------------------------------
+    # write_many
+    # -----------------------------------------------------------------------------
+    def write_many(self, task_list_dicts: list) -> None:
+        """Adds or updates several TaskLists with a single journal append.
+
+        Args:
+            task_list_dicts (list): The TaskList dictionaries to write.
+        """
+        # Records are diffed against the stored TaskLists, only the last version of each one is kept
+        latest = {task_list_dict["taskListName"]: task_list_dict for task_list_dict in task_list_dicts}
+
+        with self.__lock, self.__file_lock.exclusive():
+            # Records of other processes are replayed first, the diff and sequence numbers follow them
+            self.__refresh(truncate=True)
+            records = []
+            for task_list_dict in latest.values():
+                if task_list_dict["taskListName"] not in self.__task_lists:
+                    logger.info(f"TaskList {task_list_dict['taskListName']} wasn't found - hence got created")
+                records.extend(self.__diff(task_list_dict))
+
+            if records:
+                self.__append(records)
+
+    # -----------------------------------------------------------------------------
+    # write_delta
+    # -----------------------------------------------------------------------------
+    def write_delta(self, task_list_delta: dict) -> bool:
+        """Journals the changes of a stored TaskList straight from its delta, without diffing its tasks.
+
+        An empty delta doesn't append anything.
+
+        Args:
+            task_list_delta (dict): The delta, as returned by TaskList.get_delta.
+
+        Returns:
+            bool: True if records were appended, False if the delta was empty.
+
+        Raises:
+            ValueError: if the TaskList or the tasks changed by the delta aren't stored
+        """
+        name = task_list_delta["taskListName"]
+
+        with self.__lock, self.__file_lock.exclusive():
+            self.__refresh(truncate=True)
+            stored = self.__task_lists.get(name)
+            if stored is None:
+                logger.error(f"TaskList {name} wasn't found, its delta can't be written")
+                raise ValueError(f"TaskList {name} wasn't found, its delta can't be written")
+
+            stored_tasks = stored["tasks"]
+            changed_ids = [task["id"] for task in task_list_delta["updatedTasks"]] + task_list_delta["removedTaskIds"]
+            if any(task_id not in stored_tasks for task_id in changed_ids):
+                logger.error(f"TaskList {name} doesn't store the tasks changed by the delta")
+                raise ValueError(f"TaskList {name} doesn't store the tasks changed by the delta")
+
+            records = []
+            fields = {key: value for key, value in task_list_delta["fields"].items() if stored.get(key) != value}
+            if fields:
+                records.append({"op": "update_list", "list": name, "fields": fields})
+
+            for task in task_list_delta["updatedTasks"]:
+                fields = {key: value for key, value in task.items() if stored_tasks[task["id"]].get(key) != value}
+                if fields:
+                    records.append({"op": "update_task", "list": name, "id": task["id"], "fields": fields})
+            for task_id in task_list_delta["removedTaskIds"]:
+                records.append({"op": "remove_task", "list": name, "id": task_id})
+            for task in task_list_delta["addedTasks"]:
+                records.append({"op": "add_task", "list": name, "fields": task})
+
+            if records:
+                self.__append(records)
+        return bool(records)
+
+    # -----------------------------------------------------------------------------
+    # compact
+    # -----------------------------------------------------------------------------
+    def compact(self) -> None:
+        """Folds the journal into a new snapshot and empties the journal."""
+        with self.__lock, self.__file_lock.exclusive():
+            # Records appended by other processes are folded as well
+            self.__refresh(truncate=True)
+            snapshot = {"taskLists": [dict(task_list, tasks=list(task_list["tasks"].values()))
+                                      for task_list in self.__task_lists.values()],
+                        "journalSequence": self.__sequence}
+
+            # The snapshot records the last folded sequence number, a crash before the
+            # journal truncation is therefore harmless: those records are skipped on replay
+            self.__durability.atomic_write(self.__snapshot_path, json.dumps(snapshot).encode("utf-8"),
+                                           force_fsync=True)
+
+            with open(self.__journal_path, 'w'):
+                pass
+            self.__snapshot_stamp = self.__get_snapshot_stamp()
+            self.__journal_offset = 0
+            logger.debug(f"Journal compacted up to record #{self.__sequence}")
+
+    # -----------------------------------------------------------------------------
+    # migrate_from_json
+    # -----------------------------------------------------------------------------
+    def migrate_from_json(self, json_file_path) -> int:
+        """One-shot migration of a TaskMe data file into the journaled storage.
+
+        Args:
+            json_file_path: path of the TaskMe data file to migrate, in any data format.
+
+        Returns:
+            int: The number of migrated TaskLists.
+
+        Raises:
+            ValueError: if the data file doesn't exist
+        """
+        task_lists = read_data_file(json_file_path)
+
+        for task_list_dict in task_lists:
+            self.write(task_list_dict)
+        self.compact()
+
+        logger.info(f"Migrated {len(task_lists)} TaskList(s) from {json_file_path}")
+        return len(task_lists)
@@ -0,0 +1,385 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+from src import logger
+from src.System.TaskMeFileHandler.TaskMeFileHandler import read_data_file
+
+
+class TaskMeSQLiteHandler:
+    # TaskList dictionary field -> (task_lists column, encoder of its value)
+    __LIST_COLUMNS = {
+        "owners": ("owners", json.dumps),
+        "tags": ("tags", json.dumps),
+        "nextTaskId": ("next_task_id", None)
+    }
+
+    def __init__(self, db_path=None):
+        """Initialize a file handler for TaskMe SQLite storage.
+
+        The handler can be shared between threads, accesses to the connection are serialized.
+
+        Args:
+            db_path: path of the SQLite database, defaults to data/.taskme_data.db
+        """
+        self.__db_path = db_path if db_path is not None else self.__get_db_file_path()
+        logger.debug(f"Database file path: {self.__db_path}")
+        self.__connection = sqlite3.connect(self.__db_path, check_same_thread=False)
+        self.__lock = threading.RLock()
+        self.__initialize_schema()
+
+    # -----------------------------------------------------------------------------
+    # __get_db_file_path
+    # -----------------------------------------------------------------------------
+    @staticmethod
+    def __get_db_file_path():
+        # Retrieve the root TaskMe directory
+        parent_dir = Path(__file__).resolve().parents[3]
+
+        data_dir = parent_dir / "data"
+
+        # If the directory doesn't exist, create it
+        data_dir.mkdir(exist_ok=True)
+
+        # Define the database path inside the data directory
+        return data_dir / ".taskme_data.db"
+
+    # -----------------------------------------------------------------------------
+    # __initialize_schema
+    # -----------------------------------------------------------------------------
+    def __initialize_schema(self) -> None:
+        """Creates the TaskMe tables if they don't exist yet.
+
+        Task lists are keyed by a unique (hence indexed) name, tasks are keyed by their
+        task list and task ID so that a single task can be updated or removed without
+        touching the rest of the list; their rowid keeps the order of the list. Tasks
+        stored without ID (legacy data) have a NULL task ID. Databases created before
+        task IDs existed get the next_task_id column added, and their tasks, keyed by
+        position, are moved to the task ID keyed table.
+        """
+        self.__connection.execute("PRAGMA foreign_keys = ON")
+        with self.__connection:
+            self.__connection.execute("""
+                CREATE TABLE IF NOT EXISTS task_lists (
+                    list_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL UNIQUE,
+                    owners TEXT NOT NULL,
+                    tags TEXT NOT NULL,
+                    next_task_id INTEGER
+                )""")
+            columns = [row[1] for row in self.__connection.execute("PRAGMA table_info(task_lists)")]
+            if "next_task_id" not in columns:
+                self.__connection.execute("ALTER TABLE task_lists ADD COLUMN next_task_id INTEGER")
+
+            columns = [row[1] for row in self.__connection.execute("PRAGMA table_info(tasks)")]
+            if "position" in columns:
+                self.__connection.execute("ALTER TABLE tasks RENAME TO tasks_by_position")
+            self.__connection.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    row_id INTEGER PRIMARY KEY,
+                    list_id INTEGER NOT NULL REFERENCES task_lists(list_id) ON DELETE CASCADE,
+                    task_id INTEGER,
+                    payload TEXT NOT NULL,
+                    UNIQUE (list_id, task_id)
+                )""")
+            if "position" in columns:
+                rows = self.__connection.execute("SELECT list_id, payload FROM tasks_by_position "
+                                                 "ORDER BY list_id, position")
+                self.__connection.executemany("INSERT INTO tasks (list_id, task_id, payload) VALUES (?, ?, ?)",
+                                              [(list_id, json.loads(payload).get("id"), payload)
+                                               for list_id, payload in rows])
+                self.__connection.execute("DROP TABLE tasks_by_position")
+                logger.info("Tasks of the database are now keyed by task ID")
+
+    # -----------------------------------------------------------------------------
+    # __to_task_list_dict
+    # -----------------------------------------------------------------------------
+    @staticmethod
+    def __to_task_list_dict(name: str, owners: str, tags: str, next_task_id, tasks: list) -> dict:
+        """Builds a TaskList dictionary from a task_lists row (internal).
+
+        Args:
+            name (str): name of the TaskList.
+            owners (str): JSON encoded owners.
+            tags (str): JSON encoded tags.
+            next_task_id: next task ID of the TaskList, None if never stored.
+            tasks (list): Task dictionaries of the TaskList.
+
+        Returns:
+            dict: The TaskList dictionary.
+        """
+        task_list_dict = {
+            "taskListName": name,
+            "owners": json.loads(owners),
+            "tags": json.loads(tags),
+            "tasks": tasks
+        }
+        if next_task_id is not None:
+            task_list_dict["nextTaskId"] = next_task_id
+        return task_list_dict
+
+    # -----------------------------------------------------------------------------
+    # __read_tasks
+    # -----------------------------------------------------------------------------
+    def __read_tasks(self, list_id: int) -> list:
+        """Reads the tasks of a TaskList, in list order (internal).
+
+        Args:
+            list_id (int): internal id of the TaskList.
+
+        Returns:
+            list: A list of Task dictionaries.
+        """
+        rows = self.__connection.execute("SELECT payload FROM tasks WHERE list_id = ? ORDER BY row_id", (list_id,))
+        return [json.loads(payload) for (payload,) in rows]
+
+    # -----------------------------------------------------------------------------
+    # __write_task_list
+    # -----------------------------------------------------------------------------
+    def __write_task_list(self, task_list_dict: dict) -> None:
+        """Upserts a TaskList, only touching the rows that changed (internal).
+
+        Must be called within a transaction.
+
+        Args:
+            task_list_dict (dict): The TaskList dictionary to write.
+        """
+        name = task_list_dict["taskListName"]
+        owners = json.dumps(task_list_dict["owners"])
+        tags = json.dumps(task_list_dict["tags"])
+        next_task_id = task_list_dict.get("nextTaskId")
+
+        row = self.__connection.execute("SELECT list_id FROM task_lists WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            logger.info(f"TaskList {name} wasn't found - hence got created")
+            list_id = self.__connection.execute("INSERT INTO task_lists (name, owners, tags, next_task_id) "
+                                                "VALUES (?, ?, ?, ?)", (name, owners, tags, next_task_id)).lastrowid
+        else:
+            list_id = row[0]
+            self.__connection.execute("UPDATE task_lists SET owners = ?, tags = ?, next_task_id = ? "
+                                      "WHERE list_id = ? AND (owners != ? OR tags != ? OR next_task_id IS NOT ?)",
+                                      (owners, tags, next_task_id, list_id, owners, tags, next_task_id))
+
+        self.__write_tasks(list_id, task_list_dict.get("tasks", []))
+
+    # -----------------------------------------------------------------------------
+    # __write_tasks
+    # -----------------------------------------------------------------------------
+    def __write_tasks(self, list_id: int, tasks: list) -> None:
+        """Replaces the tasks of a TaskList, only touching the rows that changed (internal).
+
+        Tasks are matched by ID: as long as the kept tasks stay in order and the new ones
+        are appended, removed tasks are deleted, added ones inserted and changed ones
+        updated. Otherwise (legacy tasks without ID, reordered tasks) every row is rewritten.
+        Must be called within a transaction.
+
+        Args:
+            list_id (int): internal id of the TaskList.
+            tasks (list): Task dictionaries of the TaskList.
+        """
+        stored = self.__connection.execute("SELECT task_id, payload FROM tasks WHERE list_id = ? ORDER BY row_id",
+                                           (list_id,)).fetchall()
+        stored_payloads = dict(stored)
+        task_ids = [task_dict.get("id") for task_dict in tasks]
+        new_ids = set(task_ids)
+        kept_ids = [task_id for task_id, _ in stored if task_id in new_ids]
+
+        if (None in stored_payloads or None in new_ids or len(new_ids) != len(task_ids)
+                or task_ids[:len(kept_ids)] != kept_ids):
+            self.__connection.execute("DELETE FROM tasks WHERE list_id = ?", (list_id,))
+            self.__connection.executemany("INSERT INTO tasks (list_id, task_id, payload) VALUES (?, ?, ?)",
+                                          [(list_id, task_dict.get("id"), json.dumps(task_dict)) for task_dict in tasks])
+            return
+
+        removed_ids = stored_payloads.keys() - set(kept_ids)
+        self.__connection.executemany("DELETE FROM tasks WHERE list_id = ? AND task_id = ?",
+                                      [(list_id, task_id) for task_id in removed_ids])
+
+        changed_rows = []
+        for task_dict in tasks[:len(kept_ids)]:
+            payload = json.dumps(task_dict)
+            if stored_payloads[task_dict["id"]] != payload:
+                changed_rows.append((payload, list_id, task_dict["id"]))
+        self.__connection.executemany("UPDATE tasks SET payload = ? WHERE list_id = ? AND task_id = ?", changed_rows)
+
+        self.__connection.executemany("INSERT INTO tasks (list_id, task_id, payload) VALUES (?, ?, ?)",
+                                      [(list_id, task_dict["id"], json.dumps(task_dict))
+                                       for task_dict in tasks[len(kept_ids):]])
+
+    # -----------------------------------------------------------------------------
+    # Interface
+    # -----------------------------------------------------------------------------
+    # -----------------------------------------------------------------------------
+    # read_all
+    # -----------------------------------------------------------------------------
+    def read_all(self) -> list:
+        """Reads all TaskLists from the database.
+
+        Returns:
+            list: A list of TaskList dictionaries.
+        """
+        task_lists = {}
+        with self.__lock:
+            for list_id, name, owners, tags, next_task_id in self.__connection.execute(
+                    "SELECT list_id, name, owners, tags, next_task_id FROM task_lists ORDER BY list_id"):
+                task_lists[list_id] = self.__to_task_list_dict(name, owners, tags, next_task_id, [])
+
+            for list_id, payload in self.__connection.execute(
+                    "SELECT list_id, payload FROM tasks ORDER BY list_id, row_id"):
+                task_lists[list_id]["tasks"].append(json.loads(payload))
+
+        return list(task_lists.values())
+
+    # -----------------------------------------------------------------------------
+    # iter_task_lists
+    # -----------------------------------------------------------------------------
+    def iter_task_lists(self):
+        """Streams the TaskLists one at a time, only loading the tasks of the current one.
+
+        Yields:
+            dict: TaskList dictionaries, in creation order.
+        """
+        with self.__lock:
+            task_list_rows = self.__connection.execute(
+                "SELECT list_id, name, owners, tags, next_task_id FROM task_lists ORDER BY list_id").fetchall()
+        for list_id, name, owners, tags, next_task_id in task_list_rows:
+            with self.__lock:
+                tasks = self.__read_tasks(list_id)
+            yield self.__to_task_list_dict(name, owners, tags, next_task_id, tasks)
+
+    # -----------------------------------------------------------------------------
+    # read
+    # -----------------------------------------------------------------------------
+    def read(self, task_list_name: str) -> dict:
+        """Reads a specific TaskList.
+
+        Args:
+            task_list_name (str): The name of the TaskList.
+
+        Returns:
+            dict: The desired dictionary if successful, None otherwise.
+        """
+        with self.__lock:
+            row = self.__connection.execute("SELECT list_id, owners, tags, next_task_id FROM task_lists "
+                                            "WHERE name = ?", (task_list_name,)).fetchone()
+            if row is None:
+                return None
+
+            list_id, owners, tags, next_task_id = row
+            tasks = self.__read_tasks(list_id)
+
+        return self.__to_task_list_dict(task_list_name, owners, tags, next_task_id, tasks)
+
+    # -----------------------------------------------------------------------------
+    # write
+    # -----------------------------------------------------------------------------
+    def write(self, task_list_dict: dict) -> None:
+        """Adds or updates a TaskList in the database.
+
+        Args:
+            task_list_dict: The TaskList dictionary to write.
+        """
+        self.write_many([task_list_dict])
+
+    # -----------------------------------------------------------------------------
+    # write_many
+    # -----------------------------------------------------------------------------
+    def write_many(self, task_list_dicts: list) -> None:
+        """Adds or updates several TaskLists within a single transaction.
+
+        Args:
+            task_list_dicts (list): The TaskList dictionaries to write.
+        """
+        with self.__lock, self.__connection:
+            for task_list_dict in task_list_dicts:
+                self.__write_task_list(task_list_dict)
+
+    # -----------------------------------------------------------------------------
+    # write_delta
+    # -----------------------------------------------------------------------------
+    def write_delta(self, task_list_delta: dict) -> bool:
+        """Writes the changes of a stored TaskList, only the rows of its changed tasks are touched.
+
+        An empty delta doesn't touch the database at all.
+
+        Args:
+            task_list_delta (dict): The delta, as returned by TaskList.get_delta.
+
+        Returns:
+            bool: True if the database was written, False if the delta was empty.
+
+        Raises:
+            ValueError: if the TaskList or the tasks changed by the delta aren't stored
+        """
+        name = task_list_delta["taskListName"]
+        if not any(task_list_delta[key] for key in ("fields", "addedTasks", "updatedTasks", "removedTaskIds")):
+            logger.debug(f"TaskList {name} unchanged, nothing to write")
+            return False
+
+        with self.__lock, self.__connection:
+            row = self.__connection.execute("SELECT list_id FROM task_lists WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                logger.error(f"TaskList {name} wasn't found, its delta can't be written")
+                raise ValueError(f"TaskList {name} wasn't found, its delta can't be written")
+            list_id = row[0]
+
+            for field, value in task_list_delta["fields"].items():
+                column, encode = self.__LIST_COLUMNS[field]
+                self.__connection.execute(f"UPDATE task_lists SET {column} = ? WHERE list_id = ?",
+                                          (encode(value) if encode is not None else value, list_id))
+
+            # A missing task rolls the whole transaction back
+            missing = False
+            for task in task_list_delta["updatedTasks"]:
+                row = self.__connection.execute("SELECT payload FROM tasks WHERE list_id = ? AND task_id = ?",
+                                                (list_id, task["id"])).fetchone()
+                if row is None:
+                    missing = True
+                    continue
+                self.__connection.execute("UPDATE tasks SET payload = ? WHERE list_id = ? AND task_id = ?",
+                                          (json.dumps(dict(json.loads(row[0]), **task)), list_id, task["id"]))
+            for task_id in task_list_delta["removedTaskIds"]:
+                cursor = self.__connection.execute("DELETE FROM tasks WHERE list_id = ? AND task_id = ?",
+                                                   (list_id, task_id))
+                missing = missing or cursor.rowcount == 0
+            if missing:
+                logger.error(f"TaskList {name} doesn't store the tasks changed by the delta")
+                raise ValueError(f"TaskList {name} doesn't store the tasks changed by the delta")
+
+            self.__connection.executemany("INSERT INTO tasks (list_id, task_id, payload) VALUES (?, ?, ?)",
+                                          [(list_id, task["id"], json.dumps(task))
+                                           for task in task_list_delta["addedTasks"]])
+        return True
+
+    # -----------------------------------------------------------------------------
+    # migrate_from_json
+    # -----------------------------------------------------------------------------
+    def migrate_from_json(self, json_file_path) -> int:
+        """One-shot migration of a TaskMe data file into the database.
+
+        TaskLists already present in the database are overwritten by their data file version.
+
+        Args:
+            json_file_path: path of the TaskMe data file to migrate, in any data format.
+
+        Returns:
+            int: The number of migrated TaskLists.
+
+        Raises:
+            ValueError: if the data file doesn't exist
+        """
+        task_lists = read_data_file(json_file_path)
+
+        self.write_many(task_lists)
+
+        logger.info(f"Migrated {len(task_lists)} TaskList(s) from {json_file_path}")
+        return len(task_lists)
+
+    # -----------------------------------------------------------------------------
+    # close
+    # -----------------------------------------------------------------------------
+    def close(self) -> None:
+        """Closes the database connection."""
+        with self.__lock:
+            self.__connection.close()
@@ -0,0 +1,711 @@
+import json
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from heapq import nsmallest
+from pathlib import Path
+
+from src import logger
+
+# Bumped whenever the schema changes, outdated indexes are dropped and rebuilt from the storage
+SCHEMA_VERSION = 2
+
+# Indexed fields: the task fields first, then the TaskList fields
+TASK_FIELDS = ("assignee", "word")
+LIST_FIELDS = ("owner", "tag")
+SEARCH_FIELDS = TASK_FIELDS + LIST_FIELDS
+
+# Task ID of the postings of the TaskList fields, real task IDs start at 1
+_LIST_POSTING_ID = 0
+
+# Words of the task names count as many times in the relevance of a task
+NAME_WEIGHT = 2
+
+# BM25 parameters: term frequency saturation and document length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD_PATTERN = re.compile(r"\w+")
+_QUERY_WORD_PATTERN = re.compile(r"(\w+)(\*?)")
+
+
+# -----------------------------------------------------------------------------
+# normalize_term
+# -----------------------------------------------------------------------------
+def normalize_term(value) -> str:
+    """Normalizes an exact-match value (assignee, owner or tag), searches are case-insensitive.
+
+    Args:
+        value: value to normalize, converted to a string if needed.
+
+    Returns:
+        str: The normalized term.
+    """
+    return str(value).strip().casefold()
+
+
+# -----------------------------------------------------------------------------
+# tokenize
+# -----------------------------------------------------------------------------
+def tokenize(text: str) -> list:
+    """Splits a free text (task name or description) into lowercase words.
+
+    Args:
+        text (str): text to split.
+
+    Returns:
+        list: The words of the text, in order.
+    """
+    return _WORD_PATTERN.findall(text.casefold())
+
+
+# -----------------------------------------------------------------------------
+# parse_query
+# -----------------------------------------------------------------------------
+def parse_query(text: str) -> list:
+    """Splits a full-text query into words, a word ending with '*' matches every word starting with it.
+
+    Args:
+        text (str): query to split.
+
+    Returns:
+        list: (word, is_prefix) pairs, without duplicates.
+    """
+    return list(dict.fromkeys((word, star == "*") for word, star in _QUERY_WORD_PATTERN.findall(text.casefold())))
+
+
+# -----------------------------------------------------------------------------
+# search_storage
+# -----------------------------------------------------------------------------
+def search_storage(file_handler, **criteria) -> list:
+    """Searches the tasks of every TaskList of a storage, whatever its backend.
+
+    Storages maintaining a search index answer from it, the other ones get a transient
+    in-memory index built from their TaskLists.
+
+    Args:
+        file_handler: file handler of the storage
+        **criteria: search criteria, see TaskMeSearchIndex.search
+
+    Returns:
+        list: (TaskList name, Task dictionary) pairs of the matching tasks.
+    """
+    if hasattr(file_handler, "search"):
+        return file_handler.search(**criteria)
+
+    return search_task_lists(file_handler.iter_task_lists(), **criteria)
+
+
+# -----------------------------------------------------------------------------
+# search_task_lists
+# -----------------------------------------------------------------------------
+def search_task_lists(task_lists, **criteria) -> list:
+    """Searches the tasks of the given TaskLists through a transient in-memory index.
+
+    Args:
+        task_lists: iterable over TaskList dictionaries
+        **criteria: search criteria, see TaskMeSearchIndex.search
+
+    Returns:
+        list: (TaskList name, Task dictionary) pairs of the matching tasks.
+    """
+    search_index = TaskMeSearchIndex(":memory:")
+    try:
+        search_index.sync(task_lists)
+        return search_index.search(**criteria)
+    finally:
+        search_index.close()
+
+
+class TaskMeSearchIndex:
+    def __init__(self, index_path=None):
+        """Initialize a persisted inverted index over the tasks of every TaskList.
+
+        Tasks are indexed by assignee and by the words of their name and description (along with
+        their frequency, for relevance ranking), TaskLists by owner and tag. The index is updated
+        incrementally, only the tasks whose content changed since the last update get re-indexed,
+        and keeps a copy of the indexed tasks so that search results don't need the storage. The
+        stamp of the data the index was built from is recorded along with it, so that a stale index
+        can be detected and synchronized. The index can be shared between threads, accesses to the
+        connection are serialized.
+
+        Args:
+            index_path: path of the SQLite database of the index, defaults to data/.taskme_search.db,
+                ':memory:' for a transient index
+        """
+        self.__index_path = index_path if index_path is not None else self.__get_index_file_path()
+        logger.debug(f"Search index path: {self.__index_path}")
+        self.__connection = sqlite3.connect(str(self.__index_path), check_same_thread=False)
+        self.__lock = threading.RLock()
+        self.__initialize_schema()
+
+    # -----------------------------------------------------------------------------
+    # __get_index_file_path
+    # -----------------------------------------------------------------------------
+    @staticmethod
+    def __get_index_file_path():
+        # Retrieve the root TaskMe directory
+        parent_dir = Path(__file__).resolve().parents[3]
+
+        data_dir = parent_dir / "data"
+
+        # If the directory doesn't exist, create it
+        data_dir.mkdir(exist_ok=True)
+
+        # Define the index path inside the data directory
+        return data_dir / ".taskme_search.db"
+
+    # -----------------------------------------------------------------------------
+    # __initialize_schema
+    # -----------------------------------------------------------------------------
+    def __initialize_schema(self) -> None:
+        """Creates the index tables, dropping the ones of an outdated schema.
+
+        Postings are keyed by (field, term) first so that a lookup, or a prefix expansion, is a single
+        range scan. They carry the frequency of the term and the length of the task, so that ranking
+        never needs the tasks table. TaskList fields are posted with task ID 0. The number of tasks
+        containing each word is kept aside, for ranking and prefix expansion. The index is derived
+        data: the WAL journal is only synced at checkpoints, a crash at worst loses the last updates,
+        caught by the stamp check.
+        """
+        self.__connection.execute("PRAGMA journal_mode = WAL")
+        self.__connection.execute("PRAGMA synchronous = NORMAL")
+        with self.__connection:
+            (version,) = self.__connection.execute("PRAGMA user_version").fetchone()
+            if version != SCHEMA_VERSION:
+                if version != 0:
+                    logger.info(f"Search index schema changed (version {version}), rebuilding it")
+                for table in ("meta", "task_lists", "tasks", "postings", "terms"):
+                    self.__connection.execute(f"DROP TABLE IF EXISTS {table}")
+                self.__connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+            self.__connection.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )""")
+            self.__connection.execute("""
+                CREATE TABLE IF NOT EXISTS task_lists (
+                    list_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL UNIQUE,
+                    fields TEXT NOT NULL
+                )""")
+            self.__connection.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    list_id INTEGER NOT NULL,
+                    task_id INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    PRIMARY KEY (list_id, task_id)
+                ) WITHOUT ROWID""")
+            self.__connection.execute("""
+                CREATE TABLE IF NOT EXISTS postings (
+                    field TEXT NOT NULL,
+                    term TEXT NOT NULL,
+                    list_id INTEGER NOT NULL,
+                    task_id INTEGER NOT NULL,
+                    frequency INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    PRIMARY KEY (field, term, list_id, task_id)
+                ) WITHOUT ROWID""")
+            self.__connection.execute("""
+                CREATE TABLE IF NOT EXISTS terms (
+                    term TEXT PRIMARY KEY,
+                    documents INTEGER NOT NULL
+                ) WITHOUT ROWID""")
+
+    # -----------------------------------------------------------------------------
+    # __task_terms
+    # -----------------------------------------------------------------------------
+    @staticmethod
+    def __task_terms(task_dict: dict) -> tuple:
+        """Terms a task is indexed under (internal).
+
+        Args:
+            task_dict (dict): The Task dictionary.
+
+        Returns:
+            tuple: (field, term) -> frequency mapping and length (weighted number of words) of the task.
+        """
+        name_words = tokenize(str(task_dict.get("name") or ""))
+        description_words = tokenize(str(task_dict.get("description") or ""))
+        frequencies = Counter(description_words)
+        for word in name_words:
+            frequencies[word] += NAME_WEIGHT
+
+        terms = {("word", word): frequency for word, frequency in frequencies.items()}
+        if task_dict.get("assignee"):
+            terms[("assignee", normalize_term(task_dict["assignee"]))] = 1
+        return terms, NAME_WEIGHT * len(name_words) + len(description_words)
+
+    # -----------------------------------------------------------------------------
+    # __task_postings
+    # -----------------------------------------------------------------------------
+    @classmethod
+    def __task_postings(cls, list_id: int, task_id: int, task_dict: dict) -> tuple:
+        """Postings of a task (internal).
+
+        Args:
+            list_id (int): internal id of the TaskList.
+            task_id (int): ID of the task.
+            task_dict (dict): The Task dictionary.
+
+        Returns:
+            tuple: (field, term, list_id, task_id, frequency, length) rows and length of the task.
+        """
+        terms, length = cls.__task_terms(task_dict)
+        return [(field, term, list_id, task_id, frequency, length)
+                for (field, term), frequency in terms.items()], length
+
+    # -----------------------------------------------------------------------------
+    # __list_postings
+    # -----------------------------------------------------------------------------
+    @staticmethod
+    def __list_postings(list_id: int, fields: str) -> list:
+        """Postings of the TaskList fields (internal).
+
+        Args:
+            list_id (int): internal id of the TaskList.
+            fields (str): JSON encoded [owners, tags] of the TaskList.
+
+        Returns:
+            list: (field, term, list_id, task_id, frequency, length) rows.
+        """
+        return [(field, normalize_term(value), list_id, _LIST_POSTING_ID, 1, 0)
+                for field, values in zip(LIST_FIELDS, json.loads(fields)) for value in values]
+
+    # -----------------------------------------------------------------------------
+    # __delete_postings
+    # -----------------------------------------------------------------------------
+    def __delete_postings(self, list_id: int, tasks: list) -> int:
+        """Removes the postings of indexed tasks, found back from their indexed content (internal).
+
+        Args:
+            list_id (int): internal id of the TaskList.
+            tasks (list): (task ID, indexed payload) pairs of the tasks.
+
+        Returns:
+            int: The total length of the tasks.
+        """
+        rows = []
+        total_length = 0
+        for task_id, payload in tasks:
+            postings, length = self.__task_postings(list_id, task_id, json.loads(payload))
+            rows.extend(posting[:4] for posting in postings)
+            total_length += length
+        self.__connection.executemany("DELETE FROM postings WHERE field = ? AND term = ? AND list_id = ? "
+                                      "AND task_id = ?", rows)
+        self.__update_document_frequencies(Counter({term: -count for term, count in
+                                                    Counter(row[1] for row in rows if row[0] == "word").items()}))
+        return total_length
+
+    # -----------------------------------------------------------------------------
+    # __update_document_frequencies
+    # -----------------------------------------------------------------------------
+    def __update_document_frequencies(self, changes: Counter) -> None:
+        """Adds to the number of tasks containing words, must be called within a transaction (internal).
+
+        Args:
+            changes (Counter): word -> number of added tasks, negative when tasks got removed.
+        """
+        self.__connection.executemany("INSERT INTO terms (term, documents) VALUES (?, ?) "
+                                      "ON CONFLICT (term) DO UPDATE SET documents = documents + excluded.documents",
+                                      changes.items())
+        self.__connection.executemany("DELETE FROM terms WHERE term = ? AND documents <= 0",
+                                      [(term,) for term, change in changes.items() if change < 0])
+
+    # -----------------------------------------------------------------------------
+    # __update_statistics
+    # -----------------------------------------------------------------------------
+    def __update_statistics(self, task_count: int, total_length: int) -> None:
+        """Adds to the number of indexed tasks and their total length, must be called within a transaction
+        (internal).
+
+        Args:
+            task_count (int): number of added tasks, negative when tasks got removed.
+            total_length (int): length of the added tasks, negative when tasks got removed.
+        """
+        stored_count, stored_length = self.__get_statistics()
+        self.__connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('statistics', ?)",
+                                  (json.dumps([stored_count + task_count, stored_length + total_length]),))
+
+    # -----------------------------------------------------------------------------
+    # __get_statistics
+    # -----------------------------------------------------------------------------
+    def __get_statistics(self) -> tuple:
+        """Number of indexed tasks and their total length, used by the ranking (internal).
+
+        Returns:
+            tuple: (task count, total length).
+        """
+        row = self.__connection.execute("SELECT value FROM meta WHERE key = 'statistics'").fetchone()
+        return tuple(json.loads(row[0])) if row is not None else (0, 0)
+
+    # -----------------------------------------------------------------------------
+    # __insert_postings
+    # -----------------------------------------------------------------------------
+    def __insert_postings(self, rows: list) -> None:
+        """Inserts postings (internal).
+
+        Args:
+            rows (list): (field, term, list_id, task_id, frequency, length) rows.
+        """
+        self.__connection.executemany("INSERT OR REPLACE INTO postings (field, term, list_id, task_id, frequency, "
+                                      "length) VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    # -----------------------------------------------------------------------------
+    # __index_task_list
+    # -----------------------------------------------------------------------------
+    def __index_task_list(self, task_list_dict: dict) -> int:
+        """Re-indexes the parts of a TaskList that changed, must be called within a transaction (internal).
+
+        Args:
+            task_list_dict (dict): The TaskList dictionary.
+
+        Returns:
+            int: The number of re-indexed tasks.
+        """
+        name = task_list_dict["taskListName"]
+        owners = task_list_dict.get("owners") or []
+        tags = task_list_dict.get("tags") or []
+        fields = json.dumps([owners, tags])
+
+        row = self.__connection.execute("SELECT list_id, fields FROM task_lists WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            list_id = self.__connection.execute("INSERT INTO task_lists (name, fields) VALUES (?, ?)",
+                                                (name, fields)).lastrowid
+            stored_fields = None
+        else:
+            list_id, stored_fields = row
+
+        if stored_fields != fields:
+            self.__connection.execute("UPDATE task_lists SET fields = ? WHERE list_id = ?", (fields, list_id))
+            if stored_fields is not None:
+                self.__connection.executemany("DELETE FROM postings WHERE field = ? AND term = ? AND list_id = ? "
+                                              "AND task_id = ?",
+                                              [posting[:4] for posting in self.__list_postings(list_id, stored_fields)])
+            self.__insert_postings(self.__list_postings(list_id, fields))
+
+        # Tasks are compared on their serialized content, unchanged ones are left untouched
+        stored = dict(self.__connection.execute("SELECT task_id, payload FROM tasks WHERE list_id = ?", (list_id,)))
+        stale_postings = []
+        task_rows = []
+        posting_rows = []
+        total_length = 0
+        for position, task_dict in enumerate(task_list_dict.get("tasks", []), 1):
+            # Tasks written before task IDs existed are identified by their position
+            task_id = task_dict.get("id", position)
+            payload = json.dumps(task_dict, sort_keys=True)
+            previous = stored.pop(task_id, None)
+            if previous == payload:
+                continue
+
+            if previous is not None:
+                stale_postings.append((task_id, previous))
+            task_rows.append((list_id, task_id, payload))
+            postings, length = self.__task_postings(list_id, task_id, task_dict)
+            posting_rows.extend(postings)
+            total_length += length
+
+        # Whatever wasn't matched got removed from the TaskList
+        self.__connection.executemany("DELETE FROM tasks WHERE list_id = ? AND task_id = ?",
+                                      [(list_id, task_id) for task_id in stored])
+        total_length -= self.__delete_postings(list_id, stale_postings + list(stored.items()))
+        self.__connection.executemany("INSERT OR REPLACE INTO tasks (list_id, task_id, payload) VALUES (?, ?, ?)",
+                                      task_rows)
+        self.__insert_postings(posting_rows)
+        self.__update_document_frequencies(Counter(row[1] for row in posting_rows if row[0] == "word"))
+        self.__update_statistics(len(task_rows) - len(stale_postings) - len(stored), total_length)
+        return len(task_rows)
+
+    # -----------------------------------------------------------------------------
+    # __set_stamp
+    # -----------------------------------------------------------------------------
+    def __set_stamp(self, stamp) -> None:
+        """Records the stamp of the indexed data, must be called within a transaction (internal).
+
+        Args:
+            stamp: stamp of the indexed data, None if unknown.
+        """
+        if stamp is None:
+            self.__connection.execute("DELETE FROM meta WHERE key = 'stamp'")
+        else:
+            self.__connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('stamp', ?)",
+                                      (json.dumps(list(stamp)),))
+
+    # -----------------------------------------------------------------------------
+    # Interface
+    # -----------------------------------------------------------------------------
+    # -----------------------------------------------------------------------------
+    # is_current
+    # -----------------------------------------------------------------------------
+    def is_current(self, stamp) -> bool:
+        """Tells whether the index was built from the data with the given stamp.
+
+        Args:
+            stamp: stamp of the current data, None if unknown.
+
+        Returns:
+            bool: True if the index is up to date with the data.
+        """
+        if stamp is None:
+            return False
+        with self.__lock:
+            row = self.__connection.execute("SELECT value FROM meta WHERE key = 'stamp'").fetchone()
+        return row is not None and json.loads(row[0]) == list(stamp)
+
+    # -----------------------------------------------------------------------------
+    # update
+    # -----------------------------------------------------------------------------
+    def update(self, task_list_dicts: list, stamp=None) -> int:
+        """Re-indexes written TaskLists, within a single transaction.
+
+        Args:
+            task_list_dicts (list): The written TaskList dictionaries.
+            stamp: stamp of the data once written, None if unknown.
+
+        Returns:
+            int: The number of re-indexed tasks.
+        """
+        with self.__lock, self.__connection:
+            reindexed = sum(self.__index_task_list(task_list_dict) for task_list_dict in task_list_dicts)
+            self.__set_stamp(stamp)
+        logger.debug(f"Search index updated, {reindexed} task(s) re-indexed")
+        return reindexed
+
+    # -----------------------------------------------------------------------------
+    # sync
+    # -----------------------------------------------------------------------------
+    def sync(self, task_lists, stamp=None) -> int:
+        """Synchronizes the index with every TaskList of the storage, within a single transaction.
+
+        Only the changed tasks get re-indexed, TaskLists that no longer exist are dropped.
+
+        Args:
+            task_lists: iterable over every TaskList dictionary, e.g. a streaming read of the storage.
+            stamp: stamp of the data the TaskLists were read from, None if unknown.
+
+        Returns:
+            int: The number of re-indexed tasks.
+        """
+        with self.__lock, self.__connection:
+            reindexed = 0
+            names = set()
+            for task_list_dict in task_lists:
+                # Like the storages, the first TaskList of a given name wins
+                if task_list_dict["taskListName"] in names:
+                    continue
+                names.add(task_list_dict["taskListName"])
+                reindexed += self.__index_task_list(task_list_dict)
+
+            removed = [(list_id, fields) for list_id, name, fields
+                       in self.__connection.execute("SELECT list_id, name, fields FROM task_lists").fetchall()
+                       if name not in names]
+            for list_id, fields in removed:
+                tasks = self.__connection.execute("SELECT task_id, payload FROM tasks WHERE list_id = ?",
+                                                  (list_id,)).fetchall()
+                self.__update_statistics(-len(tasks), -self.__delete_postings(list_id, tasks))
+                self.__connection.executemany("DELETE FROM postings WHERE field = ? AND term = ? AND list_id = ? "
+                                              "AND task_id = ?",
+                                              [posting[:4] for posting in self.__list_postings(list_id, fields)])
+                self.__connection.execute("DELETE FROM tasks WHERE list_id = ?", (list_id,))
+                self.__connection.execute("DELETE FROM task_lists WHERE list_id = ?", (list_id,))
+            self.__set_stamp(stamp)
+        logger.info(f"Search index synchronized, {reindexed} task(s) re-indexed")
+        return reindexed
+
+    # -----------------------------------------------------------------------------
+    # __select_matches
+    # -----------------------------------------------------------------------------
+    @staticmethod
+    def __select_matches(terms: list, task_list) -> tuple:
+        """Builds the query selecting the tasks matching every exact-match criterion (internal).
+
+        Args:
+            terms (list): (field, term) pairs the tasks must be posted under.
+            task_list: name of the only TaskList to search, None for every TaskList.
+
+        Returns:
+            tuple: The query selecting (list_id, task_id) pairs, and its parameters.
+        """
+        # Every criterion selects (list_id, task_id) pairs, TaskList criteria select all of their tasks
+        selects = []
+        params = []
+        for field, term in terms:
+            if field in LIST_FIELDS:
+                selects.append("SELECT tasks.list_id, tasks.task_id FROM postings "
+                               "JOIN tasks ON tasks.list_id = postings.list_id "
+                               "WHERE postings.field = ? AND postings.term = ?")
+            else:
+                selects.append("SELECT list_id, task_id FROM postings WHERE field = ? AND term = ?")
+            params += [field, term]
+        if task_list is not None:
+            selects.append("SELECT list_id, task_id FROM tasks "
+                           "WHERE list_id = (SELECT list_id FROM task_lists WHERE name = ?)")
+            params.append(task_list)
+        return " INTERSECT ".join(selects), params
+
+    # -----------------------------------------------------------------------------
+    # __expand
+    # -----------------------------------------------------------------------------
+    def __expand(self, word: str, is_prefix: bool) -> list:
+        """Indexed words matching a query word, with the number of tasks containing them (internal).
+
+        Args:
+            word (str): query word.
+            is_prefix (bool): whether every word starting with the query word matches.
+
+        Returns:
+            list: (word, number of tasks) pairs.
+        """
+        if not is_prefix:
+            return self.__connection.execute("SELECT term, documents FROM terms WHERE term = ?", (word,)).fetchall()
+
+        # Words starting with the prefix sort between the prefix and its successor
+        return self.__connection.execute("SELECT term, documents FROM terms WHERE term >= ? AND term < ?",
+                                         (word, word[:-1] + chr(ord(word[-1]) + 1))).fetchall()
+
+    # -----------------------------------------------------------------------------
+    # __rank
+    # -----------------------------------------------------------------------------
+    def __rank(self, query_words: list, terms: list, task_list, limit) -> list:
+        """Finds the tasks containing every query word, by decreasing BM25 relevance (internal).
+
+        The rarest query word drives the search: its tasks are the candidates, the other words are
+        then either merged from their own postings or looked up task by task, whichever reads less.
+
+        Args:
+            query_words (list): (word, is_prefix) pairs.
+            terms (list): (field, term) pairs of the exact-match criteria.
+            task_list: name of the only TaskList to search, None for every TaskList.
+            limit: maximum number of tasks, None for all of them.
+
+        Returns:
+            list: (list_id, task_id) pairs of the matching tasks, the most relevant first.
+        """
+        task_count, total_length = self.__get_statistics()
+        average_length = total_length / task_count if task_count else 1.0
+        k1_plus_1 = BM25_K1 + 1
+        length_norm = BM25_K1 * BM25_B / average_length
+        base_norm = BM25_K1 * (1 - BM25_B)
+
+        expansions = [self.__expand(word, is_prefix) for word, is_prefix in query_words]
+        if not all(expansions):
+            return []
+        expansions.sort(key=lambda expansion: sum(documents for _, documents in expansion))
+
+        # A task matching several words of a prefix expansion sums up their scores
+        def idf(documents):
+            return math.log(1 + (task_count - documents + 0.5) / (documents + 0.5))
+
+        if len(expansions) == 1 and len(expansions[0]) == 1 and not terms and task_list is None \
+                and limit is not None:
+            # Single word: its rarity is a constant factor, the top tasks are selected by SQLite
+            return [(list_id, task_id) for list_id, task_id in self.__connection.execute(
+                "SELECT list_id, task_id FROM postings WHERE field = 'word' AND term = ? "
+                "ORDER BY frequency / (frequency + ? + ? * length) DESC, list_id, task_id LIMIT ?",
+                (expansions[0][0][0], base_norm, length_norm, limit))]
+
+        scores = {}
+        for term, documents in expansions[0]:
+            weight = idf(documents) * k1_plus_1
+            for list_id, task_id, frequency, length in self.__connection.execute(
+                    "SELECT list_id, task_id, frequency, length FROM postings WHERE field = 'word' AND term = ?",
+                    (term,)):
+                key = (list_id, task_id)
+                scores[key] = scores.get(key, 0.0) + weight * frequency / (frequency + base_norm + length_norm * length)
+
+        for expansion in expansions[1:]:
+            word_scores = {}
+            for term, documents in expansion:
+                weight = idf(documents) * k1_plus_1
+                if documents <= len(scores):
+                    rows = ((list_id, task_id, frequency, length) for list_id, task_id, frequency, length
+                            in self.__connection.execute("SELECT list_id, task_id, frequency, length FROM postings "
+                                                         "WHERE field = 'word' AND term = ?", (term,))
+                            if (list_id, task_id) in scores)
+                else:
+                    rows = ((list_id, task_id) + row for list_id, task_id in scores
+                            for row in self.__connection.execute("SELECT frequency, length FROM postings "
+                                                                 "WHERE field = 'word' AND term = ? AND list_id = ? "
+                                                                 "AND task_id = ?", (term, list_id, task_id)))
+                for list_id, task_id, frequency, length in rows:
+                    key = (list_id, task_id)
+                    word_scores[key] = word_scores.get(key, 0.0) + \
+                        weight * frequency / (frequency + base_norm + length_norm * length)
+
+            scores = {key: score + word_scores[key] for key, score in scores.items() if key in word_scores}
+            if not scores:
+                return []
+
+        if terms or task_list is not None:
+            query, params = self.__select_matches(terms, task_list)
+            matches = set(self.__connection.execute(query, params))
+            scores = {key: score for key, score in scores.items() if key in matches}
+
+        # Ties are broken by TaskList then task ID, for stable results
+        if limit is None:
+            return sorted(scores, key=lambda key: (-scores[key], key))
+        return nsmallest(limit, scores, key=lambda key: (-scores[key], key))
+
+    # -----------------------------------------------------------------------------
+    # search
+    # -----------------------------------------------------------------------------
+    def search(self, assignee=None, owner=None, tag=None, words=None, task_list=None, limit=None) -> list:
+        """Finds the tasks of every TaskList matching all the given criteria, case-insensitively.
+
+        With words, tasks are ranked by relevance (BM25): rare words weigh more than common ones,
+        and a word counts more in a short task, or in a task name, than in a long description.
+
+        Args:
+            assignee: tasks assigned to this person
+            owner: tasks of the TaskLists owned by this person
+            tag: tasks of the TaskLists with this tag
+            words: text whose every word must appear in the name or description of the tasks,
+                a word ending with '*' matches every word starting with it
+            task_list: only search the TaskList with this name
+            limit: maximum number of tasks to return, all of them by default
+
+        Returns:
+            list: (TaskList name, Task dictionary) pairs of the matching tasks, the most relevant first
+                with words, by TaskList then task ID otherwise.
+
+        Raises:
+            ValueError: if no criterion (other than task_list) is given or the limit is negative
+        """
+        terms = [(field, normalize_term(value))
+                 for field, value in (("assignee", assignee), ("owner", owner), ("tag", tag)) if value]
+        query_words = parse_query(words or "")
+        if not terms and not query_words:
+            logger.error("At least one search criterion is required.")
+            raise ValueError("At least one search criterion is required.")
+        if limit is not None and limit < 0:
+            logger.error("Search limit must be positive.")
+            raise ValueError("Search limit must be positive.")
+
+        with self.__lock:
+            if not query_words:
+                query, params = self.__select_matches(terms, task_list)
+                query = (f"SELECT task_lists.name, tasks.payload FROM ({query}) AS matches "
+                         "JOIN tasks ON tasks.list_id = matches.list_id AND tasks.task_id = matches.task_id "
+                         "JOIN task_lists ON task_lists.list_id = matches.list_id "
+                         "ORDER BY matches.list_id, matches.task_id")
+                if limit is not None:
+                    query += " LIMIT ?"
+                    params.append(limit)
+                rows = self.__connection.execute(query, params).fetchall()
+            else:
+                rows = [self.__connection.execute("SELECT task_lists.name, tasks.payload FROM tasks "
+                                                  "JOIN task_lists ON task_lists.list_id = tasks.list_id "
+                                                  "WHERE tasks.list_id = ? AND tasks.task_id = ?", key).fetchone()
+                        for key in self.__rank(query_words, terms, task_list, limit)]
+        return [(name, json.loads(payload)) for name, payload in rows]
+
+    # -----------------------------------------------------------------------------
+    # close
+    # -----------------------------------------------------------------------------
+    def close(self) -> None:
+        """Closes the index database connection."""
+        with self.__lock:
+            self.__connection.close()
@@ -0,0 +1,235 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from src import logger
+from src.System.DurabilityPolicy.DurabilityPolicy import DurabilityPolicy
+from src.System.FileLock.FileLock import FileLock
+from src.System.TaskMeFileHandler.TaskMeFileHandler import read_data_file
+
+MANIFEST_FILE_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+class TaskMeShardedHandler:
+    def __init__(self, shards_dir=None, durability=None):
+        """Initialize a file handler for TaskMe sharded storage.
+
+        Each TaskList lives in its own shard file, named after a stable hash of its name,
+        and a small manifest keeps track of the TaskLists in creation order. Different TaskLists
+        can be written from different threads or processes in parallel.
+
+        Args:
+            shards_dir: directory of the shards, defaults to data/.taskme_shards
+            durability: DurabilityPolicy applied to writes, defaults to an fsync on every write
+        """
+        self.__durability = durability if durability is not None else DurabilityPolicy()
+        self.__shards_dir = Path(shards_dir) if shards_dir is not None else self.__get_shards_dir_path()
+        self.__shards_dir.mkdir(parents=True, exist_ok=True)
+        self.__manifest_path = self.__shards_dir / MANIFEST_FILE_NAME
+        logger.debug(f"Shards directory path: {self.__shards_dir}")
+
+        # Serializes the read-modify-write of the manifest between threads and processes
+        self.__manifest_lock = FileLock(f"{self.__manifest_path}.lock")
+
+        with self.__manifest_lock.exclusive():
+            if not os.path.isfile(self.__manifest_path):
+                self.__write_manifest({})
+
+    # -----------------------------------------------------------------------------
+    # __get_shards_dir_path
+    # -----------------------------------------------------------------------------
+    @staticmethod
+    def __get_shards_dir_path():
+        # Retrieve the root TaskMe directory
+        parent_dir = Path(__file__).resolve().parents[3]
+
+        # Define the shards directory inside the data directory
+        return parent_dir / "data" / ".taskme_shards"
+
+    # -----------------------------------------------------------------------------
+    # get_shard_file_name
+    # -----------------------------------------------------------------------------
+    @staticmethod
+    def get_shard_file_name(task_list_name: str) -> str:
+        """Stable shard file name of a TaskList.
+
+        Args:
+            task_list_name (str): The name of the TaskList.
+
+        Returns:
+            str: The shard file name.
+        """
+        return hashlib.sha1(task_list_name.encode("utf-8")).hexdigest() + ".json"
+
+    # -----------------------------------------------------------------------------
+    # __write_json
+    # -----------------------------------------------------------------------------
+    def __write_json(self, path: Path, data) -> None:
+        """Atomically writes data as compact JSON, according to the durability policy (internal).
+
+        Args:
+            path (Path): destination file.
+            data: JSON serializable data.
+        """
+        self.__durability.atomic_write(path, json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+    # -----------------------------------------------------------------------------
+    # __read_manifest
+    # -----------------------------------------------------------------------------
+    def __read_manifest(self) -> dict:
+        """Reads the manifest (internal).
+
+        Returns:
+            dict: TaskList name -> shard file name, in TaskList creation order.
+        """
+        with open(self.__manifest_path, 'r') as file:
+            return json.load(file)["shards"]
+
+    # -----------------------------------------------------------------------------
+    # __write_manifest
+    # -----------------------------------------------------------------------------
+    def __write_manifest(self, shards: dict) -> None:
+        """Writes the manifest (internal).
+
+        Args:
+            shards (dict): TaskList name -> shard file name, in TaskList creation order.
+        """
+        self.__write_json(self.__manifest_path, {"version": MANIFEST_VERSION, "shards": shards})
+
+    # -----------------------------------------------------------------------------
+    # __read_shard
+    # -----------------------------------------------------------------------------
+    def __read_shard(self, shard_file_name: str):
+        """Reads a shard (internal).
+
+        Args:
+            shard_file_name (str): The shard file name.
+
+        Returns:
+            dict: The TaskList dictionary, None if the shard doesn't exist.
+        """
+        try:
+            with open(self.__shards_dir / shard_file_name, 'r') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    # -----------------------------------------------------------------------------
+    # Interface
+    # -----------------------------------------------------------------------------
+    # -----------------------------------------------------------------------------
+    # iter_task_lists
+    # -----------------------------------------------------------------------------
+    def iter_task_lists(self):
+        """Streams the TaskLists one shard at a time.
+
+        Yields:
+            dict: TaskList dictionaries, in creation order.
+        """
+        for shard_file_name in self.__read_manifest().values():
+            task_list = self.__read_shard(shard_file_name)
+            if task_list is not None:
+                yield task_list
+
+    # -----------------------------------------------------------------------------
+    # read_all
+    # -----------------------------------------------------------------------------
+    def read_all(self) -> list:
+        """Reads all TaskLists from the shards.
+
+        Returns:
+            list: A list of TaskList dictionaries.
+        """
+        return list(self.iter_task_lists())
+
+    # -----------------------------------------------------------------------------
+    # read
+    # -----------------------------------------------------------------------------
+    def read(self, task_list_name: str) -> dict:
+        """Reads a specific TaskList, only its shard gets opened.
+
+        Args:
+            task_list_name (str): The name of the TaskList.
+
+        Returns:
+            dict: The desired dictionary if successful, None otherwise.
+        """
+        task_list = self.__read_shard(self.get_shard_file_name(task_list_name))
+        if task_list is None or task_list["taskListName"] != task_list_name:
+            return None
+        return task_list
+
+    # -----------------------------------------------------------------------------
+    # write
+    # -----------------------------------------------------------------------------
+    def write(self, task_list_dict: dict) -> None:
+        """Adds or updates a TaskList, only its shard gets serialized and synced to disk.
+
+        Args:
+            task_list_dict: The TaskList dictionary to write.
+        """
+        self.write_many([task_list_dict])
+
+    # -----------------------------------------------------------------------------
+    # write_many
+    # -----------------------------------------------------------------------------
+    def write_many(self, task_list_dicts: list) -> None:
+        """Adds or updates several TaskLists, the manifest is rewritten at most once.
+
+        Args:
+            task_list_dicts (list): The TaskList dictionaries to write.
+        """
+        for task_list_dict in task_list_dicts:
+            self.__write_json(self.__shards_dir / self.get_shard_file_name(task_list_dict["taskListName"]),
+                              task_list_dict)
+
+        # The manifest is only rewritten when a TaskList gets created
+        with self.__manifest_lock.exclusive():
+            shards = self.__read_manifest()
+            created = False
+            for task_list_dict in task_list_dicts:
+                task_list_name = task_list_dict["taskListName"]
+                if task_list_name not in shards:
+                    logger.info(f"TaskList {task_list_name} wasn't found - hence got created")
+                    shards[task_list_name] = self.get_shard_file_name(task_list_name)
+                    created = True
+
+            if created:
+                self.__write_manifest(shards)
+
+    # -----------------------------------------------------------------------------
+    # migrate_from_json
+    # -----------------------------------------------------------------------------
+    def migrate_from_json(self, json_file_path) -> int:
+        """One-shot conversion of a monolithic TaskMe data file into shards.
+
+        Args:
+            json_file_path: path of the TaskMe data file to convert, in any data format.
+
+        Returns:
+            int: The number of converted TaskLists.
+
+        Raises:
+            ValueError: if the data file doesn't exist
+        """
+        task_lists = read_data_file(json_file_path)
+
+        with self.__manifest_lock.exclusive():
+            shards = self.__read_manifest()
+            converted = set()
+            for task_list_dict in task_lists:
+                # Like TaskMeFileHandler.read, the first TaskList of a given name wins
+                task_list_name = task_list_dict["taskListName"]
+                if task_list_name in converted:
+                    continue
+                converted.add(task_list_name)
+
+                shard_file_name = self.get_shard_file_name(task_list_name)
+                self.__write_json(self.__shards_dir / shard_file_name, task_list_dict)
+                shards.setdefault(task_list_name, shard_file_name)
+            self.__write_manifest(shards)
+
+        logger.info(f"Migrated {len(converted)} TaskList(s) from {json_file_path}")
+        return len(converted)
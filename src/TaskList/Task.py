@@ -1,7 +1,12 @@
 from src import logger
-from datetime import datetime
+import sys
 
-from src.Common.utils import VALID_PRIORITIES, VALID_PROGRESS_STATUSES
+from src.Common.utils import NO_DUE_ORDINAL, VALID_PRIORITIES, VALID_PROGRESS_STATUSES, parse_due_date, format_due_date
+
+# Canonical priority and progress status values: validated values get swapped for these
+# interned strings, so that every task shares the same few string objects
+_PRIORITIES = {priority: sys.intern(priority) for priority in VALID_PRIORITIES}
+_PROGRESS_STATUSES = {status: sys.intern(status) for status in VALID_PROGRESS_STATUSES}
 
 
 # -----------------------------------------------------------------------------
@@ -15,38 +20,49 @@ class Task:
             The task assignee.
         __name : str
             The task name.
-        __due_date : str
-            A string indicating when the task is due, format is dd/mm/yyyy.
+        __due_date : int
+            Ordinal of the date the task is due, parsed once from its dd/mm/yyyy representation.
+            Loaded due dates that aren't valid dates are kept as they are (str), see from_dict.
         __priority : str
             Priority of the task, available values are LOW, MEDIUM or HIGH.
         __description : str
             A brief description of the task.
         __progress_status : str
             The task progress, available values are PENDING, IN_PROGRESS, COMPLETED.
+        __task_id : int
+            Persistent ID of the task within its TaskList, None until the TaskList assigns it.
+        __changed_fields : set
+            Names of the fields changed since the task was created, loaded or last saved, None if none.
 
 
     Note:
         When setting values for the 'priority' and 'progress_status' properties,
         they must be one of the predefined valid options in 'VALID_PRIORITIES' and 'VALID_PROGRESS_STATUSES', respectively.
+        Attributes are stored in slots rather than in a per instance dictionary, large task lists
+        load hundreds of thousands of Task objects.
 
     """
+    __slots__ = ("__assignee", "__name", "__due_date", "__priority", "__description", "__progress_status", "__task_id",
+                 "__changed_fields")
+
     def __init__(self,
                  assignee: str,
                  name: str,
                  due_date: str,
                  priority: str,
                  description: str,
-                 progress_status: str) -> None:
+                 progress_status: str,
+                 task_id: int = None) -> None:
 
         # Sanity checks for priority attribute
-        if priority not in VALID_PRIORITIES:
+        if priority not in _PRIORITIES:
             logger.error(f"Invalid priority value. Expected one of the following: {VALID_PRIORITIES}"
                          f" and got {priority}")
             raise ValueError(f"Invalid priority value. Expected one of the following: {VALID_PRIORITIES}"
                              f" and got {priority}")
 
         # Sanity checks for progress_status attribute
-        if progress_status not in VALID_PROGRESS_STATUSES:
+        if progress_status not in _PROGRESS_STATUSES:
             logger.error(f"Invalid progress_status value. Expected one of the following: {VALID_PROGRESS_STATUSES}"
                          f" and got {progress_status}")
             raise ValueError(f"Invalid progress_status value. Expected one of the following: {VALID_PROGRESS_STATUSES}"
@@ -55,10 +71,62 @@ class Task:
         # Attributes Init
         self.__assignee = assignee
         self.__name = name
-        self.__due_date = due_date
-        self.__priority = priority
+        self.__due_date = self.__parse_due_date(due_date)
+        self.__priority = _PRIORITIES[priority]
         self.__description = description
-        self.__progress_status = progress_status
+        self.__progress_status = _PROGRESS_STATUSES[progress_status]
+        self.__task_id = task_id
+        self.__changed_fields = None
+
+    # -----------------------------------------------------------------------------
+    # __set_changed
+    # -----------------------------------------------------------------------------
+    def __set_changed(self, field: str) -> None:
+        """ Records a changed field, for the TaskList to only save what changed
+
+        Args:
+            field (str): name of the changed field, as in to_dict
+        """
+        if self.__changed_fields is None:
+            self.__changed_fields = set()
+        self.__changed_fields.add(field)
+
+    # -----------------------------------------------------------------------------
+    # changed_fields getter
+    # -----------------------------------------------------------------------------
+    @property
+    def changed_fields(self) -> frozenset:
+        return frozenset(self.__changed_fields) if self.__changed_fields is not None else frozenset()
+
+    # -----------------------------------------------------------------------------
+    # mark_clean
+    # -----------------------------------------------------------------------------
+    def mark_clean(self) -> None:
+        """ Forgets the changed fields, once the task was saved
+        """
+        self.__changed_fields = None
+
+    # -----------------------------------------------------------------------------
+    # task_id getter & setter
+    # -----------------------------------------------------------------------------
+    @property
+    def task_id(self) -> int:
+        return self.__task_id
+
+    @task_id.setter
+    def task_id(self, new_task_id: int) -> None:
+        """ Assigns the persistent ID of the task, an ID can only be assigned once
+
+        Args:
+            new_task_id (int): ID to assign
+
+        Raises:
+            ValueError: if the task already has an ID
+        """
+        if self.__task_id is not None:
+            logger.error(f"Task '{self.__name}' already has the ID #{self.__task_id}.")
+            raise ValueError(f"Task '{self.__name}' already has the ID #{self.__task_id}.")
+        self.__task_id = new_task_id
 
     # -----------------------------------------------------------------------------
     # assignee getter & setter
@@ -69,7 +137,9 @@ class Task:
 
     @assignee.setter
     def assignee(self, new_assignee: str) -> None:
-        self.__assignee = new_assignee
+        if new_assignee != self.__assignee:
+            self.__assignee = new_assignee
+            self.__set_changed("assignee")
 
     # -----------------------------------------------------------------------------
     # name getter & setter
@@ -80,14 +150,50 @@ class Task:
 
     @name.setter
     def name(self, new_name: str) -> None:
-        self.__name = new_name
+        if new_name != self.__name:
+            self.__name = new_name
+            self.__set_changed("name")
 
     # -----------------------------------------------------------------------------
     # due_date getter & setter
     # -----------------------------------------------------------------------------
+    @staticmethod
+    def __parse_due_date(due_date: str) -> int:
+        """ Parses a due date into its ordinal
+
+        Args:
+            due_date (str): due date to parse
+
+        Returns:
+            int: the ordinal of the due date
+
+        Raises:
+            ValueError: if due_date is not in the following format: dd/mm/YYYY
+        """
+        try:
+            return parse_due_date(due_date)
+        except ValueError as e:
+            logger.error(str(e))
+            raise
+
+    @staticmethod
+    def __load_due_date(due_date):
+        """ Parses a stored due date, leniently: due dates weren't always validated
+
+        Args:
+            due_date: stored due date
+
+        Returns:
+            the ordinal of the due date, or the due date as it is (str) if it isn't a valid date
+        """
+        try:
+            return parse_due_date(due_date)
+        except ValueError:
+            return due_date if isinstance(due_date, str) else ""
+
     @property
     def due_date(self) -> str:
-        return self.__due_date
+        return format_due_date(self.__due_date) if type(self.__due_date) is int else self.__due_date
 
     @due_date.setter
     def due_date(self, new_due_date: str) -> None:
@@ -95,17 +201,18 @@ class Task:
 
         Args:
             new_due_date (str): new due_date to set
-
-        Raises:
-            ValueError: if new_due_date is not in the following format: dd/mm/YYYY
-
         """
-        try:
-            datetime.strptime(new_due_date, "%d/%m/%Y")
-        except ValueError:
-            logger.error("Invalid due_date format. Expected format is 'dd/mm/yyyy'.")
-            raise ValueError("Invalid due_date format. Expected format is 'dd/mm/yyyy'.")
-        self.__due_date = new_due_date
+        due_ordinal = self.__parse_due_date(new_due_date)
+        if due_ordinal != self.__due_date:
+            self.__due_date = due_ordinal
+            self.__set_changed("due_date")
+
+    # -----------------------------------------------------------------------------
+    # due_ordinal getter
+    # -----------------------------------------------------------------------------
+    @property
+    def due_ordinal(self) -> int:
+        return self.__due_date if type(self.__due_date) is int else NO_DUE_ORDINAL
 
     # -----------------------------------------------------------------------------
     # priority getter & setter
@@ -124,12 +231,14 @@ class Task:
         Raises:
             ValueError: if new_priority is not in the VALID_PRIORITIES expected values: i.e 'LOW', 'MEDIUM' or 'HIGH'
         """
-        if new_priority not in VALID_PRIORITIES:
+        if new_priority not in _PRIORITIES:
             logger.error(f"Invalid priority value. Expected one of the following: {VALID_PRIORITIES}"
                          f" and got {new_priority}")
             raise ValueError(f"Invalid priority value. Expected one of the following: {VALID_PRIORITIES}"
                              f" and got {new_priority}")
-        self.__priority = new_priority
+        if new_priority != self.__priority:
+            self.__priority = _PRIORITIES[new_priority]
+            self.__set_changed("priority")
 
     # -----------------------------------------------------------------------------
     # description getter & setter
@@ -140,7 +249,9 @@ class Task:
 
     @description.setter
     def description(self, new_description: str):
-        self.__description = new_description
+        if new_description != self.__description:
+            self.__description = new_description
+            self.__set_changed("description")
 
     # -----------------------------------------------------------------------------
     # progress_status getter & setter
@@ -159,12 +270,14 @@ class Task:
         Raises:
             ValueError: if new_status is not in the VALID_PROGRESS_STATUSES expected values.
         """
-        if new_status not in VALID_PROGRESS_STATUSES:
+        if new_status not in _PROGRESS_STATUSES:
             logger.error(f"Invalid priority value. Expected one of the following: {VALID_PROGRESS_STATUSES}"
                          f" and got {new_status}")
             raise ValueError(f"Invalid priority value. Expected one of the following: {VALID_PROGRESS_STATUSES}"
                              f" and got {new_status}")
-        self.__progress_status = new_status
+        if new_status != self.__progress_status:
+            self.__progress_status = _PROGRESS_STATUSES[new_status]
+            self.__set_changed("progress_status")
 
     # -----------------------------------------------------------------------------
     # to_dicts
@@ -175,33 +288,62 @@ class Task:
         Returns:
             Dictionary representation of Task object
         """
-        return {
+        task_dict = {
             "assignee": self.__assignee,
             "name": self.__name,
-            "due_date": self.__due_date,
+            "due_date": format_due_date(self.__due_date) if type(self.__due_date) is int else self.__due_date,
             "priority": self.__priority,
             "description": self.__description,
             "progress_status": self.__progress_status
         }
+        if self.__task_id is not None:
+            task_dict["id"] = self.__task_id
+        return task_dict
 
     # -----------------------------------------------------------------------------
     # from_dicts
     # -----------------------------------------------------------------------------
     @classmethod
     def from_dict(cls, data_dict):
-        """ Creates a Task Object from a given dictionary
+        """ Creates a Task Object from a given dictionary of stored data
+
+        Stored dictionaries get the constructor checks at the cost of two lookups: a valid priority and
+        progress status are swapped for their canonical values and the task is built without the constructor.
+
+        A stored due date that isn't a valid date (written before due dates were validated) is kept as it is:
+        the task still loads, displays and saves, it just sorts after every dated task (see NO_DUE_ORDINAL).
+        Due dates given by the user are validated by the constructor and the due_date setter.
 
         Args:
             data_dict: data dictionary
 
         Returns:
             TaskList object
+
+        Raises:
+            ValueError: if the priority or the progress status is invalid
         """
+        priority = _PRIORITIES.get(data_dict["priority"])
+        progress_status = _PROGRESS_STATUSES.get(data_dict["progress_status"])
+        if priority is not None and progress_status is not None:
+            task = cls.__new__(cls)
+            task.__assignee = data_dict["assignee"]
+            task.__name = data_dict["name"]
+            task.__due_date = cls.__load_due_date(data_dict["due_date"])
+            task.__priority = priority
+            task.__description = data_dict["description"]
+            task.__progress_status = progress_status
+            task.__task_id = data_dict.get("id")
+            task.__changed_fields = None
+            return task
+
+        # Rejected by the constructor checks
         return cls(
             assignee=data_dict["assignee"],
             name=data_dict["name"],
             due_date=data_dict["due_date"],
             priority=data_dict["priority"],
             description=data_dict["description"],
-            progress_status=data_dict["progress_status"]
+            progress_status=data_dict["progress_status"],
+            task_id=data_dict.get("id")
         )
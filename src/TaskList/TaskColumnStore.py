@@ -0,0 +1,436 @@
+import array
+from collections import Counter
+from itertools import compress
+
+from src import logger
+from src.Common.utils import VALID_PRIORITIES, VALID_PROGRESS_STATUSES, parse_due_date
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+# Codes of the categorical columns: position of the value in its list of valid values
+PRIORITY_CODES = {priority: code for code, priority in enumerate(VALID_PRIORITIES)}
+PROGRESS_STATUS_CODES = {status: code for code, status in enumerate(VALID_PROGRESS_STATUSES)}
+
+# Due date ordinal of the tasks whose due date isn't a valid dd/mm/yyyy date
+NO_DUE_DATE = 0
+
+# Columns tasks can be grouped by
+GROUP_BY_COLUMNS = ["progress_status", "priority", "assignee", "task_list"]
+
+
+# -----------------------------------------------------------------------------
+# due_date_ordinal
+# -----------------------------------------------------------------------------
+def due_date_ordinal(due_date) -> int:
+    """ Proleptic Gregorian ordinal of a dd/mm/yyyy due date
+
+    Args:
+        due_date: due date string
+
+    Returns:
+        int: the ordinal of the due date, NO_DUE_DATE if it isn't a valid date
+    """
+    try:
+        return parse_due_date(due_date)
+    except (TypeError, ValueError):
+        return NO_DUE_DATE
+
+
+# -----------------------------------------------------------------------------
+# _StringTable
+# -----------------------------------------------------------------------------
+class _StringTable:
+    """ Dictionary encoding of a string column: each distinct string is stored once, rows hold its code
+    """
+    __slots__ = ("__values", "__codes")
+
+    def __init__(self) -> None:
+        self.__values = []
+        self.__codes = {}
+
+    def __len__(self) -> int:
+        return len(self.__values)
+
+    def encode(self, value: str) -> int:
+        """ Code of a string, added to the table on first use
+
+        Args:
+            value (str): the string to encode
+
+        Returns:
+            int: the code of the string
+        """
+        code = self.__codes.get(value)
+        if code is None:
+            code = self.__codes[value] = len(self.__values)
+            self.__values.append(value)
+        return code
+
+    def lookup(self, value: str):
+        """ Code of a string, without adding it to the table
+
+        Args:
+            value (str): the string to look up
+
+        Returns:
+            int: the code of the string, None if the table doesn't contain it
+        """
+        return self.__codes.get(value)
+
+    def decode(self, code: int) -> str:
+        return self.__values[code]
+
+    @property
+    def values(self) -> list:
+        return self.__values
+
+
+# -----------------------------------------------------------------------------
+# TaskRow
+# -----------------------------------------------------------------------------
+class TaskRow:
+    """ Lazy read-only view of a task stored in a TaskColumnStore
+
+    Exposes the same properties as a Task, values are only decoded from the columns when accessed.
+    """
+    __slots__ = ("__store", "__position")
+
+    def __init__(self, store, position: int) -> None:
+        self.__store = store
+        self.__position = position
+
+    @property
+    def task_list_name(self) -> str:
+        return self.__store.cell("task_list", self.__position)
+
+    @property
+    def task_id(self) -> int:
+        return self.__store.cell("task_id", self.__position)
+
+    @property
+    def assignee(self) -> str:
+        return self.__store.cell("assignee", self.__position)
+
+    @property
+    def name(self) -> str:
+        return self.__store.cell("name", self.__position)
+
+    @property
+    def due_date(self) -> str:
+        return self.__store.cell("due_date", self.__position)
+
+    @property
+    def priority(self) -> str:
+        return self.__store.cell("priority", self.__position)
+
+    @property
+    def description(self) -> str:
+        return self.__store.cell("description", self.__position)
+
+    @property
+    def progress_status(self) -> str:
+        return self.__store.cell("progress_status", self.__position)
+
+    def to_dict(self) -> dict:
+        """ Dict representation of the task, same as Task.to_dict
+
+        Returns:
+            Dictionary representation of the task
+        """
+        task_dict = {
+            "assignee": self.assignee,
+            "name": self.name,
+            "due_date": self.due_date,
+            "priority": self.priority,
+            "description": self.description,
+            "progress_status": self.progress_status
+        }
+        if self.task_id:
+            task_dict["id"] = self.task_id
+        return task_dict
+
+
+# -----------------------------------------------------------------------------
+# TaskColumnStore
+# -----------------------------------------------------------------------------
+class TaskColumnStore:
+    def __init__(self) -> None:
+        """ Initializes an empty columnar (struct of arrays) store of tasks, meant for analytics
+
+        Categorical values and dates are stored as integer codes in compact arrays, strings are
+        dictionary encoded. Filters and aggregations run over whole columns, vectorized with NumPy
+        when it is installed. Tasks are read back through lazy TaskRow views.
+        """
+        self.__task_lists = _StringTable()
+        self.__assignees = _StringTable()
+        self.__names = _StringTable()
+        self.__due_dates = _StringTable()
+        self.__descriptions = []
+
+        self.__task_list_codes = array.array("i")
+        self.__task_ids = array.array("q")
+        self.__assignee_codes = array.array("i")
+        self.__name_codes = array.array("i")
+        self.__due_date_codes = array.array("i")
+        self.__due_date_ordinals = array.array("i")
+        self.__priority_codes = array.array("b")
+        self.__progress_status_codes = array.array("b")
+
+    # -----------------------------------------------------------------------------
+    # from_task_lists
+    # -----------------------------------------------------------------------------
+    @classmethod
+    def from_task_lists(cls, task_list_dicts):
+        """ Creates a column store holding the tasks of TaskList dictionaries, no Task object gets created
+
+        Args:
+            task_list_dicts: iterable of TaskList dictionaries, e.g. file_handler.iter_task_lists()
+
+        Returns:
+            TaskColumnStore object
+        """
+        store = cls()
+        for task_list_dict in task_list_dicts:
+            store.extend(task_list_dict.get("tasks", []), task_list_dict["taskListName"])
+        return store
+
+    # -----------------------------------------------------------------------------
+    # extend
+    # -----------------------------------------------------------------------------
+    def extend(self, task_dicts, task_list_name: str = "") -> None:
+        """ Appends tasks to the store
+
+        Args:
+            task_dicts: iterable of Task dictionaries
+            task_list_name (str): name of the TaskList the tasks belong to
+
+        Raises:
+            ValueError: if a task has an invalid priority or progress status
+        """
+        task_list_code = self.__task_lists.encode(task_list_name)
+        for task_dict in task_dicts:
+            priority_code = PRIORITY_CODES.get(task_dict["priority"])
+            progress_status_code = PROGRESS_STATUS_CODES.get(task_dict["progress_status"])
+            if priority_code is None or progress_status_code is None:
+                logger.error(f"Invalid task '{task_dict['name']}' in TaskList '{task_list_name}'.")
+                raise ValueError(f"Invalid task '{task_dict['name']}' in TaskList '{task_list_name}'.")
+
+            self.__task_list_codes.append(task_list_code)
+            self.__task_ids.append(task_dict.get("id", 0))
+            self.__assignee_codes.append(self.__assignees.encode(task_dict["assignee"]))
+            self.__name_codes.append(self.__names.encode(task_dict["name"]))
+            self.__due_date_codes.append(self.__due_dates.encode(task_dict["due_date"]))
+            self.__due_date_ordinals.append(due_date_ordinal(task_dict["due_date"]))
+            self.__priority_codes.append(priority_code)
+            self.__progress_status_codes.append(progress_status_code)
+            self.__descriptions.append(task_dict["description"])
+
+    # -----------------------------------------------------------------------------
+    # __len__
+    # -----------------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.__task_ids)
+
+    # -----------------------------------------------------------------------------
+    # cell
+    # -----------------------------------------------------------------------------
+    def cell(self, column: str, position: int):
+        """ Decoded value of a column for a given task
+
+        Args:
+            column (str): name of the column, a Task property name, "task_id" or "task_list"
+            position (int): position of the task in the store
+
+        Returns:
+            the decoded value
+        """
+        if column == "task_list":
+            return self.__task_lists.decode(self.__task_list_codes[position])
+        if column == "task_id":
+            return self.__task_ids[position]
+        if column == "assignee":
+            return self.__assignees.decode(self.__assignee_codes[position])
+        if column == "name":
+            return self.__names.decode(self.__name_codes[position])
+        if column == "due_date":
+            return self.__due_dates.decode(self.__due_date_codes[position])
+        if column == "priority":
+            return VALID_PRIORITIES[self.__priority_codes[position]]
+        if column == "progress_status":
+            return VALID_PROGRESS_STATUSES[self.__progress_status_codes[position]]
+        return self.__descriptions[position]
+
+    # -----------------------------------------------------------------------------
+    # tasks getter
+    # -----------------------------------------------------------------------------
+    @property
+    def tasks(self) -> list:
+        """ Lazy views of every task of the store, in insertion order
+
+        Returns:
+            list: TaskRow views
+        """
+        return [TaskRow(self, position) for position in range(len(self))]
+
+    # -----------------------------------------------------------------------------
+    # __group_column
+    # -----------------------------------------------------------------------------
+    def __group_column(self, column: str) -> tuple:
+        """ Codes and decoded values of a categorical column (internal).
+
+        Args:
+            column (str): one of GROUP_BY_COLUMNS
+
+        Returns:
+            tuple: (array of codes, list of values indexed by code)
+
+        Raises:
+            ValueError: if the column can't be grouped by
+        """
+        if column == "progress_status":
+            return self.__progress_status_codes, VALID_PROGRESS_STATUSES
+        if column == "priority":
+            return self.__priority_codes, VALID_PRIORITIES
+        if column == "assignee":
+            return self.__assignee_codes, self.__assignees.values
+        if column == "task_list":
+            return self.__task_list_codes, self.__task_lists.values
+
+        logger.error(f"Invalid group by column. Expected one of the following: {GROUP_BY_COLUMNS}"
+                     f" and got {column}")
+        raise ValueError(f"Invalid group by column. Expected one of the following: {GROUP_BY_COLUMNS}"
+                         f" and got {column}")
+
+    # -----------------------------------------------------------------------------
+    # __criteria
+    # -----------------------------------------------------------------------------
+    def __criteria(self, task_list=None, assignee=None, priority=None, progress_status=None,
+                   due_before=None) -> list:
+        """ Translates filter criteria into (column, comparison, code) triplets (internal).
+
+        Args:
+            task_list: only keep the tasks of this TaskList
+            assignee: only keep the tasks of this assignee
+            priority: only keep the tasks of this priority
+            progress_status: only keep the tasks of this progress status
+            due_before: only keep the tasks due strictly before this dd/mm/yyyy date
+
+        Returns:
+            list: the (column array, comparison, code) triplets, None if no task can match
+
+        Raises:
+            ValueError: if due_before is not in the dd/mm/yyyy format
+        """
+        criteria = []
+        for value, table, codes in ((task_list, self.__task_lists, self.__task_list_codes),
+                                    (assignee, self.__assignees, self.__assignee_codes)):
+            if value is not None:
+                code = table.lookup(value)
+                if code is None:
+                    return None
+                criteria.append((codes, "==", code))
+
+        for value, code_map, codes in ((priority, PRIORITY_CODES, self.__priority_codes),
+                                       (progress_status, PROGRESS_STATUS_CODES, self.__progress_status_codes)):
+            if value is not None:
+                if value not in code_map:
+                    return None
+                criteria.append((codes, "==", code_map[value]))
+
+        if due_before is not None:
+            # Tasks without a valid due date are never due
+            criteria.append((self.__due_date_ordinals, ">", NO_DUE_DATE))
+            try:
+                due_before_ordinal = parse_due_date(due_before)
+            except ValueError as e:
+                logger.error(str(e))
+                raise
+            criteria.append((self.__due_date_ordinals, "<", due_before_ordinal))
+
+        return criteria
+
+    # -----------------------------------------------------------------------------
+    # __mask
+    # -----------------------------------------------------------------------------
+    def __mask(self, criteria: list):
+        """ Selection mask of the tasks matching every criterion (internal).
+
+        Args:
+            criteria (list): (column array, comparison, code) triplets
+
+        Returns:
+            a NumPy boolean array if NumPy is installed, a list of booleans otherwise
+        """
+        if numpy is not None:
+            mask = numpy.ones(len(self), dtype=bool)
+            for codes, comparison, code in criteria:
+                column = numpy.frombuffer(codes, dtype=codes.typecode)
+                if comparison == "==":
+                    mask &= column == code
+                elif comparison == "<":
+                    mask &= column < code
+                else:
+                    mask &= column > code
+            return mask
+
+        mask = [True] * len(self)
+        for codes, comparison, code in criteria:
+            if comparison == "==":
+                mask = [selected and value == code for selected, value in zip(mask, codes)]
+            elif comparison == "<":
+                mask = [selected and value < code for selected, value in zip(mask, codes)]
+            else:
+                mask = [selected and value > code for selected, value in zip(mask, codes)]
+        return mask
+
+    # -----------------------------------------------------------------------------
+    # select
+    # -----------------------------------------------------------------------------
+    def select(self, **criteria) -> list:
+        """ Selects the tasks matching every given criterion
+
+        Args:
+            **criteria: task_list, assignee, priority, progress_status and/or due_before filters
+
+        Returns:
+            list: TaskRow views of the matching tasks, in insertion order
+        """
+        translated = self.__criteria(**criteria)
+        if translated is None or not len(self):
+            return []
+
+        mask = self.__mask(translated)
+        positions = numpy.flatnonzero(mask).tolist() if numpy is not None else compress(range(len(self)), mask)
+        return [TaskRow(self, position) for position in positions]
+
+    # -----------------------------------------------------------------------------
+    # count_by
+    # -----------------------------------------------------------------------------
+    def count_by(self, column: str, **criteria) -> dict:
+        """ Counts the tasks matching every given criterion, grouped by the values of a column
+
+        Args:
+            column (str): one of GROUP_BY_COLUMNS
+            **criteria: task_list, assignee, priority, progress_status and/or due_before filters
+
+        Returns:
+            dict: value -> number of tasks, for every value having at least one task
+        """
+        codes, values = self.__group_column(column)
+        translated = self.__criteria(**criteria)
+        if translated is None or not len(self):
+            return {}
+
+        if numpy is not None:
+            column_codes = numpy.frombuffer(codes, dtype=codes.typecode)
+            if translated:
+                column_codes = column_codes[self.__mask(translated)]
+            counts = numpy.bincount(column_codes, minlength=len(values)).tolist()
+        else:
+            counter = Counter(compress(codes, self.__mask(translated)) if translated else codes)
+            counts = [counter[code] for code in range(len(values))]
+
+        return {value: count for value, count in zip(values, counts) if count}
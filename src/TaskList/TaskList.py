@@ -1,8 +1,21 @@
 from src import logger
-from typing import List
-
+import sys
+from bisect import bisect_left, insort
+from datetime import date
+from heapq import nlargest, nsmallest
+from itertools import islice
+from operator import attrgetter
+from typing import Iterable, List
+
+from src.Common.utils import NO_DUE_ORDINAL, QUERY_SORT_KEYS, VALID_PRIORITIES, VALID_PROGRESS_STATUSES, parse_due_date
 from src.TaskList.Task import Task
 
+# Task attributes having a secondary index (value -> task IDs)
+INDEXED_FIELDS = ("assignee", "priority", "progress_status")
+
+# Columns of the task list display
+DISPLAY_HEADERS = ("ID", "Task", "Status", "Assignee", "Due date", "Priority")
+
 
 # -----------------------------------------------------------------------------
 # TaskList
@@ -24,33 +37,155 @@ class TaskList:
         self.__owners = owners
         self.__tags = tags
 
-        self.__tasks = []
+        # Tasks are indexed by their persistent ID, in insertion order. Tasks loaded by from_dict
+        # stay as raw dictionaries until first accessed (lazy hydration)
+        self.__tasks = {}
+        self.__next_task_id = 1
+
+        # Number of raw task dictionaries left
+        self.__raw_task_count = 0
+
+        # Sorted (due date ordinal, task ID) pairs, built by the first due date query
+        self.__due_index = None
+
+        # Field -> value -> IDs of the tasks having this value, built by the first query
+        self.__field_indexes = None
+
+        # Whether the insertion order of the tasks is also their ID order (not the case of some legacy data)
+        self.__ids_in_order = True
+
+        # Changes since the TaskList was loaded or last saved, for get_delta: changed TaskList fields,
+        # added and removed task IDs. A TaskList never saved has no stored version to apply a delta to
+        self.__changed_fields = set()
+        self.__added_ids = set()
+        self.__removed_ids = set()
+        self.__persisted = False
 
     # -----------------------------------------------------------------------------
-    # __add_task_from_object
+    # __hydrate
     # -----------------------------------------------------------------------------
-    def __add_task_from_object(self, task_obj) -> None:
-        """ Adds a Task object to the internal TaskList
+    def __hydrate(self, task_id: int, task_data: dict) -> Task:
+        """ Builds the Task object of a raw task dictionary, in place
 
         Args:
-            task_obj: Task Object
+            task_id (int): ID of the task
+            task_data (dict): raw task dictionary
+
+        Returns:
+            Task: the Task object
 
         Raises:
-            ValueError: if the given task_obj is not of type Task
+            ValueError: if the task dictionary isn't valid
         """
-        if not isinstance(task_obj, Task):
+        task = Task.from_dict(task_data)
+        if not isinstance(task, Task):
             logger.error("Expected a Task object.")
             raise ValueError("Expected a Task object.")
-        self.__tasks.append(task_obj)
+        if task.task_id is None:
+            task.task_id = task_id
+        self.__tasks[task_id] = task
+        self.__raw_task_count -= 1
+        return task
+
+    # -----------------------------------------------------------------------------
+    # __hydrate_all
+    # -----------------------------------------------------------------------------
+    def __hydrate_all(self) -> dict:
+        """ Builds the Task objects of every raw task dictionary left
+
+        Returns:
+            dict: the tasks, ID -> Task object
+        """
+        if self.__raw_task_count:
+            for task_id, task in self.__tasks.items():
+                if type(task) is dict:
+                    self.__hydrate(task_id, task)
+        return self.__tasks
+
+    # -----------------------------------------------------------------------------
+    # __index_keys
+    # -----------------------------------------------------------------------------
+    @staticmethod
+    def __index_keys(task: Task) -> tuple:
+        """ Values under which a task is indexed
+
+        Args:
+            task (Task): the task
+
+        Returns:
+            tuple: due date ordinal followed by the values of the INDEXED_FIELDS
+        """
+        return (task.due_ordinal,) + tuple(getattr(task, field) for field in INDEXED_FIELDS)
+
+    # -----------------------------------------------------------------------------
+    # __index_task
+    # -----------------------------------------------------------------------------
+    def __index_task(self, task_id: int, index_keys: tuple) -> None:
+        """ Adds a task to the indexes already built
+
+        Args:
+            task_id (int): ID of the task
+            index_keys (tuple): values of the task returned by __index_keys
+        """
+        if self.__due_index is not None:
+            insort(self.__due_index, (index_keys[0], task_id))
+        if self.__field_indexes is not None:
+            for field, value in zip(INDEXED_FIELDS, index_keys[1:]):
+                self.__field_indexes[field].setdefault(value, set()).add(task_id)
+
+    # -----------------------------------------------------------------------------
+    # __unindex_task
+    # -----------------------------------------------------------------------------
+    def __unindex_task(self, task_id: int, index_keys: tuple) -> None:
+        """ Removes a task from the indexes already built
+
+        Args:
+            task_id (int): ID of the task
+            index_keys (tuple): values the task was indexed under, returned by __index_keys
+        """
+        if self.__due_index is not None:
+            del self.__due_index[bisect_left(self.__due_index, (index_keys[0], task_id))]
+        if self.__field_indexes is not None:
+            for field, value in zip(INDEXED_FIELDS, index_keys[1:]):
+                task_ids = self.__field_indexes[field][value]
+                task_ids.discard(task_id)
+                if not task_ids:
+                    del self.__field_indexes[field][value]
+
+    # -----------------------------------------------------------------------------
+    # get_task
+    # -----------------------------------------------------------------------------
+    def get_task(self, task_id: int) -> Task:
+        """ Retrieves a task from its ID
+
+        Args:
+            task_id (int): ID of the task.
+
+        Returns:
+            Task: the task with the given ID.
+
+        Raises:
+            ValueError: if no task has the given ID
+        """
+        task = self.__tasks.get(task_id)
+        if task is None:
+            logger.error(f"Task ID #{task_id} doesn't exist.")
+            raise ValueError(f"Task ID #{task_id} doesn't exist.")
+        if type(task) is dict:
+            task = self.__hydrate(task_id, task)
+        return task
 
     # -----------------------------------------------------------------------------
     # add_task
     # -----------------------------------------------------------------------------
-    def add_task(self, **kwargs) -> None:
+    def add_task(self, **kwargs) -> int:
         """Generic method to add a task to the task list.
 
         Args:
             **kwargs: Keyword arguments representing the properties of the task to add.
+
+        Returns:
+            int: the ID of the new task.
         """
         assignee = kwargs.get("assignee")
         name = kwargs.get("name")
@@ -58,29 +193,119 @@ class TaskList:
         priority = kwargs.get("priority")
         description = kwargs.get("description")
 
-        new_task = Task(assignee, name, due_date, priority, description, "PENDING")
+        new_task = Task(assignee, name, due_date, priority, description, "PENDING", self.__next_task_id)
 
-        self.__tasks.append(new_task)
+        self.__tasks[new_task.task_id] = new_task
+        self.__next_task_id += 1
+        self.__added_ids.add(new_task.task_id)
+        self.__changed_fields.add("nextTaskId")
+        self.__index_task(new_task.task_id, self.__index_keys(new_task))
         logger.debug(f"Task '{name}' created successfully.")
+        return new_task.task_id
+
+    # -----------------------------------------------------------------------------
+    # add_tasks
+    # -----------------------------------------------------------------------------
+    def add_tasks(self, tasks: Iterable[dict]) -> range:
+        """ Adds several tasks at once, e.g. imported from another tracker
+
+        Assignees, names, priorities and progress statuses are validated in bulk before any task gets built,
+        the IDs are reserved in one go. Either every task is added or none of them.
+
+        Args:
+            tasks (Iterable[dict]): task dictionaries (assignee, name, due_date, priority and optionally
+                description, empty when missing, and progress_status, PENDING when missing or empty), their IDs
+                are ignored
+
+        Returns:
+            range: the IDs of the new tasks.
+
+        Raises:
+            ValueError: if a task has no assignee or name, or an invalid priority, progress status or due date
+        """
+        task_dicts = list(tasks)
+        if not task_dicts:
+            return range(self.__next_task_id, self.__next_task_id)
+
+        for field in ("assignee", "name"):
+            for number, task_dict in enumerate(task_dicts, 1):
+                if not isinstance(task_dict.get(field), str):
+                    logger.error(f"Task #{number} has no {field}.")
+                    raise ValueError(f"Task #{number} has no {field}.")
+
+        invalid_priorities = {task_dict.get("priority") for task_dict in task_dicts}.difference(VALID_PRIORITIES)
+        if invalid_priorities:
+            logger.error(f"Invalid priority values. Expected one of the following: {VALID_PRIORITIES}"
+                         f" and got {sorted(map(str, invalid_priorities))}")
+            raise ValueError(f"Invalid priority values. Expected one of the following: {VALID_PRIORITIES}"
+                             f" and got {sorted(map(str, invalid_priorities))}")
+
+        invalid_statuses = ({task_dict.get("progress_status") or "PENDING" for task_dict in task_dicts}
+                            .difference(VALID_PROGRESS_STATUSES))
+        if invalid_statuses:
+            logger.error(f"Invalid progress_status values. Expected one of the following: {VALID_PROGRESS_STATUSES}"
+                         f" and got {sorted(map(str, invalid_statuses))}")
+            raise ValueError(f"Invalid progress_status values. Expected one of the following:"
+                             f" {VALID_PROGRESS_STATUSES} and got {sorted(map(str, invalid_statuses))}")
+
+        # Values already validated, the tasks are built like stored ones. Unlike stored due dates,
+        # due dates given by the user must be valid
+        task_ids = range(self.__next_task_id, self.__next_task_id + len(task_dicts))
+        new_tasks = []
+        for task_id, task_dict in zip(task_ids, task_dicts):
+            try:
+                parse_due_date(task_dict.get("due_date"))
+                new_tasks.append(Task.from_dict({
+                    "assignee": task_dict.get("assignee"),
+                    "name": task_dict.get("name"),
+                    "due_date": task_dict.get("due_date"),
+                    "priority": task_dict["priority"],
+                    "description": task_dict.get("description") or "",
+                    "progress_status": task_dict.get("progress_status") or "PENDING",
+                    "id": task_id
+                }))
+            except ValueError as e:
+                logger.error(f"Task '{task_dict.get('name')}' can't be added: {e}")
+                raise ValueError(f"Task '{task_dict.get('name')}' can't be added: {e}") from None
+
+        self.__next_task_id = task_ids.stop
+        self.__added_ids.update(task_ids)
+        self.__changed_fields.add("nextTaskId")
+        for task in new_tasks:
+            self.__tasks[task.task_id] = task
+
+        # Indexes already built get the new tasks merged in, rather than inserted one by one
+        if self.__due_index is not None:
+            self.__due_index.extend((task.due_ordinal, task.task_id) for task in new_tasks)
+            self.__due_index.sort()
+        if self.__field_indexes is not None:
+            for task in new_tasks:
+                for field, value in zip(INDEXED_FIELDS, self.__index_keys(task)[1:]):
+                    self.__field_indexes[field].setdefault(value, set()).add(task.task_id)
+
+        logger.debug(f"{len(new_tasks)} task(s) added to task list '{self.__name}'.")
+        return task_ids
 
     # -----------------------------------------------------------------------------
     # remove_task
     # -----------------------------------------------------------------------------
     def remove_task(self, task_id: int) -> None:
-        """ Removes task from the tasklist.
+        """ Removes task from the tasklist, the IDs of the other tasks are left untouched.
 
         Args:
             task_id (int): ID of the task to be removed.
 
         Raises:
-            ValueError: if task_id is out of range
+            ValueError: if no task has the given ID
         """
-        if 0 < task_id <= len(self.__tasks):
-            self.__tasks.pop(task_id - 1)
-            logger.debug(f"Task #{task_id} removed.")
+        task = self.get_task(task_id)
+        del self.__tasks[task_id]
+        if task_id in self.__added_ids:
+            self.__added_ids.discard(task_id)
         else:
-            logger.error(f"Task ID #{task_id} is out of range.")
-            raise ValueError(f"Task ID #{task_id} is out of range.")
+            self.__removed_ids.add(task_id)
+        self.__unindex_task(task_id, self.__index_keys(task))
+        logger.debug(f"Task #{task_id} removed.")
 
     # -----------------------------------------------------------------------------
     # update_tasklist
@@ -112,11 +337,12 @@ class TaskList:
             **kwargs: Keyword arguments representing the task properties to update.
 
         Raises:
-            ValueError: if Task ID is out of range or if attribute doesn't have a setter method
+            ValueError: if no task has the given ID or if attribute doesn't have a setter method
         """
-        if 0 < task_id <= len(self.__tasks):
-            task = self.__tasks[task_id - 1]
+        task = self.get_task(task_id)
+        index_keys = self.__index_keys(task)
 
+        try:
             for key, value in kwargs.items():
                 # Only update if the value is not None
                 if value is not None:
@@ -125,38 +351,288 @@ class TaskList:
                     else:
                         logger.error(f"Task does not have a setter for '{key}'.")
                         raise ValueError(f"Task does not have a setter for '{key}'.")
-        else:
-            logger.error(f"Task ID #{task_id} is out of range.")
-            raise ValueError(f"Task ID #{task_id} is out of range.")
+        finally:
+            # The indexes follow the task, even when a later attribute fails
+            new_index_keys = self.__index_keys(task)
+            if new_index_keys != index_keys:
+                self.__unindex_task(task_id, index_keys)
+                self.__index_task(task_id, new_index_keys)
 
     # -----------------------------------------------------------------------------
-    # display_tasklist
+    # __get_due_index
     # -----------------------------------------------------------------------------
-    def display_tasklist(self) -> None:  # pragma: no cover
-        """ Creates a default display of the task list.
+    def __get_due_index(self) -> list:
+        """ Due date index of the tasks, built on first use then kept up to date by the TaskList methods
+
+        Returns:
+            list: (due date ordinal, task ID) pairs, sorted
+        """
+        if self.__due_index is None:
+            self.__due_index = sorted((task.due_ordinal, task_id) for task_id, task in self.__hydrate_all().items())
+        return self.__due_index
+
+    # -----------------------------------------------------------------------------
+    # __get_field_indexes
+    # -----------------------------------------------------------------------------
+    def __get_field_indexes(self) -> dict:
+        """ Secondary indexes of the tasks, built on first use then kept up to date by the TaskList methods
+
+        Returns:
+            dict: field -> value -> set of task IDs, for every field of INDEXED_FIELDS
         """
-        print("\n" + "-" * 130)
-        print("\n" + "-" * 130)
-        print(f"Todo List: {self.__name}")
-        print(f"Owner(s): {', '.join(self.__owners)}")
-        print(f"Tag(s): {', '.join(self.__tags)}")
-        print("-" * 130)
+        if self.__field_indexes is None:
+            self.__field_indexes = {}
+            for field in INDEXED_FIELDS:
+                field_index = self.__field_indexes[field] = {}
+                get_value = attrgetter(field)
+                for task_id, task in self.__hydrate_all().items():
+                    value = get_value(task)
+                    if value in field_index:
+                        field_index[value].add(task_id)
+                    else:
+                        field_index[value] = {task_id}
+        return self.__field_indexes
 
-        # Print table headers
-        headers = ['Task', 'Status', 'Assignee', 'Due date', 'Priority']
-        print(f"{'ID':<5}" + "".join([f"{header:<25}" for header in headers]))
-        print("-" * 130)
+    # -----------------------------------------------------------------------------
+    # __parse_date
+    # -----------------------------------------------------------------------------
+    @staticmethod
+    def __parse_date(due_date: str) -> int:
+        """ Parses a date bound of a due date query
 
-        # Print each task with its attributes
-        for idx, task in enumerate(self.__tasks, 1):
-            print(f"{idx:<5}"
-                  f"{task.name:<25}"
-                  f"{task.progress_status:<25}"
-                  f"{task.assignee:<25}"
-                  f"{task.due_date:<25}"
-                  f"{task.priority}")
+        Args:
+            due_date (str): date in the dd/mm/yyyy format
 
-        print("-" * 130)
+        Returns:
+            int: the ordinal of the date
+
+        Raises:
+            ValueError: if due_date is not in the dd/mm/yyyy format
+        """
+        try:
+            return parse_due_date(due_date)
+        except ValueError as e:
+            logger.error(str(e))
+            raise
+
+    # -----------------------------------------------------------------------------
+    # tasks_due_between
+    # -----------------------------------------------------------------------------
+    def tasks_due_between(self, start: str = None, end: str = None) -> List[Task]:
+        """ Tasks due from start (included) to end (excluded), ordered by due date
+
+        Args:
+            start (str): first due date (dd/mm/yyyy) of the range, unbounded by default
+            end (str): due date (dd/mm/yyyy) ending the range, unbounded by default
+
+        Returns:
+            List[Task]: the tasks due within the range, ordered by due date then ID (tasks without valid due
+                date are left out)
+        """
+        due_index = self.__get_due_index()
+        first = bisect_left(due_index, (self.__parse_date(start),)) if start is not None else 0
+        last = bisect_left(due_index, (self.__parse_date(end) if end is not None else NO_DUE_ORDINAL,))
+        return [self.__tasks[task_id] for _, task_id in due_index[first:last]]
+
+    # -----------------------------------------------------------------------------
+    # tasks_due_before
+    # -----------------------------------------------------------------------------
+    def tasks_due_before(self, due_date: str) -> List[Task]:
+        """ Tasks due strictly before a date, ordered by due date
+
+        Args:
+            due_date (str): date in the dd/mm/yyyy format
+
+        Returns:
+            List[Task]: the tasks due before due_date
+        """
+        return self.tasks_due_between(end=due_date)
+
+    # -----------------------------------------------------------------------------
+    # overdue_tasks
+    # -----------------------------------------------------------------------------
+    def overdue_tasks(self, today: date = None) -> List[Task]:
+        """ Tasks not completed yet whose due date has passed, ordered by due date
+
+        Args:
+            today (date): current date, defaults to the system date
+
+        Returns:
+            List[Task]: the overdue tasks
+        """
+        today_ordinal = (today if today is not None else date.today()).toordinal()
+        due_index = self.__get_due_index()
+        return [self.__tasks[task_id] for _, task_id in due_index[:bisect_left(due_index, (today_ordinal,))]
+                if self.__tasks[task_id].progress_status != "COMPLETED"]
+
+    # -----------------------------------------------------------------------------
+    # __get_sort_key
+    # -----------------------------------------------------------------------------
+    @staticmethod
+    def __get_sort_key(sort_by: str):
+        """ Sort key function of a task sort
+
+        Args:
+            sort_by (str): one of QUERY_SORT_KEYS
+
+        Returns:
+            the key function, ties are ordered by ID
+
+        Raises:
+            ValueError: if sort_by is unknown
+        """
+        if sort_by not in QUERY_SORT_KEYS:
+            logger.error(f"Invalid sort key. Expected one of the following: {list(QUERY_SORT_KEYS)}"
+                         f" and got {sort_by}")
+            raise ValueError(f"Invalid sort key. Expected one of the following: {list(QUERY_SORT_KEYS)}"
+                             f" and got {sort_by}")
+        return QUERY_SORT_KEYS[sort_by]
+
+    # -----------------------------------------------------------------------------
+    # query
+    # -----------------------------------------------------------------------------
+    def query(self, assignee: str = None, priority: str = None, progress_status: str = None,
+              due_from: str = None, due_before: str = None, sort_by: str = "id", descending: bool = False,
+              limit: int = None, offset: int = 0) -> List[Task]:
+        """ Filters, sorts and paginates the tasks, using the secondary and due date indexes
+
+        Candidates come from the most selective index, only they get checked against the other
+        filters: the cost depends on the number of matching tasks rather than on the list size.
+
+        Args:
+            assignee (str): only keep the tasks of this assignee
+            priority (str): only keep the tasks of this priority
+            progress_status (str): only keep the tasks of this progress status
+            due_from (str): only keep the tasks due from this date (dd/mm/yyyy, included)
+            due_before (str): only keep the tasks due before this date (dd/mm/yyyy, excluded)
+            sort_by (str): one of QUERY_SORT_KEYS, ties are ordered by ID
+            descending (bool): sort in descending order
+            limit (int): maximum number of tasks to return, all of them by default
+            offset (int): number of matching tasks to skip
+
+        Returns:
+            List[Task]: the matching tasks
+
+        Raises:
+            ValueError: if sort_by is unknown, if limit or offset is negative, or if a date isn't in the dd/mm/yyyy format
+        """
+        sort_key = self.__get_sort_key(sort_by)
+        if offset < 0 or (limit is not None and limit < 0):
+            logger.error("Query limit and offset must be positive.")
+            raise ValueError("Query limit and offset must be positive.")
+
+        # Candidate sets of the equality filters, the smallest one drives the query
+        filters = [(field, value) for field, value in zip(INDEXED_FIELDS, (assignee, priority, progress_status))
+                   if value is not None]
+        candidate_sets = sorted((self.__get_field_indexes()[field].get(value, set()) for field, value in filters),
+                                key=len)
+
+        due_range = None
+        if due_from is not None or due_before is not None:
+            due_index = self.__get_due_index()
+            from_ordinal = self.__parse_date(due_from) if due_from is not None else 0
+            before_ordinal = self.__parse_date(due_before) if due_before is not None else NO_DUE_ORDINAL
+            first = bisect_left(due_index, (from_ordinal,))
+            last = bisect_left(due_index, (before_ordinal,))
+            due_range = range(first, max(first, last))
+
+        if due_range is not None and (not candidate_sets or len(due_range) < len(candidate_sets[0])):
+            # Due date index slice, already ordered by due date
+            candidates = [due_index[position][1] for position in due_range
+                          if all(due_index[position][1] in task_ids for task_ids in candidate_sets)]
+            is_sorted = sort_by == "due_date" and not descending
+        elif candidate_sets:
+            candidates = [task_id for task_id in candidate_sets[0]
+                          if all(task_id in task_ids for task_ids in candidate_sets[1:])]
+            if due_range is not None:
+                candidates = [task_id for task_id in candidates
+                              if from_ordinal <= self.__tasks[task_id].due_ordinal < before_ordinal]
+            is_sorted = False
+        else:
+            # No filter: the tasks themselves, in insertion order. When it's the requested order, only
+            # the returned tasks get built
+            is_sorted = sort_by == "id" and not descending and self.__ids_in_order
+            candidates = self.__tasks.keys() if is_sorted else self.__hydrate_all().keys()
+
+        end = offset + limit if limit is not None else None
+        if is_sorted:
+            # Sliced before getting the tasks, the skipped ones aren't built
+            return [self.get_task(task_id) for task_id in islice(candidates, offset, end)]
+
+        tasks = (self.get_task(task_id) for task_id in candidates)
+        if end is not None:
+            tasks = (nlargest if descending else nsmallest)(end, tasks, key=sort_key)
+        else:
+            tasks = sorted(tasks, key=sort_key, reverse=descending)
+        return list(islice(tasks, offset, end))
+
+    # -----------------------------------------------------------------------------
+    # render_tasklist
+    # -----------------------------------------------------------------------------
+    def render_tasklist(self, tasks: List[Task] = None, sort_by: str = None, limit: int = None, page: int = 1) -> str:
+        """ Renders the display of the task list, only the tasks of the requested page get formatted
+
+        Column widths fit the displayed values, the rows all go through one precomputed format.
+
+        Args:
+            tasks (List[Task]): tasks to display, every task of the list by default (only the displayed ones get built)
+            sort_by (str): one of QUERY_SORT_KEYS, the order of the given tasks or the ID order by default
+            limit (int): number of tasks per page, all of them by default
+            page (int): page to display, starting at 1
+
+        Returns:
+            str: the display of the task list
+
+        Raises:
+            ValueError: if sort_by is unknown or if page or limit isn't positive
+        """
+        if page < 1 or (limit is not None and limit < 1):
+            logger.error("Display page and limit must be positive.")
+            raise ValueError("Display page and limit must be positive.")
+
+        offset = (page - 1) * limit if limit is not None else 0
+        end = offset + limit if limit is not None else None
+        if tasks is None:
+            task_count = len(self.__tasks)
+            tasks = self.query(sort_by=sort_by if sort_by is not None else "id", limit=limit, offset=offset)
+        else:
+            task_count = len(tasks)
+            if sort_by is not None:
+                sort_key = self.__get_sort_key(sort_by)
+                tasks = nsmallest(end, tasks, key=sort_key) if end is not None else sorted(tasks, key=sort_key)
+            tasks = list(islice(tasks, offset, end))
+
+        # Rows as strings, header included, then the width of each column in a single pass over them
+        rows = [DISPLAY_HEADERS]
+        rows.extend((str(task.task_id), task.name, task.progress_status, task.assignee, task.due_date, task.priority)
+                    for task in tasks)
+        widths = [max(map(len, column)) for column in zip(*rows)]
+        row_format = "".join(f"{{:<{width + 2}}}" for width in widths[:-1]) + "{}"
+
+        title = [f"Todo List: {self.__name}", f"Owner(s): {', '.join(self.__owners)}", f"Tag(s): {', '.join(self.__tags)}"]
+        if limit is not None:
+            title.append(f"Page {page}/{max(1, (task_count + limit - 1) // limit)} - {task_count} task(s)")
+        separator = "-" * max(sum(widths) + 2 * (len(widths) - 1), *map(len, title))
+
+        lines = ["", separator, *title, separator, row_format.format(*rows[0]), separator]
+        lines.extend(row_format.format(*row) for row in islice(rows, 1, None))
+        lines.append(separator)
+        return "\n".join(lines) + "\n"
+
+    # -----------------------------------------------------------------------------
+    # display_tasklist
+    # -----------------------------------------------------------------------------
+    def display_tasklist(self, tasks: List[Task] = None, sort_by: str = None, limit: int = None,
+                         page: int = 1) -> None:  # pragma: no cover
+        """ Creates a default display of the task list, written at once.
+
+        Args:
+            tasks (List[Task]): tasks to display, every task of the list by default
+            sort_by (str): one of QUERY_SORT_KEYS, the order of the given tasks or the ID order by default
+            limit (int): number of tasks per page, all of them by default
+            page (int): page to display, starting at 1
+        """
+        sys.stdout.write(self.render_tasklist(tasks, sort_by, limit, page))
 
     # -----------------------------------------------------------------------------
     # display_task_description
@@ -165,19 +641,15 @@ class TaskList:
         """ Creates a default display of the task description.
 
         Args:
-            task_id (int): ID of the task to update.
+            task_id (int): ID of the task to display.
 
         Raises:
-            ValueError: if Task ID is out of range
+            ValueError: if no task has the given ID
         """
-        if 0 < task_id <= len(self.__tasks):
-            task = self.__tasks[task_id - 1]
-            print(f"\n{task_id}. {task.name} - "
-                  f"Description: {task.description}"
-                  )
-        else:
-            logger.error(f"Task ID #{task_id} is out of range.")
-            raise ValueError(f"Task ID '{task_id}' is out of range.")
+        task = self.get_task(task_id)
+        print(f"\n{task_id}. {task.name} - "
+              f"Description: {task.description}"
+              )
 
     # -----------------------------------------------------------------------------
     # name getter
@@ -195,7 +667,9 @@ class TaskList:
 
     @owners.setter
     def owners(self, owners: List[str]):
-        self.__owners = owners
+        if owners != self.__owners:
+            self.__owners = owners
+            self.__changed_fields.add("owners")
 
     # -----------------------------------------------------------------------------
     # tags getter & estter
@@ -206,14 +680,113 @@ class TaskList:
 
     @tags.setter
     def tags(self, tags: List[str]):
-        self.__tags = tags
+        if tags != self.__tags:
+            self.__tags = tags
+            self.__changed_fields.add("tags")
 
     # -----------------------------------------------------------------------------
     # tasks getter
     # -----------------------------------------------------------------------------
     @property
     def tasks(self) -> List:
-        return self.__tasks
+        return list(self.__hydrate_all().values())
+
+    # -----------------------------------------------------------------------------
+    # next_task_id getter
+    # -----------------------------------------------------------------------------
+    @property
+    def next_task_id(self) -> int:
+        return self.__next_task_id
+
+    # -----------------------------------------------------------------------------
+    # __changed_tasks
+    # -----------------------------------------------------------------------------
+    def __changed_tasks(self):
+        """ Tasks changed since the TaskList was loaded or last saved, added tasks excluded
+
+        Only the tasks built from their dictionary can have changed, raw ones are skipped.
+
+        Yields:
+            Task: the changed tasks, in insertion order
+        """
+        for task_id, task in self.__tasks.items():
+            if type(task) is not dict and task_id not in self.__added_ids and task.changed_fields:
+                yield task
+
+    # -----------------------------------------------------------------------------
+    # has_changes getter
+    # -----------------------------------------------------------------------------
+    @property
+    def has_changes(self) -> bool:
+        """ Whether the TaskList has anything to save: it was never saved, or changed since it was loaded or saved
+        """
+        return (not self.__persisted or bool(self.__changed_fields or self.__added_ids or self.__removed_ids)
+                or next(self.__changed_tasks(), None) is not None)
+
+    # -----------------------------------------------------------------------------
+    # get_delta
+    # -----------------------------------------------------------------------------
+    def get_delta(self):
+        """ Changes of the TaskList since it was loaded or last saved, for storages able to only write those
+
+        Changed tasks only hold their ID and changed fields, added tasks are complete. A TaskList never
+        saved, or whose stored tasks had no ID (legacy data), has no stored version to apply a delta to.
+
+        Returns:
+            dict: the delta (taskListName, fields, addedTasks, updatedTasks and removedTaskIds),
+            None if the TaskList must be written in full with to_dict
+        """
+        if not self.__persisted:
+            return None
+
+        fields = {}
+        for field in self.__changed_fields:
+            fields[field] = self.__next_task_id if field == "nextTaskId" else getattr(self, field)
+
+        updated_tasks = []
+        for task in self.__changed_tasks():
+            task_dict = task.to_dict()
+            updated_tasks.append(dict({field: task_dict[field] for field in task.changed_fields}, id=task.task_id))
+
+        return {
+            "taskListName": self.__name,
+            "fields": fields,
+            "addedTasks": [self.__tasks[task_id].to_dict() for task_id in sorted(self.__added_ids)],
+            "updatedTasks": updated_tasks,
+            "removedTaskIds": sorted(self.__removed_ids)
+        }
+
+    # -----------------------------------------------------------------------------
+    # mark_clean
+    # -----------------------------------------------------------------------------
+    def mark_clean(self) -> None:
+        """ Forgets the changes of the TaskList and its tasks, once it was saved
+        """
+        for task in self.__changed_tasks():
+            task.mark_clean()
+        for task_id in self.__added_ids:
+            self.__tasks[task_id].mark_clean()
+
+        self.__changed_fields = set()
+        self.__added_ids = set()
+        self.__removed_ids = set()
+        self.__persisted = True
+
+    # -----------------------------------------------------------------------------
+    # to_column_store
+    # -----------------------------------------------------------------------------
+    def to_column_store(self):
+        """ Columnar copy of the tasks, for bulk filters and aggregations
+
+        Returns:
+            TaskColumnStore object, its tasks property gives lazy views of the tasks
+        """
+        # Imported on use, NumPy (when installed) is slow to import
+        from src.TaskList.TaskColumnStore import TaskColumnStore
+
+        store = TaskColumnStore()
+        store.extend((task.to_dict() for task in self.__hydrate_all().values()), self.__name)
+        return store
 
     # -----------------------------------------------------------------------------
     # to_dict
@@ -221,14 +794,26 @@ class TaskList:
     def to_dict(self):
         """ Dict representation of a TaskList object
 
+        Raw task dictionaries of tasks never accessed are output as they are, without being built.
+
         Returns:
             None
         """
+        tasks = []
+        for task_id, task in self.__tasks.items():
+            if type(task) is not dict:
+                tasks.append(task.to_dict())
+            elif task.get("id") == task_id:
+                tasks.append(task)
+            else:
+                tasks.append(dict(task, id=task_id))
+
         return {
             "taskListName": self.__name,
             "owners": self.__owners,
             "tags": self.__tags,
-            "tasks": [task.to_dict() for task in self.__tasks]
+            "tasks": tasks,
+            "nextTaskId": self.__next_task_id
         }
 
     # -----------------------------------------------------------------------------
@@ -238,18 +823,45 @@ class TaskList:
     def from_dict(cls, data: dict):
         """ Creates a TaskList Object from a given dictionary
 
+        Tasks are loaded lazily: their dictionaries are kept as they are, each Task object only gets
+        built (and validated) when the task is first accessed.
+
         Args:
             data (dict): dictionary data
 
         Returns:
             TaskList object
+
+        Raises:
+            ValueError: if two tasks have the same ID
         """
         task_list = cls(data["taskListName"], data["owners"], data["tags"])
-
-        # If the task list possesses some tasks, load them into the task list
-        if "tasks" in data:
-            for task_data in data["tasks"]:
-                task = Task.from_dict(task_data)
-                task_list.__add_task_from_object(task)
-
+        tasks = data.get("tasks", [])
+
+        # IDs are never reused: tasks stored without ID (legacy data) get IDs past every stored one
+        stored_ids = [task_data["id"] for task_data in tasks if "id" in task_data]
+        next_task_id = max([data.get("nextTaskId", 1)] + [task_id + 1 for task_id in stored_ids])
+
+        # If the task list possesses some tasks, load them into the task list. Legacy data gets new IDs
+        # it doesn't store, it can't be written as a delta until written in full once
+        task_dicts = task_list.__tasks
+        task_list.__persisted = True
+        last_task_id = 0
+        for task_data in tasks:
+            task_id = task_data.get("id")
+            if task_id is None:
+                task_id = next_task_id
+                next_task_id += 1
+                task_list.__persisted = False
+            elif task_id in task_dicts:
+                logger.error(f"Task ID #{task_id} is already used.")
+                raise ValueError(f"Task ID #{task_id} is already used.")
+
+            if task_id < last_task_id:
+                task_list.__ids_in_order = False
+            last_task_id = task_id
+            task_dicts[task_id] = task_data
+
+        task_list.__next_task_id = next_task_id
+        task_list.__raw_task_count = len(task_dicts)
         return task_list
@@ -1,6 +1,18 @@
+import copy
+import json
+
 from src import logger
 
+from src.Common.utils import DISPLAY_PAGE_SIZE
 from src.TaskList.TaskList import TaskList
+from src.TaskListCLi.TaskMeBatchHandler import TaskMeBatchHandler
+from src.TaskListCLi.TaskMeTransfer import detect_format, export_to_file, iter_import_chunks
+
+# Commands that never modify the data
+READ_ONLY_COMMANDS = ["display", "query", "taskdesc", "export", "report", "search"]
+
+# report --by choices -> TaskColumnStore columns
+REPORT_COLUMNS = {"status": "progress_status", "priority": "priority", "assignee": "assignee", "tasklist": "task_list"}
 
 
 # -----------------------------------------------------------------------------
@@ -11,11 +23,17 @@ def initialize_commands():
     return {
         "create": create_task_list,
         "addtask": add_task,
+        "importtasks": import_tasks,
         "rmtask": remove_task,
         "update": update_task_list,
         "updatetask": update_task,
         "display": display_task_list,
-        "taskdesc": display_task_description
+        "query": query_tasks,
+        "taskdesc": display_task_description,
+        "export": export_task_lists,
+        "import": import_task_data,
+        "report": report_tasks,
+        "search": search_tasks
     }
 
 
@@ -52,6 +70,80 @@ def handle_command(args, file_handler) -> bool:
     return is_executed
 
 
+# -----------------------------------------------------------------------------
+# run_command
+# -----------------------------------------------------------------------------
+def run_command(args, file_handler) -> bool:
+    """ Runs a single command, as a transaction if it modifies the data and the storage supports it
+
+    Args:
+        args: command arguments
+        file_handler: file handler object
+
+    Returns:
+        True if command was executed successfully, False otherwise
+    """
+    if hasattr(file_handler, "transaction") and args.subcommand not in READ_ONLY_COMMANDS:
+        with file_handler.transaction():
+            return handle_command(args, file_handler)
+    return handle_command(args, file_handler)
+
+
+# -----------------------------------------------------------------------------
+# handle_batch
+# -----------------------------------------------------------------------------
+def handle_batch(commands, file_handler) -> int:
+    """ Runs a batch of commands, each touched task list is loaded once and written back in a single flush
+
+    Commands run in the order of the batch. A failed command leaves no partial change behind: its task
+    list is restored from a snapshot taken right before it. Pending changes are flushed before each
+    command not bound to a task list (e.g. import, export), all task lists get reloaded if it fails.
+
+    Args:
+        commands: list of parsed command arguments
+        file_handler: file handler object
+
+    Returns:
+        The number of commands that failed
+    """
+    batch_handler = TaskMeBatchHandler(file_handler)
+
+    # Names of the task lists modified since the last flush
+    staged = set()
+    failed = 0
+    for args in commands:
+        task_list_name = getattr(args, "task_list_name", None)
+        if task_list_name is None:
+            batch_handler.flush()
+            staged.clear()
+            if not handle_command(args, batch_handler):
+                failed += 1
+                batch_handler.invalidate()
+            continue
+
+        if args.subcommand in READ_ONLY_COMMANDS:
+            if not handle_command(args, batch_handler):
+                failed += 1
+            continue
+
+        snapshot = copy.deepcopy(batch_handler.read(task_list_name))
+        if handle_command(args, batch_handler):
+            staged.add(task_list_name)
+            continue
+
+        failed += 1
+        batch_handler.invalidate(task_list_name)
+        if task_list_name in staged:
+            # Changes of the previous commands are kept staged
+            batch_handler.write(snapshot)
+        else:
+            batch_handler.load(task_list_name, snapshot)
+
+    batch_handler.flush()
+    logger.info(f"Batch of {len(commands)} command(s) executed, {failed} failed")
+    return failed
+
+
 # -----------------------------------------------------------------------------
 # task_list_sanity_check
 # -----------------------------------------------------------------------------
@@ -69,11 +161,44 @@ def task_list_sanity_check(task_list_name, file_handler):
     Raises:
         Exception: if task list name was not found in the data file
     """
-    task_list_data = file_handler.read(task_list_name)
-    if not task_list_data:
+    if isinstance(file_handler, TaskMeBatchHandler):
+        task_list = file_handler.get_task_list(task_list_name)
+    else:
+        task_list_data = file_handler.read(task_list_name)
+        task_list = TaskList.from_dict(task_list_data) if task_list_data else None
+
+    if task_list is None:
         raise Exception(f"Task list '{task_list_name}' not found")
 
-    return TaskList.from_dict(task_list_data)
+    return task_list
+
+
+# -----------------------------------------------------------------------------
+# save_task_list
+# -----------------------------------------------------------------------------
+def save_task_list(task_list, file_handler) -> None:
+    """ Saves a task list, batched commands only stage it until the batch is flushed
+
+    An unchanged task list isn't written at all, storages able to persist deltas (journal) only write the changes.
+
+    Args:
+        task_list: TaskList object
+        file_handler: file handler object
+    """
+    if isinstance(file_handler, TaskMeBatchHandler):
+        file_handler.stage(task_list)
+        return
+
+    if not task_list.has_changes:
+        logger.debug(f"Task list '{task_list.name}' unchanged, nothing to save")
+        return
+
+    task_list_delta = task_list.get_delta() if hasattr(file_handler, "write_delta") else None
+    if task_list_delta is not None:
+        file_handler.write_delta(task_list_delta)
+    else:
+        file_handler.write(task_list.to_dict())
+    task_list.mark_clean()
 
 
 # -----------------------------------------------------------------------------
@@ -87,7 +212,7 @@ def create_task_list(args, file_handler) -> None:
         file_handler: file handler object
     """
     task_list = TaskList(args.task_list_name, args.owners, args.tags)
-    file_handler.write(task_list.to_dict())
+    save_task_list(task_list, file_handler)
     logger.info(f"Task list '{args.task_list_name}' created and saved")
 
 
@@ -113,7 +238,7 @@ def update_task_list(args, file_handler) -> None:
 
     task_list.update_tasklist(**update_args)
 
-    file_handler.write(task_list.to_dict())
+    save_task_list(task_list, file_handler)
     logger.info(f"Task list '{args.task_list_name}' updated and saved")
 
 
@@ -130,10 +255,39 @@ def add_task(args, file_handler) -> None:
     task_list = task_list_sanity_check(args.task_list_name, file_handler)
     task_list.add_task(assignee=args.assignee, name=args.name, due_date=args.due_date,
                        priority=args.priority, description=args.description)
-    file_handler.write(task_list.to_dict())
+    save_task_list(task_list, file_handler)
     logger.info(f"Task '{args.name}' added and saved")
 
 
+# -----------------------------------------------------------------------------
+# import_tasks
+# -----------------------------------------------------------------------------
+def import_tasks(args, file_handler) -> None:
+    """ Adds the tasks of a JSON file into an existing task list, with a single save
+
+    The JSON file holds either a list of task objects or a task list object (e.g. from another TaskMe data file).
+
+    Args:
+        args: command arguments
+        file_handler: file handler object
+
+    Raises:
+        Exception: if the JSON file holds neither a list of tasks nor a task list
+    """
+    task_list = task_list_sanity_check(args.task_list_name, file_handler)
+    with open(args.input_file, 'r') as file:
+        data = json.load(file)
+
+    tasks = data.get("tasks") if isinstance(data, dict) else data
+    if not isinstance(tasks, list):
+        logger.error(f"No tasks found in '{args.input_file}'")
+        raise Exception(f"No tasks found in '{args.input_file}'")
+
+    task_ids = task_list.add_tasks(tasks)
+    save_task_list(task_list, file_handler)
+    logger.info(f"{len(task_ids)} task(s) imported from '{args.input_file}' and saved")
+
+
 # -----------------------------------------------------------------------------
 # update_task
 # -----------------------------------------------------------------------------
@@ -163,7 +317,7 @@ def update_task(args, file_handler) -> None:
 
     task_list.update_task(args.task_id, **update_args)
 
-    file_handler.write(task_list.to_dict())
+    save_task_list(task_list, file_handler)
     logger.info(f"Task '{args.name}' updated and saved")
 
 
@@ -179,7 +333,7 @@ def remove_task(args, file_handler) -> None:
     """
     task_list = task_list_sanity_check(args.task_list_name, file_handler)
     task_list.remove_task(task_id=args.task_id)
-    file_handler.write(task_list.to_dict())
+    save_task_list(task_list, file_handler)
     logger.info(f"Task  #{args.task_id} removed")
 
 
@@ -194,7 +348,33 @@ def display_task_list(args, file_handler) -> None:
         file_handler: file handler object
     """
     task_list = task_list_sanity_check(args.task_list_name, file_handler)
-    task_list.display_tasklist()
+    if args.overdue:
+        tasks = task_list.overdue_tasks()
+    elif args.due_before is not None:
+        tasks = task_list.tasks_due_before(args.due_before)
+    else:
+        tasks = None
+
+    # A page without limit is a page of DISPLAY_PAGE_SIZE tasks
+    limit = args.limit if args.limit is not None or args.page is None else DISPLAY_PAGE_SIZE
+    task_list.display_tasklist(tasks, sort_by=args.sort, limit=limit, page=args.page if args.page is not None else 1)
+
+
+# -----------------------------------------------------------------------------
+# query_tasks
+# -----------------------------------------------------------------------------
+def query_tasks(args, file_handler) -> None:
+    """ Displays the tasks of the selected task list matching the filters
+
+    Args:
+        args: command arguments
+        file_handler: file handler object
+    """
+    task_list = task_list_sanity_check(args.task_list_name, file_handler)
+    tasks = task_list.query(assignee=args.assignee, priority=args.priority, progress_status=args.status,
+                            due_from=args.due_from, due_before=args.due_before, sort_by=args.sort,
+                            descending=args.desc, limit=args.limit, offset=args.offset)
+    task_list.display_tasklist(tasks)
 
 
 # -----------------------------------------------------------------------------
@@ -209,3 +389,125 @@ def display_task_description(args, file_handler) -> None:
     """
     task_list = task_list_sanity_check(args.task_list_name, file_handler)
     task_list.display_task_description(args.task_id)
+
+
+# -----------------------------------------------------------------------------
+# export_task_lists
+# -----------------------------------------------------------------------------
+def export_task_lists(args, file_handler) -> None:
+    """ Exports all task lists to a JSON, JSON lines or CSV file, whatever the storage format
+
+    Task lists are streamed from the storage and written in chunks, the data is never held in memory at once.
+
+    Args:
+        args: command arguments
+        file_handler: file handler object
+    """
+    data_format = args.format if args.format is not None else detect_format(args.output_file)
+    with open(args.output_file, 'w', newline="", encoding="utf-8") as file:
+        task_list_count = export_to_file(file_handler.iter_task_lists(), file, data_format, pretty=args.pretty)
+    logger.info(f"{task_list_count} task list(s) exported to '{args.output_file}'")
+
+
+# -----------------------------------------------------------------------------
+# import_task_data
+# -----------------------------------------------------------------------------
+def import_task_data(args, file_handler) -> None:
+    """ Imports the tasks of a JSON lines or CSV file, streamed in chunks and added to their task lists
+
+    Each task list gets saved once all its tasks were added. Task lists described by the file (JSON lines
+    written by export) are created when they don't exist, tasks always get new IDs.
+
+    Args:
+        args: command arguments
+        file_handler: file handler object
+
+    Raises:
+        Exception: if a task list doesn't exist and isn't described by the file
+    """
+    data_format = args.format if args.format is not None else detect_format(args.input_file)
+    task_list = None
+    task_count = 0
+    with open(args.input_file, 'r', newline="", encoding="utf-8") as file:
+        for task_list_name, task_list_record, tasks in iter_import_chunks(file, data_format, args.import_task_list):
+            if task_list is None or task_list.name != task_list_name:
+                if task_list is not None:
+                    save_task_list(task_list, file_handler)
+                try:
+                    task_list = task_list_sanity_check(task_list_name, file_handler)
+                except Exception:
+                    if task_list_record is None:
+                        raise
+                    task_list = TaskList(task_list_name, task_list_record["owners"], task_list_record["tags"])
+
+            task_list.add_tasks(tasks)
+            task_count += len(tasks)
+
+    if task_list is not None:
+        save_task_list(task_list, file_handler)
+    logger.info(f"{task_count} task(s) imported from '{args.input_file}'")
+
+
+# -----------------------------------------------------------------------------
+# report_tasks
+# -----------------------------------------------------------------------------
+def report_tasks(args, file_handler) -> None:
+    """ Displays the number of tasks of all task lists, grouped by the requested columns
+
+    Args:
+        args: command arguments
+        file_handler: file handler object
+    """
+    # Imported on use, NumPy (when installed) is slow to import
+    from src.TaskList.TaskColumnStore import TaskColumnStore
+
+    store = TaskColumnStore.from_task_lists(file_handler.read_all())
+    criteria = {
+        "task_list": args.report_task_list,
+        "assignee": args.assignee,
+        "priority": args.priority,
+        "progress_status": args.status,
+        "due_before": args.due_before
+    }
+
+    for column in args.by:
+        counts = store.count_by(REPORT_COLUMNS[column], **criteria)
+        print("\n" + "-" * 50)
+        print(f"Tasks by {column}: {sum(counts.values())}")
+        print("-" * 50)
+        for value, count in counts.items():
+            print(f"{value:<40}{count:>10}")
+    print("-" * 50)
+
+
+# -----------------------------------------------------------------------------
+# search_tasks
+# -----------------------------------------------------------------------------
+def search_tasks(args, file_handler) -> None:
+    """ Displays the tasks of all task lists matching the search criteria
+
+    Args:
+        args: command arguments
+        file_handler: file handler object
+    """
+    # Imported on use, only searches need SQLite
+    from src.System.TaskMeSearchIndex.TaskMeSearchIndex import search_storage
+
+    results = search_storage(file_handler, assignee=args.assignee, owner=args.owner, tag=args.tag,
+                             words=" ".join(args.words), task_list=args.search_task_list, limit=args.limit)
+
+    print("\n" + "-" * 130)
+    print(f"{len(results)} matching task(s)")
+    print("-" * 130)
+    headers = ['Task List', 'Task', 'Status', 'Assignee', 'Due date', 'Priority']
+    print(f"{'ID':<5}" + "".join([f"{header:<20}" for header in headers]))
+    print("-" * 130)
+    for task_list_name, task_dict in results:
+        print(f"{task_dict.get('id', ''):<5}"
+              f"{task_list_name:<20}"
+              f"{task_dict['name']:<20}"
+              f"{task_dict['progress_status']:<20}"
+              f"{task_dict['assignee']:<20}"
+              f"{task_dict['due_date']:<20}"
+              f"{task_dict['priority']}")
+    print("-" * 130)
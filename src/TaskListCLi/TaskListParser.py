@@ -0,0 +1,429 @@
+import argparse
+
+# Only lightweight modules are imported here, the command parser gets built before any command runs
+from src.Common.utils import (CONCURRENCY_MODES, DATA_FORMATS, DEFAULT_FSYNC_INTERVAL_MS, DEFAULT_LOCK_TIMEOUT,
+                              DISPLAY_PAGE_SIZE, DURABILITY_MODES, QUERY_SORT_KEYS, TRANSFER_FORMATS, VALID_PRIORITIES,
+                              VALID_PROGRESS_STATUSES)
+from src.System.StorageFactory.StorageFactory import initialize_storage_backends
+
+# Description of the command parser, listing every command
+PARSER_DESCRIPTION = """Task List Manager
+
+        Subcommands:
+        create       - Create a new task list.
+        addtask      - Add a new task to an existing task list.
+        importtasks  - Add the tasks of a JSON file to an existing task list.
+        rmtask       - Remove a task from a task list.
+        update       - Update the details of an existing task list.
+        updatetask   - Update details of a task in a task list.
+        display      - Display the tasks in a task list.
+        query        - Display the tasks of a task list matching filters, sorted and paginated.
+        taskdesc     - Display the detailed description of a specific task.
+        export       - Export all task lists to a JSON, JSON lines or CSV file.
+        import       - Import the tasks of a JSON lines or CSV file.
+        report       - Count the tasks of all task lists by status, priority, assignee or task list.
+        search       - Find the tasks of all task lists by assignee, owner, tag or words, ranked by relevance.
+
+        Examples:
+           create 'My tasks' 'John Doe'
+           addtask 'My tasks' 'John Doe' 'Buy milk' 01/01/2023 MEDIUM 'Buy fat milk from Walmart'
+           rmtask 'My Tasks' 5
+
+        NOTE: For multi-word arguments, please enclose them in quotes.
+        """
+
+
+# -----------------------------------------------------------------------------
+# add_create_parser
+# -----------------------------------------------------------------------------
+def add_create_parser(subparsers) -> None:
+    """ Adds the parser of the 'create' command (task list creation)
+
+    Args:
+        subparsers: subparsers action of the command parser
+    """
+    create_parser = subparsers.add_parser("create",
+                                          help="Creates a new task list: create <task_list_name> <owner1> "
+                                               "[owner2 ...] [--tags tag1 tag2 ...]")
+    create_parser.add_argument("task_list_name", type=str,
+                               help="Name of the future Task Lst (if multiple words per tag, enclose in quotes)")
+    create_parser.add_argument("owners", nargs='+', type=str,
+                               help="<owner1> [owner2 ...]: Owners of the new task list")
+    create_parser.add_argument("--tags", nargs='+', default=[], type=str,
+                               help="[--tags tag1 tag2 ...]: Tags for the new task list")
+
+
+# -----------------------------------------------------------------------------
+# add_addtask_parser
+# -----------------------------------------------------------------------------
+def add_addtask_parser(subparsers) -> None:
+    """ Adds the parser of the 'addtask' command (task addition)
+
+    Args:
+        subparsers: subparsers action of the command parser
+    """
+    addtask_parser = subparsers.add_parser("addtask",
+                                           help="Adds a task: addtask <task_list_name> <assignee> <name> <due_date>"
+                                                " <priority> <description>")
+    addtask_parser.add_argument("task_list_name", type=str,
+                                help="Task list to add to")
+    addtask_parser.add_argument("assignee", type=str,
+                                help="Task assignee")
+    addtask_parser.add_argument("name", type=str,
+                                help="Task name")
+    addtask_parser.add_argument("due_date", type=str,
+                                help="Due date (format: DD/MM/YYYY)")
+    addtask_parser.add_argument("priority", type=str, choices=VALID_PRIORITIES,
+                                help=f"Priority choices)")
+    addtask_parser.add_argument("description", type=str,
+                                help="Task description (if multiple words, enclose in quotes)")
+
+
+# -----------------------------------------------------------------------------
+# add_importtasks_parser
+# -----------------------------------------------------------------------------
+def add_importtasks_parser(subparsers) -> None:
+    """ Adds the parser of the 'importtasks' command (bulk task addition)
+
+    Args:
+        subparsers: subparsers action of the command parser
+    """
+    importtasks_parser = subparsers.add_parser("importtasks",
+                                               help="Adds the tasks of a JSON file: importtasks <task_list_name>"
+                                                    " <input_file>")
+    importtasks_parser.add_argument("task_list_name", type=str,
+                                    help="Task list to add to")
+    importtasks_parser.add_argument("input_file", type=str,
+                                    help="JSON file holding a list of tasks (assignee, name, due_date, priority,"
+                                         " description and optionally progress_status) or a task list")
+
+
+# -----------------------------------------------------------------------------
+# add_rmtask_parser
+# -----------------------------------------------------------------------------
+def add_rmtask_parser(subparsers) -> None:
+    """ Adds the parser of the 'rmtask' command (task removal)
+
+    Args:
+        subparsers: subparsers action of the command parser
+    """
+    rmtask_parser = subparsers.add_parser("rmtask",
+                                          help="Removes a task: rmtask <task_list_name> <task_id>")
+    rmtask_parser.add_argument("task_list_name", type=str,
+                               help="Task List from which to remove (if multiple words, enclose in quotes)")
+    rmtask_parser.add_argument("task_id", type=int,
+                               help="ID of the task to remove")
+
+
+# -----------------------------------------------------------------------------
+# add_update_parser
+# -----------------------------------------------------------------------------
+def add_update_parser(subparsers) -> None:
+    """ Adds the parser of the 'update' command (task list update)
+
+    Args:
+        subparsers: subparsers action of the command parser
+    """
+    update_parser = subparsers.add_parser("update",
+                                          help="Updates a task list: update <task_list_name>"
+                                               " [--owners owner1 owner2 ...] [--tags tag1 tag2 ...]")
+    update_parser.add_argument("task_list_name", type=str,
+                               help="Task List name to update (if multiple words, enclose in quotes)")
+    update_parser.add_argument("--owners", nargs='+', type=str,
+                               help="Specify new owner(s) for the task list")
+    update_parser.add_argument("--tags", nargs='+', type=str,
+                               help="Add/Modify tags for the task list")
+
+
+# -----------------------------------------------------------------------------
+# add_updatetask_parser
+# -----------------------------------------------------------------------------
+def add_updatetask_parser(subparsers) -> None:
+    """ Adds the parser of the 'updatetask' command (task update)
+
+    Args:
+        subparsers: subparsers action of the command parser
+    """
+    updatetask_parser = subparsers.add_parser("updatetask",
+                                              help="Updates task attributes: updatetask <task_list_name>"
+                                                   " <task_id> [options...]")
+    updatetask_parser.add_argument("task_list_name", type=str,
+                                   help="Task List name containing targeted task"
+                                        " (if multiple words, enclose in quotes)")
+    updatetask_parser.add_argument("task_id", type=int,
+                                   help="ID of the task to update")
+    updatetask_parser.add_argument("--assignee", type=str,
+                                   help="Update the assignee of the task")
+    updatetask_parser.add_argument("--name", type=str,
+                                   help="Update the name/title of the task")
+    updatetask_parser.add_argument("--due_date", type=str,
+                                   help="Change the task due date (format: DD/MM/YYYY)")
+    updatetask_parser.add_argument("--priority", type=str, choices=VALID_PRIORITIES,
+                                   help="Set a new task priority")
+    updatetask_parser.add_argument("--description", type=str,
+                                   help="Modify the task's description")
+    updatetask_parser.add_argument("--progress_status", type=str, choices=VALID_PROGRESS_STATUSES,
+                                   help="Update the task's progress status")
+
+
+# -----------------------------------------------------------------------------
+# add_display_parser
+# -----------------------------------------------------------------------------
+def add_display_parser(subparsers) -> None:
+    """ Adds the parser of the 'display' command (task list display)
+
+    Args:
+        subparsers: subparsers action of the command parser
+    """
+    display_parser = subparsers.add_parser("display",
+                                           help="Displays the content of a task list: display <task_list_name>"
+                                                " [--due-before DD/MM/YYYY | --overdue] [--sort key] [--page N]"
+                                                " [--limit N]")
+    display_parser.add_argument("task_list_name", type=str,
+                                help="Task List name you want to display (if multiple words, enclose in quotes)")
+    due_group = display_parser.add_mutually_exclusive_group()
+    due_group.add_argument("--due-before", type=str,
+                           help="Only display the tasks due before this date (format: DD/MM/YYYY), by due date")
+    due_group.add_argument("--overdue", action="store_true",
+                           help="Only display the tasks not completed whose due date has passed, by due date")
+    display_parser.add_argument("--sort", choices=list(QUERY_SORT_KEYS),
+                                help="Sort key of the tasks (default: id, due_date for due date filters)")
+    display_parser.add_argument("--page", type=int,
+                                help="Page of tasks to display, starting at 1")
+    display_parser.add_argument("--limit", type=int,
+                                help=f"Number of tasks per page (default: all of them, {DISPLAY_PAGE_SIZE} with --page)")
+
+
+# -----------------------------------------------------------------------------
+# add_query_parser
+# -----------------------------------------------------------------------------
+def add_query_parser(subparsers) -> None:
+    """ Adds the parser of the 'query' command (task filtering)
+
+    Args:
+        subparsers: subparsers action of the command parser
+    """
+    query_parser = subparsers.add_parser("query",
+                                         help="Displays the tasks of a task list matching filters: query"
+                                              " <task_list_name> [filters...] [--sort key] [--limit N]")
+    query_parser.add_argument("task_list_name", type=str,
+                              help="Task List name you want to query (if multiple words, enclose in quotes)")
+    query_parser.add_argument("--assignee", type=str,
+                              help="Only display the tasks of this assignee")
+    query_parser.add_argument("--priority", type=str, choices=VALID_PRIORITIES,
+                              help="Only display the tasks of this priority")
+    query_parser.add_argument("--status", type=str, choices=VALID_PROGRESS_STATUSES,
+                              help="Only display the tasks of this progress status")
+    query_parser.add_argument("--due-from", type=str,
+                              help="Only display the tasks due from this date (format: DD/MM/YYYY)")
+    query_parser.add_argument("--due-before", type=str,
+                              help="Only display the tasks due before this date (format: DD/MM/YYYY)")
+    query_parser.add_argument("--sort", choices=list(QUERY_SORT_KEYS), default="id",
+                              help="Sort key of the tasks (default: id)")
+    query_parser.add_argument("--desc", action="store_true",
+                              help="Sort in descending order")
+    query_parser.add_argument("--limit", type=int,
+                              help="Maximum number of tasks to display")
+    query_parser.add_argument("--offset", type=int, default=0,
+                              help="Number of matching tasks to skip (default: 0)")
+
+
+# -----------------------------------------------------------------------------
+# add_taskdesc_parser
+# -----------------------------------------------------------------------------
+def add_taskdesc_parser(subparsers) -> None:
+    """ Adds the parser of the 'taskdesc' command (task description display)
+
+    Args:
+        subparsers: subparsers action of the command parser
+    """
+    taskdesc_parser = subparsers.add_parser("taskdesc",
+                                            help="Displays the description of a specific task:"
+                                                 " taskdesc <task_list_name> <task_id>")
+    taskdesc_parser.add_argument("task_list_name", type=str,
+                                 help="Task List name of the targeted task (if multiple words, enclose in quotes)")
+    taskdesc_parser.add_argument("task_id", type=int,
+                                 help="ID of the task whose description you want to display ")
+
+
+# -----------------------------------------------------------------------------
+# add_export_parser
+# -----------------------------------------------------------------------------
+def add_export_parser(subparsers) -> None:
+    """ Adds the parser of the 'export' command (data export)
+
+    Args:
+        subparsers: subparsers action of the command parser
+    """
+    export_parser = subparsers.add_parser("export",
+                                          help="Exports all task lists: export <output_file> [--format F] [--pretty]")
+    export_parser.add_argument("output_file", type=str,
+                               help="Path of the file to create")
+    export_parser.add_argument("--format", choices=TRANSFER_FORMATS,
+                               help="json (TaskMe data file), jsonl (one task list or task per line) or csv (one task"
+                                    " per row), guessed from the file extension by default, json otherwise")
+    export_parser.add_argument("--pretty", action="store_true",
+                               help="Human-readable output (indented JSON)")
+
+
+# -----------------------------------------------------------------------------
+# add_import_parser
+# -----------------------------------------------------------------------------
+def add_import_parser(subparsers) -> None:
+    """ Adds the parser of the 'import' command (data import)
+
+    Args:
+        subparsers: subparsers action of the command parser
+    """
+    import_parser = subparsers.add_parser("import",
+                                          help="Imports the tasks of a file: import <input_file> [--format F]"
+                                               " [--list L]")
+    import_parser.add_argument("input_file", type=str,
+                               help="Path of the JSON lines or CSV file to import, e.g. written by export")
+    import_parser.add_argument("--format", choices=[data_format for data_format in TRANSFER_FORMATS
+                                                    if data_format != "json"],
+                               help="jsonl or csv, guessed from the file extension by default")
+    import_parser.add_argument("--list", dest="import_task_list", type=str,
+                               help="Existing task list receiving every task, instead of the one named by each task")
+
+
+# -----------------------------------------------------------------------------
+# add_report_parser
+# -----------------------------------------------------------------------------
+def add_report_parser(subparsers) -> None:
+    """ Adds the parser of the 'report' command (task statistics)
+
+    Args:
+        subparsers: subparsers action of the command parser
+    """
+    report_parser = subparsers.add_parser("report",
+                                          help="Counts the tasks of all task lists: report [--by column ...]"
+                                               " [filters...]")
+    report_parser.add_argument("--by", nargs='+', choices=["status", "priority", "assignee", "tasklist"],
+                               default=["status", "priority", "assignee"],
+                               help="Columns to count the tasks by (default: status priority assignee)")
+    report_parser.add_argument("--list", dest="report_task_list", type=str,
+                               help="Only count the tasks of this task list")
+    report_parser.add_argument("--assignee", type=str,
+                               help="Only count the tasks of this assignee")
+    report_parser.add_argument("--priority", type=str, choices=VALID_PRIORITIES,
+                               help="Only count the tasks of this priority")
+    report_parser.add_argument("--status", type=str, choices=VALID_PROGRESS_STATUSES,
+                               help="Only count the tasks of this progress status")
+    report_parser.add_argument("--due-before", type=str,
+                               help="Only count the tasks due before this date (format: DD/MM/YYYY)")
+
+
+# -----------------------------------------------------------------------------
+# add_search_parser
+# -----------------------------------------------------------------------------
+def add_search_parser(subparsers) -> None:
+    """ Adds the parser of the 'search' command (cross task list search)
+
+    Args:
+        subparsers: subparsers action of the command parser
+    """
+    search_parser = subparsers.add_parser("search",
+                                          help="Finds the tasks of all task lists: search [words...] [--assignee A]"
+                                               " [--owner O] [--tag T] [--list L] [--limit N]")
+    search_parser.add_argument("words", nargs='*',
+                               help="Words that must all appear in the task name or description, 'word*' matches"
+                                    " every word starting with 'word'. Tasks are ranked by relevance")
+    search_parser.add_argument("--assignee", type=str,
+                               help="Only find the tasks of this assignee")
+    search_parser.add_argument("--owner", type=str,
+                               help="Only find the tasks of the task lists owned by this person")
+    search_parser.add_argument("--tag", type=str,
+                               help="Only find the tasks of the task lists with this tag")
+    search_parser.add_argument("--list", dest="search_task_list", type=str,
+                               help="Only search this task list")
+    search_parser.add_argument("--limit", type=int,
+                               help="Maximum number of tasks to display")
+
+
+# -----------------------------------------------------------------------------
+# initialize_command_parsers
+# -----------------------------------------------------------------------------
+def initialize_command_parsers():
+    # Command parsers mapping, each builder only gets called when its command is needed
+    return {
+        "create": add_create_parser,
+        "addtask": add_addtask_parser,
+        "importtasks": add_importtasks_parser,
+        "rmtask": add_rmtask_parser,
+        "update": add_update_parser,
+        "updatetask": add_updatetask_parser,
+        "display": add_display_parser,
+        "query": add_query_parser,
+        "taskdesc": add_taskdesc_parser,
+        "export": add_export_parser,
+        "import": add_import_parser,
+        "report": add_report_parser,
+        "search": add_search_parser
+    }
+
+
+# -----------------------------------------------------------------------------
+# setup_parser
+# -----------------------------------------------------------------------------
+def setup_parser(subcommands=None):
+    """ Setting up the command parser
+
+    Args:
+        subcommands: names of the commands to build a parser for, all of them by default
+
+    Returns:
+        the initialized parser object
+    """
+    # TODO: consider using a specific library like 'click'p
+    parser = argparse.ArgumentParser(
+        description=PARSER_DESCRIPTION,
+        epilog="For detailed information about each command, type '<command> -h'.",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    subparsers = parser.add_subparsers(title="subcommands", dest="subcommand")
+
+    command_parsers = initialize_command_parsers()
+    for subcommand in subcommands if subcommands is not None else command_parsers:
+        command_parsers[subcommand](subparsers)
+
+    return parser
+
+
+# -----------------------------------------------------------------------------
+# setup_runner_parser
+# -----------------------------------------------------------------------------
+def setup_runner_parser(prog=None):
+    """ Setting up the parser of the runner options (storage selection and settings)
+
+    Args:
+        prog: program name shown in the usage, defaults to the script name
+
+    Returns:
+        the initialized runner parser object
+    """
+    runner_parser = argparse.ArgumentParser(prog=prog, description="TaskMe CLI runner")
+    runner_parser.add_argument("--storage", choices=list(initialize_storage_backends()), default="json",
+                               help="Storage backend used for the task lists (default: json)")
+    runner_parser.add_argument("--data-format", choices=DATA_FORMATS,
+                               help="On-disk format of the json storage (default: compact), existing files"
+                                    " are read whatever their format")
+    runner_parser.add_argument("--durability", choices=DURABILITY_MODES,
+                               help="fsync every write (always, default), group fsyncs every --fsync-interval-ms"
+                                    " (interval) or leave it to the OS (never, a system crash may then"
+                                    " truncate the data file)")
+    runner_parser.add_argument("--fsync-interval-ms", type=int, default=DEFAULT_FSYNC_INTERVAL_MS,
+                               help=f"Group commit interval of the 'interval' durability"
+                                    f" (default: {DEFAULT_FSYNC_INTERVAL_MS})")
+    runner_parser.add_argument("--concurrency", choices=CONCURRENCY_MODES,
+                               help="Concurrent writers of the json storage wait for each other (blocking, default)"
+                                    " or get their conflicting writes rejected (optimistic)")
+    runner_parser.add_argument("--lock-timeout", type=float,
+                               help=f"Seconds to wait for the json data file lock (default: {DEFAULT_LOCK_TIMEOUT})")
+    runner_parser.add_argument("--batch", metavar="FILE",
+                               help="Runs the commands of FILE ('-' for stdin), one per line, with a single write"
+                                    " of the touched task lists, then exits")
+    runner_parser.add_argument("--migrate-from", metavar="JSON_FILE",
+                               help="One-shot migration of a TaskMe JSON data file (any data format) into the"
+                                    " selected storage")
+    return runner_parser
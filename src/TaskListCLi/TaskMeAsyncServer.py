@@ -0,0 +1,405 @@
+import asyncio
+import io
+import json
+import os
+import sys
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager, redirect_stderr
+
+from src import logger
+
+from src.TaskListCLi.TaskListCli import handle_command, READ_ONLY_COMMANDS
+from src.TaskListCLi.TaskListParser import setup_parser
+from src.TaskListCLi.TaskMeBatchHandler import TaskMeBatchHandler
+from src.TaskListCLi.TaskMeClient import get_default_socket_path
+
+# Default number of threads writing to the storage
+DEFAULT_WRITE_WORKERS = 4
+
+
+# -----------------------------------------------------------------------------
+# _ThreadLocalStdout
+# -----------------------------------------------------------------------------
+class _ThreadLocalStdout(io.TextIOBase):
+    """ sys.stdout replacement sending the output of each thread to its own capture buffer
+
+    contextlib.redirect_stdout swaps sys.stdout for the whole process, outputs of commands running
+    in the event loop and in the thread pool at the same time would get mixed up.
+    """
+    def __init__(self, stream) -> None:
+        self.__stream = stream
+        self.__local = threading.local()
+
+    @property
+    def stream(self):
+        return self.__stream
+
+    def write(self, text: str) -> int:
+        return getattr(self.__local, "output", self.__stream).write(text)
+
+    def flush(self) -> None:
+        getattr(self.__local, "output", self.__stream).flush()
+
+    @contextmanager
+    def capture(self):
+        """ Captures what the current thread prints
+
+        Yields:
+            io.StringIO: the capture buffer
+        """
+        self.__local.output = io.StringIO()
+        try:
+            yield self.__local.output
+        finally:
+            del self.__local.output
+
+
+# -----------------------------------------------------------------------------
+# _TaskListLocks
+# -----------------------------------------------------------------------------
+class _TaskListLocks:
+    """ Locks of a TaskList served by the daemon
+
+    queue: held from the loading or modification of the TaskList until its storage write is done.
+    execution: held while a command runs against the resident TaskList, reads only queue up behind it.
+    """
+    def __init__(self) -> None:
+        self.queue = asyncio.Lock()
+        self.execution = asyncio.Lock()
+
+
+# -----------------------------------------------------------------------------
+# TaskMeAsyncServer
+# -----------------------------------------------------------------------------
+class TaskMeAsyncServer:
+    def __init__(self, file_handler, socket_path=None, max_workers: int = DEFAULT_WRITE_WORKERS) -> None:
+        """Initializes the asyncio TaskMe daemon, serving many clients concurrently.
+
+        Same protocol and commands as TaskMeServer. Commands and storage accesses run in a thread pool
+        and never block the event loop. The modifications of a TaskList go through its own queue, so that
+        writes of independent TaskLists proceed in parallel, while reads only wait for the command running
+        against the TaskList, never for its storage write.
+
+        Args:
+            file_handler: file handler of the storage owned by the daemon, must be thread-safe
+            socket_path: path of the socket, defaults to data/.taskme.sock
+            max_workers: number of threads accessing the storage
+        """
+        self.__file_handler = file_handler
+        self.__batch_handler = TaskMeBatchHandler(file_handler)
+        self.__parser = setup_parser()
+        self.__socket_path = socket_path if socket_path is not None else get_default_socket_path()
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="taskme-storage")
+
+        # TaskList name -> locks of the TaskList, dropped once no command uses them
+        self.__task_list_locks = weakref.WeakValueDictionary()
+
+        # Modifications not bound to a TaskList (e.g. import) run one at a time, holding every TaskList lock.
+        # The event is cleared while they take the locks, for no TaskList lock to be created meanwhile
+        self.__global_write_lock = asyncio.Lock()
+        self.__no_global_write = asyncio.Event()
+        self.__no_global_write.set()
+        self.__server = None
+
+    # -----------------------------------------------------------------------------
+    # socket_path getter
+    # -----------------------------------------------------------------------------
+    @property
+    def socket_path(self):
+        return self.__socket_path
+
+    # -----------------------------------------------------------------------------
+    # __get_task_list_locks
+    # -----------------------------------------------------------------------------
+    def __get_task_list_locks(self, task_list_name: str) -> _TaskListLocks:
+        """Locks of a TaskList, created on first use and kept as long as a command holds them (internal).
+
+        Args:
+            task_list_name (str): The name of the TaskList.
+
+        Returns:
+            _TaskListLocks: The TaskList locks.
+        """
+        locks = self.__task_list_locks.get(task_list_name)
+        if locks is None:
+            locks = self.__task_list_locks[task_list_name] = _TaskListLocks()
+        return locks
+
+    # -----------------------------------------------------------------------------
+    # __lock_task_list
+    # -----------------------------------------------------------------------------
+    @asynccontextmanager
+    async def __lock_task_list(self, task_list_name: str):
+        """Holds the queue lock of a TaskList, once the modification spanning every TaskList in progress is over (internal).
+
+        Args:
+            task_list_name (str): The name of the TaskList.
+
+        Yields:
+            _TaskListLocks: The TaskList locks.
+        """
+        await self.__no_global_write.wait()
+        locks = self.__get_task_list_locks(task_list_name)
+        async with locks.queue:
+            yield locks
+
+    # -----------------------------------------------------------------------------
+    # __lock_all_task_lists
+    # -----------------------------------------------------------------------------
+    @asynccontextmanager
+    async def __lock_all_task_lists(self):
+        """Holds the locks of every TaskList, for a modification spanning every TaskList (internal).
+
+        Commands already past the wait of __lock_task_list may still create their TaskList locks, the locks
+        are taken until there's none left.
+        """
+        async with self.__global_write_lock:
+            self.__no_global_write.clear()
+            acquired = []
+            try:
+                while pending := [lock for locks in list(self.__task_list_locks.values())
+                                  for lock in (locks.queue, locks.execution) if lock not in acquired]:
+                    for lock in pending:
+                        await lock.acquire()
+                        acquired.append(lock)
+                yield
+            finally:
+                for lock in acquired:
+                    lock.release()
+                self.__no_global_write.set()
+
+    # -----------------------------------------------------------------------------
+    # __in_executor
+    # -----------------------------------------------------------------------------
+    async def __in_executor(self, function, *args):
+        """Runs a blocking storage access in the thread pool (internal).
+
+        Args:
+            function: the function to run
+            *args: arguments of the function
+
+        Returns:
+            the result of the function
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.__executor, function, *args)
+
+    # -----------------------------------------------------------------------------
+    # __load
+    # -----------------------------------------------------------------------------
+    async def __load(self, task_list_name: str) -> None:
+        """Makes a TaskList resident, reading it in the thread pool; the TaskList lock must be held (internal).
+
+        Args:
+            task_list_name (str): The name of the TaskList.
+        """
+        if not self.__batch_handler.is_resident(task_list_name):
+            task_list_data = await self.__in_executor(self.__file_handler.read, task_list_name)
+            self.__batch_handler.load(task_list_name, task_list_data)
+
+    # -----------------------------------------------------------------------------
+    # __capture_output
+    # -----------------------------------------------------------------------------
+    @staticmethod
+    def __capture_output():
+        """Captures what the current thread prints, sys.stdout is replaced until the daemon closes (internal).
+
+        Returns:
+            a context manager yielding the capture buffer
+        """
+        if not isinstance(sys.stdout, _ThreadLocalStdout):
+            sys.stdout = _ThreadLocalStdout(sys.stdout)
+        return sys.stdout.capture()
+
+    # -----------------------------------------------------------------------------
+    # __handle
+    # -----------------------------------------------------------------------------
+    def __handle(self, args, file_handler) -> tuple:
+        """Runs a parsed command, capturing its output (internal).
+
+        Runs in the thread pool. Commands bound to a TaskList run against the resident TaskLists while
+        holding the TaskList execution lock: no other command touches the TaskList meanwhile. Commands
+        spanning every TaskList run against the storage or a batch handler of their own, never against
+        the resident TaskLists.
+
+        Args:
+            args: command arguments
+            file_handler: file handler the command runs against
+
+        Returns:
+            tuple: (True if the command succeeded, output of the command)
+        """
+        with self.__capture_output() as output:
+            is_executed = handle_command(args, file_handler)
+            if not is_executed:
+                print(f"Failed to execute command {args.subcommand}. Check logs for more details.")
+        return is_executed, output.getvalue()
+
+    # -----------------------------------------------------------------------------
+    # execute
+    # -----------------------------------------------------------------------------
+    async def execute(self, argv) -> tuple:
+        """Executes a command line, as the interactive CLI would.
+
+        Args:
+            argv: command line of the command, e.g. ["display", "My tasks"]
+
+        Returns:
+            tuple: (True if the command succeeded, output of the command)
+        """
+        with self.__capture_output() as output, redirect_stderr(output):
+            try:
+                args = self.__parser.parse_args(argv)
+            except SystemExit:
+                return False, output.getvalue()
+
+        task_list_name = getattr(args, "task_list_name", None)
+        if task_list_name is None:
+            if args.subcommand in READ_ONLY_COMMANDS:
+                # Commands reading every TaskList (e.g. export, report) read the storage in the thread pool,
+                # every modification is written through
+                return await self.__in_executor(self.__handle, args, self.__file_handler)
+            return await self.__execute_global_write(args)
+
+        if args.subcommand in READ_ONLY_COMMANDS:
+            # Reads queue up behind a TaskList being loaded or modified, never behind a storage write
+            if self.__batch_handler.is_resident(task_list_name):
+                await self.__no_global_write.wait()
+                locks = self.__get_task_list_locks(task_list_name)
+            else:
+                async with self.__lock_task_list(task_list_name) as locks:
+                    await self.__load(task_list_name)
+            async with locks.execution:
+                return await self.__in_executor(self.__handle, args, self.__batch_handler)
+
+        async with self.__lock_task_list(task_list_name) as locks:
+            await self.__load(task_list_name)
+            async with locks.execution:
+                is_executed, output = await self.__in_executor(self.__handle, args, self.__batch_handler)
+                task_list_dict = await self.__in_executor(self.__batch_handler.pop_staged, task_list_name)
+            if is_executed and task_list_dict is not None:
+                try:
+                    await self.__in_executor(self.__file_handler.write, task_list_dict)
+                except Exception as e:
+                    logger.error(f"Unable to save the changes of command {args.subcommand}: {e}")
+                    is_executed = False
+                    output += f"Failed to execute command {args.subcommand}. Check logs for more details.\n"
+
+            # A failed command may have left its TaskList half modified, it gets reloaded from the storage
+            if not is_executed:
+                async with locks.execution:
+                    self.__batch_handler.invalidate(task_list_name)
+            return is_executed, output
+
+    # -----------------------------------------------------------------------------
+    # __execute_global_write
+    # -----------------------------------------------------------------------------
+    async def __execute_global_write(self, args) -> tuple:
+        """Executes a modification not bound to a TaskList (e.g. import) while holding every TaskList lock (internal).
+
+        The command runs in the thread pool against a batch handler of its own, whose TaskLists are written
+        at once if it succeeds: a failed command leaves no partial change behind. Resident TaskLists are then
+        reloaded from the storage.
+
+        Args:
+            args: command arguments
+
+        Returns:
+            tuple: (True if the command succeeded, output of the command)
+        """
+        async with self.__lock_all_task_lists():
+            batch_handler = TaskMeBatchHandler(self.__file_handler)
+            try:
+                is_executed, output = await self.__in_executor(self.__handle, args, batch_handler)
+                if is_executed:
+                    try:
+                        await self.__in_executor(batch_handler.flush)
+                    except Exception as e:
+                        logger.error(f"Unable to save the changes of command {args.subcommand}: {e}")
+                        is_executed = False
+                        output += f"Failed to execute command {args.subcommand}. Check logs for more details.\n"
+            finally:
+                self.__batch_handler.invalidate()
+        return is_executed, output
+
+    # -----------------------------------------------------------------------------
+    # __handle_client
+    # -----------------------------------------------------------------------------
+    async def __handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answers the requests of a client connection, one JSON document per line (internal).
+
+        Args:
+            reader (asyncio.StreamReader): client stream reader
+            writer (asyncio.StreamWriter): client stream writer
+        """
+        try:
+            while line := await reader.readline():
+                try:
+                    argv = json.loads(line)["argv"]
+                    if not isinstance(argv, list):
+                        raise TypeError("argv must be a list")
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.warning(f"Invalid TaskMe daemon request: {e}")
+                    response = {"ok": False, "output": "Invalid request\n"}
+                else:
+                    ok, output = await self.execute([str(arg) for arg in argv])
+                    response = {"ok": ok, "output": output}
+
+                writer.write((json.dumps(response) + "\n").encode("utf-8"))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    # -----------------------------------------------------------------------------
+    # start
+    # -----------------------------------------------------------------------------
+    async def start(self) -> None:
+        """Starts listening on the socket.
+
+        Raises:
+            RuntimeError: if another daemon is listening on the socket
+        """
+        if os.path.exists(self.__socket_path):
+            try:
+                _, writer = await asyncio.open_unix_connection(str(self.__socket_path))
+            except OSError:
+                # Left by a daemon that didn't exit cleanly
+                os.remove(self.__socket_path)
+            else:
+                writer.close()
+                logger.error(f"A TaskMe daemon is already listening on {self.__socket_path}")
+                raise RuntimeError(f"A TaskMe daemon is already listening on {self.__socket_path}")
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.__socket_path)), exist_ok=True)
+        self.__server = await asyncio.start_unix_server(self.__handle_client, str(self.__socket_path))
+        logger.info(f"TaskMe asyncio daemon listening on {self.__socket_path}")
+
+    # -----------------------------------------------------------------------------
+    # close
+    # -----------------------------------------------------------------------------
+    async def close(self) -> None:
+        """Stops listening, waits for the pending writes and removes the socket."""
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+            self.__server = None
+        self.__executor.shutdown(wait=True)
+        if isinstance(sys.stdout, _ThreadLocalStdout):
+            sys.stdout = sys.stdout.stream
+        if os.path.exists(self.__socket_path):
+            os.remove(self.__socket_path)
+        logger.info("TaskMe asyncio daemon stopped")
+
+    # -----------------------------------------------------------------------------
+    # serve_forever
+    # -----------------------------------------------------------------------------
+    async def serve_forever(self) -> None:
+        """Serves the clients until cancelled."""
+        await self.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.close()
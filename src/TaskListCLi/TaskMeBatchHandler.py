@@ -0,0 +1,227 @@
+from src import logger
+
+from src.TaskList.TaskList import TaskList
+
+
+# -----------------------------------------------------------------------------
+# TaskMeBatchHandler
+# -----------------------------------------------------------------------------
+class TaskMeBatchHandler:
+    def __init__(self, file_handler) -> None:
+        """Initializes a write-back layer on top of a file handler, used to run commands in batch.
+
+        Every TaskList touched by a command is loaded once and kept in memory, mutations are
+        staged and written back all at once by flush.
+
+        Args:
+            file_handler: file handler of the underlying storage
+        """
+        self.__file_handler = file_handler
+
+        # TaskList name -> TaskList object (None when it doesn't exist in the storage)
+        self.__task_lists = {}
+        self.__dirty = {}
+
+        # Names of the staged TaskLists written as given, whether they changed or not
+        self.__forced = set()
+
+    # -----------------------------------------------------------------------------
+    # file_handler getter
+    # -----------------------------------------------------------------------------
+    @property
+    def file_handler(self):
+        return self.__file_handler
+
+    # -----------------------------------------------------------------------------
+    # get_task_list
+    # -----------------------------------------------------------------------------
+    def get_task_list(self, task_list_name: str):
+        """Gets a TaskList object, loading it from the storage the first time only.
+
+        Args:
+            task_list_name (str): The name of the TaskList.
+
+        Returns:
+            TaskList: The TaskList object, None if it doesn't exist.
+        """
+        if task_list_name not in self.__task_lists:
+            self.load(task_list_name, self.__file_handler.read(task_list_name))
+        return self.__task_lists[task_list_name]
+
+    # -----------------------------------------------------------------------------
+    # is_resident
+    # -----------------------------------------------------------------------------
+    def is_resident(self, task_list_name: str) -> bool:
+        """Tells whether a TaskList was already loaded (or found missing).
+
+        Args:
+            task_list_name (str): The name of the TaskList.
+
+        Returns:
+            bool: True if get_task_list won't hit the storage for this TaskList.
+        """
+        return task_list_name in self.__task_lists
+
+    # -----------------------------------------------------------------------------
+    # load
+    # -----------------------------------------------------------------------------
+    def load(self, task_list_name: str, task_list_data) -> None:
+        """Makes a TaskList resident from data read by the caller, e.g. in another thread.
+
+        Args:
+            task_list_name (str): The name of the TaskList.
+            task_list_data: The TaskList dictionary, None if it doesn't exist.
+        """
+        self.__task_lists[task_list_name] = TaskList.from_dict(task_list_data) if task_list_data else None
+
+    # -----------------------------------------------------------------------------
+    # stage
+    # -----------------------------------------------------------------------------
+    def stage(self, task_list: TaskList) -> None:
+        """Marks a TaskList as modified, it will be written by the next flush.
+
+        Args:
+            task_list (TaskList): The modified TaskList object.
+        """
+        self.__task_lists[task_list.name] = task_list
+        self.__dirty[task_list.name] = task_list
+
+    # -----------------------------------------------------------------------------
+    # invalidate
+    # -----------------------------------------------------------------------------
+    def invalidate(self, task_list_name=None) -> None:
+        """Drops a TaskList from memory, staged changes included, so that it gets reloaded on next use.
+
+        Args:
+            task_list_name: The name of the TaskList, every TaskList if None.
+        """
+        if task_list_name is None:
+            self.__task_lists = {}
+            self.__dirty = {}
+            self.__forced = set()
+        else:
+            self.__task_lists.pop(task_list_name, None)
+            self.__dirty.pop(task_list_name, None)
+            self.__forced.discard(task_list_name)
+
+    # -----------------------------------------------------------------------------
+    # pop_staged
+    # -----------------------------------------------------------------------------
+    def pop_staged(self, task_list_name: str):
+        """Takes a staged TaskList out of the next flush, for the caller to write it.
+
+        Args:
+            task_list_name (str): The name of the TaskList.
+
+        Returns:
+            dict: The staged TaskList dictionary, None if the TaskList isn't staged or didn't change.
+        """
+        task_list = self.__dirty.pop(task_list_name, None)
+        if task_list is None or not (task_list.has_changes or task_list_name in self.__forced):
+            return None
+        self.__forced.discard(task_list_name)
+
+        task_list_dict = task_list.to_dict()
+        task_list.mark_clean()
+        return task_list_dict
+
+    # -----------------------------------------------------------------------------
+    # flush
+    # -----------------------------------------------------------------------------
+    def flush(self) -> int:
+        """Writes every staged TaskList back to the storage, at once when the storage supports it.
+
+        Staged TaskLists left unchanged (e.g. updated with their current values) aren't written.
+
+        Returns:
+            int: The number of written TaskLists.
+        """
+        changed_task_lists = [task_list for task_list in self.__dirty.values()
+                              if task_list.has_changes or task_list.name in self.__forced]
+        self.__dirty = {}
+        self.__forced = set()
+        if not changed_task_lists:
+            return 0
+
+        task_list_dicts = [task_list.to_dict() for task_list in changed_task_lists]
+        if hasattr(self.__file_handler, "write_many"):
+            self.__file_handler.write_many(task_list_dicts)
+        else:
+            for task_list_dict in task_list_dicts:
+                self.__file_handler.write(task_list_dict)
+
+        for task_list in changed_task_lists:
+            task_list.mark_clean()
+        logger.debug(f"{len(task_list_dicts)} staged task list(s) flushed")
+        return len(task_list_dicts)
+
+    # -----------------------------------------------------------------------------
+    # File handler interface
+    # -----------------------------------------------------------------------------
+    # -----------------------------------------------------------------------------
+    # read
+    # -----------------------------------------------------------------------------
+    def read(self, task_list_name: str) -> dict:
+        """Reads a specific TaskList, staged changes included.
+
+        Args:
+            task_list_name (str): The name of the TaskList.
+
+        Returns:
+            dict: The desired dictionary if successful, None otherwise.
+        """
+        task_list = self.get_task_list(task_list_name)
+        return task_list.to_dict() if task_list is not None else None
+
+    # -----------------------------------------------------------------------------
+    # read_all
+    # -----------------------------------------------------------------------------
+    def read_all(self) -> list:
+        """Reads all TaskLists, staged changes are flushed first.
+
+        Returns:
+            list: A list of TaskList dictionaries.
+        """
+        self.flush()
+        return self.__file_handler.read_all()
+
+    # -----------------------------------------------------------------------------
+    # iter_task_lists
+    # -----------------------------------------------------------------------------
+    def iter_task_lists(self):
+        """Streams all TaskLists, staged changes are flushed first.
+
+        Yields:
+            dict: TaskList dictionaries.
+        """
+        self.flush()
+        yield from self.__file_handler.iter_task_lists()
+
+    # -----------------------------------------------------------------------------
+    # write
+    # -----------------------------------------------------------------------------
+    def write(self, task_list_dict: dict) -> None:
+        """Stages a TaskList dictionary, it will be written by the next flush.
+
+        Args:
+            task_list_dict: The TaskList dictionary to write.
+        """
+        self.stage(TaskList.from_dict(task_list_dict))
+        self.__forced.add(task_list_dict["taskListName"])
+
+    # -----------------------------------------------------------------------------
+    # search
+    # -----------------------------------------------------------------------------
+    def search(self, **criteria) -> list:
+        """Searches the tasks of every TaskList, staged changes are flushed first.
+
+        Args:
+            **criteria: search criteria, see TaskMeSearchIndex.search
+
+        Returns:
+            list: (TaskList name, Task dictionary) pairs of the matching tasks.
+        """
+        from src.System.TaskMeSearchIndex.TaskMeSearchIndex import search_storage
+
+        self.flush()
+        return search_storage(self.__file_handler, **criteria)
@@ -0,0 +1,200 @@
+import argparse
+import shlex
+import signal
+import sys
+from contextlib import nullcontext
+
+from src.TaskListCLi.TaskListParser import initialize_command_parsers, setup_parser, setup_runner_parser
+
+
+# -----------------------------------------------------------------------------
+# create_file_handler_from_args
+# -----------------------------------------------------------------------------
+def create_file_handler_from_args(runner_args, runner_parser):
+    """ Creates the file handler selected by the runner options
+
+    Args:
+        runner_args: parsed runner options
+        runner_parser: runner parser, used to report invalid combinations of options
+
+    Returns:
+        the initialized file handler object
+    """
+    from src.System.DurabilityPolicy.DurabilityPolicy import DurabilityPolicy
+    from src.System.StorageFactory.StorageFactory import create_file_handler
+
+    handler_options = {}
+    if runner_args.data_format:
+        if runner_args.storage != "json":
+            runner_parser.error("--data-format is only supported by the 'json' storage")
+        handler_options["data_format"] = runner_args.data_format
+    if runner_args.concurrency or runner_args.lock_timeout is not None:
+        if runner_args.storage != "json":
+            runner_parser.error("--concurrency and --lock-timeout are only supported by the 'json' storage")
+        if runner_args.concurrency:
+            handler_options["concurrency"] = runner_args.concurrency
+        if runner_args.lock_timeout is not None:
+            handler_options["lock_timeout"] = runner_args.lock_timeout
+    if runner_args.durability:
+        if runner_args.storage == "sqlite":
+            runner_parser.error("--durability is not supported by the 'sqlite' storage")
+        handler_options["durability"] = DurabilityPolicy(runner_args.durability, runner_args.fsync_interval_ms)
+
+    file_handler = create_file_handler(runner_args.storage, **handler_options)
+    if runner_args.migrate_from:
+        if not hasattr(file_handler, "migrate_from_json"):
+            runner_parser.error(f"--migrate-from is not supported by the '{runner_args.storage}' storage")
+        file_handler.migrate_from_json(runner_args.migrate_from)
+
+    return file_handler
+
+
+# -----------------------------------------------------------------------------
+# run_batch
+# -----------------------------------------------------------------------------
+def run_batch(batch_file, parser, file_handler) -> int:
+    """ Runs every command of a batch file, one command per line
+
+    Blank lines and lines starting with '#' are ignored, invalid lines are reported and skipped.
+
+    Args:
+        batch_file: path of the batch file, '-' for the standard input
+        parser: command parser
+        file_handler: file handler object
+
+    Returns:
+        the exit status: 0 if every command succeeded, 1 otherwise
+    """
+    from src.TaskListCLi.TaskListCli import handle_batch
+
+    commands = []
+    invalid = 0
+    with (nullcontext(sys.stdin) if batch_file == "-" else open(batch_file, 'r')) as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            try:
+                commands.append(parser.parse_args(shlex.split(line)))
+            except (SystemExit, ValueError):
+                print(f"Line {line_number}: invalid command or arguments, skipped.")
+                invalid += 1
+
+    # The whole batch is a single transaction when the storage supports it
+    with file_handler.transaction() if hasattr(file_handler, "transaction") else nullcontext():
+        failed = handle_batch(commands, file_handler)
+
+    if failed:
+        print(f"{failed} command(s) failed. Check logs for more details.")
+    return 1 if failed or invalid else 0
+
+
+# -----------------------------------------------------------------------------
+# _raise_keyboard_interrupt
+# -----------------------------------------------------------------------------
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+# -----------------------------------------------------------------------------
+# serve
+# -----------------------------------------------------------------------------
+def serve(runner_args, runner_parser) -> int:
+    """ Runs the TaskMe daemon: taskme [options] serve [--asyncio] [--workers N]
+
+    Args:
+        runner_args: parsed runner options, the command being 'serve [serve options]'
+        runner_parser: runner parser, used to report invalid options
+
+    Returns:
+        the exit status
+    """
+    serve_parser = argparse.ArgumentParser(prog="taskme serve", description="Serves TaskMe commands over a socket")
+    serve_parser.add_argument("--asyncio", action="store_true",
+                              help="Serves many clients concurrently, modifications of independent task lists"
+                                   " being written in parallel")
+    serve_parser.add_argument("--workers", type=int, default=None,
+                              help="Number of threads writing to the storage (--asyncio only, default: 4)")
+    serve_args = serve_parser.parse_args(runner_args.command[1:])
+    if serve_args.workers is not None and not serve_args.asyncio:
+        serve_parser.error("--workers requires --asyncio")
+
+    file_handler = create_file_handler_from_args(runner_args, runner_parser)
+
+    # Stopped like an interrupt, so that the socket file gets removed
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+    try:
+        if serve_args.asyncio:
+            import asyncio
+            from src.TaskListCLi.TaskMeAsyncServer import TaskMeAsyncServer, DEFAULT_WRITE_WORKERS
+            server = TaskMeAsyncServer(file_handler, runner_args.socket, serve_args.workers or DEFAULT_WRITE_WORKERS)
+            asyncio.run(server.serve_forever())
+        else:
+            from src.TaskListCLi.TaskMeServer import TaskMeServer
+            TaskMeServer(file_handler, runner_args.socket).serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+# -----------------------------------------------------------------------------
+# main
+# -----------------------------------------------------------------------------
+def main(argv=None) -> int:
+    """ Single-shot entry point: taskme [options] <subcommand> [arguments...]
+
+    Only the parser of the requested subcommand is built and the storage backend and the
+    commands are imported once the command line is known to be valid.
+
+    Args:
+        argv: command line arguments, defaults to sys.argv[1:]
+
+    Returns:
+        the exit status: 0 if the command succeeded, 1 otherwise
+    """
+    runner_parser = setup_runner_parser(prog="taskme")
+    runner_parser.epilog = "'taskme serve [--asyncio]' starts a daemon serving the commands over a Unix-domain socket," \
+                           " 'taskme --connect <subcommand> ...' forwards a command to it."
+    runner_parser.add_argument("--connect", action="store_true",
+                               help="Forwards the command to the TaskMe daemon instead of running it")
+    runner_parser.add_argument("--socket", metavar="PATH",
+                               help="Socket of the TaskMe daemon (default: data/.taskme.sock)")
+    runner_parser.add_argument("command", nargs=argparse.REMAINDER,
+                               help="<subcommand> [arguments...], type 'taskme <subcommand> -h' for details")
+    runner_args = runner_parser.parse_args(argv)
+
+    if runner_args.batch and runner_args.command:
+        runner_parser.error("a subcommand can't be combined with --batch")
+
+    if runner_args.connect:
+        if not runner_args.command:
+            runner_parser.error("--connect requires a subcommand")
+        # Thin client: the command is parsed and run by the daemon
+        from src.TaskListCLi.TaskMeClient import send_command
+        is_executed, output = send_command(runner_args.command, runner_args.socket)
+        print(output, end="")
+        return 0 if is_executed else 1
+
+    if runner_args.command[:1] == ["serve"]:
+        return serve(runner_args, runner_parser)
+
+    args = None
+    if runner_args.command:
+        subcommand = runner_args.command[0]
+        # Unknown subcommands get the full parser, for a complete error message
+        parser = setup_parser([subcommand] if subcommand in initialize_command_parsers() else None)
+        args = parser.parse_args(runner_args.command)
+    elif not runner_args.batch and not runner_args.migrate_from:
+        setup_parser().print_help()
+        return 1
+
+    file_handler = create_file_handler_from_args(runner_args, runner_parser)
+    if runner_args.batch:
+        return run_batch(runner_args.batch, setup_parser(), file_handler)
+    if args is None:
+        return 0
+
+    from src.TaskListCLi.TaskListCli import run_command
+    if not run_command(args, file_handler):
+        print(f"Failed to execute command {args.subcommand}. Check logs for more details.", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,47 @@
+import json
+import socket
+from pathlib import Path
+
+
+# -----------------------------------------------------------------------------
+# get_default_socket_path
+# -----------------------------------------------------------------------------
+def get_default_socket_path():
+    """ Default path of the TaskMe daemon socket, inside the data directory
+
+    Returns:
+        the socket path
+    """
+    # Retrieve the root TaskMe directory
+    parent_dir = Path(__file__).resolve().parents[2]
+
+    return parent_dir / "data" / ".taskme.sock"
+
+
+# -----------------------------------------------------------------------------
+# send_command
+# -----------------------------------------------------------------------------
+def send_command(argv, socket_path=None):
+    """ Forwards a command to the TaskMe daemon and waits for its result
+
+    Args:
+        argv: command line of the command, e.g. ["display", "My tasks"]
+        socket_path: path of the daemon socket, defaults to data/.taskme.sock
+
+    Returns:
+        tuple: (True if the command succeeded, output of the command)
+
+    Raises:
+        OSError: if the daemon can't be reached
+    """
+    socket_path = socket_path if socket_path is not None else get_default_socket_path()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(socket_path))
+        client.sendall((json.dumps({"argv": list(argv)}) + "\n").encode("utf-8"))
+        with client.makefile('rb') as file:
+            line = file.readline()
+
+    if not line:
+        raise ConnectionError("The TaskMe daemon closed the connection")
+    response = json.loads(line)
+    return response["ok"], response["output"]
@@ -0,0 +1,176 @@
+import io
+import json
+import os
+import socket
+import socketserver
+from contextlib import nullcontext, redirect_stderr, redirect_stdout
+
+from src import logger
+
+from src.TaskListCLi.TaskListCli import handle_command, READ_ONLY_COMMANDS
+from src.TaskListCLi.TaskListParser import setup_parser
+from src.TaskListCLi.TaskMeBatchHandler import TaskMeBatchHandler
+from src.TaskListCLi.TaskMeClient import get_default_socket_path
+
+
+# -----------------------------------------------------------------------------
+# _TaskMeRequestHandler
+# -----------------------------------------------------------------------------
+class _TaskMeRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        """Answers the requests of a client connection, one JSON document per line."""
+        for line in self.rfile:
+            try:
+                argv = json.loads(line)["argv"]
+                if not isinstance(argv, list):
+                    raise TypeError("argv must be a list")
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Invalid TaskMe daemon request: {e}")
+                response = {"ok": False, "output": "Invalid request\n"}
+            else:
+                ok, output = self.server.taskme_server.execute([str(arg) for arg in argv])
+                response = {"ok": ok, "output": output}
+
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+
+
+# -----------------------------------------------------------------------------
+# TaskMeServer
+# -----------------------------------------------------------------------------
+class TaskMeServer:
+    def __init__(self, file_handler, socket_path=None) -> None:
+        """Initializes the TaskMe daemon, serving the CLI commands over a Unix-domain socket.
+
+        The daemon keeps the TaskList objects it loaded in memory and handles one command at a
+        time, every modification is written through to the storage before answering. It must
+        therefore be the only writer of the storage.
+
+        Args:
+            file_handler: file handler of the storage owned by the daemon
+            socket_path: path of the socket, defaults to data/.taskme.sock
+        """
+        self.__file_handler = file_handler
+        self.__batch_handler = TaskMeBatchHandler(file_handler)
+        self.__parser = setup_parser()
+        self.__socket_path = socket_path if socket_path is not None else get_default_socket_path()
+        self.__server = None
+
+    # -----------------------------------------------------------------------------
+    # socket_path getter
+    # -----------------------------------------------------------------------------
+    @property
+    def socket_path(self):
+        return self.__socket_path
+
+    # -----------------------------------------------------------------------------
+    # __run
+    # -----------------------------------------------------------------------------
+    def __run(self, args) -> bool:
+        """Runs a parsed command against the resident TaskLists and writes its changes (internal).
+
+        Args:
+            args: command arguments
+
+        Returns:
+            bool: True if the command was executed successfully, False otherwise
+        """
+        task_list_name = getattr(args, "task_list_name", None)
+        read_only = args.subcommand in READ_ONLY_COMMANDS
+        transaction = self.__file_handler.transaction() \
+            if hasattr(self.__file_handler, "transaction") and not read_only else nullcontext()
+
+        try:
+            with transaction:
+                is_executed = handle_command(args, self.__batch_handler)
+                if is_executed:
+                    self.__batch_handler.flush()
+        except Exception as e:
+            logger.error(f"Unable to save the changes of command {args.subcommand}: {e}")
+            is_executed = False
+
+        # A failed command may have left its TaskList half modified, it gets reloaded from the storage
+        if not is_executed:
+            self.__batch_handler.invalidate(task_list_name)
+        return is_executed
+
+    # -----------------------------------------------------------------------------
+    # execute
+    # -----------------------------------------------------------------------------
+    def execute(self, argv) -> tuple:
+        """Executes a command line, as the interactive CLI would.
+
+        Args:
+            argv: command line of the command, e.g. ["display", "My tasks"]
+
+        Returns:
+            tuple: (True if the command succeeded, output of the command)
+        """
+        output = io.StringIO()
+        with redirect_stdout(output), redirect_stderr(output):
+            try:
+                args = self.__parser.parse_args(argv)
+            except SystemExit:
+                return False, output.getvalue()
+
+            is_executed = self.__run(args)
+            if not is_executed:
+                print(f"Failed to execute command {args.subcommand}. Check logs for more details.")
+
+        return is_executed, output.getvalue()
+
+    # -----------------------------------------------------------------------------
+    # __remove_stale_socket
+    # -----------------------------------------------------------------------------
+    def __remove_stale_socket(self) -> None:
+        """Removes the socket file left by a daemon that didn't exit cleanly (internal).
+
+        Raises:
+            RuntimeError: if another daemon is listening on the socket
+        """
+        if not os.path.exists(self.__socket_path):
+            return
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(str(self.__socket_path))
+            except OSError:
+                os.remove(self.__socket_path)
+                return
+
+        logger.error(f"A TaskMe daemon is already listening on {self.__socket_path}")
+        raise RuntimeError(f"A TaskMe daemon is already listening on {self.__socket_path}")
+
+    # -----------------------------------------------------------------------------
+    # serve_forever
+    # -----------------------------------------------------------------------------
+    def serve_forever(self, ready=None) -> None:
+        """Listens on the socket and serves the clients until shutdown is called.
+
+        Connections are handled one at a time, so that all the writes are serialized.
+
+        Args:
+            ready: optional threading.Event set once the daemon accepts connections
+        """
+        self.__remove_stale_socket()
+        os.makedirs(os.path.dirname(os.path.abspath(self.__socket_path)), exist_ok=True)
+
+        self.__server = socketserver.UnixStreamServer(str(self.__socket_path), _TaskMeRequestHandler)
+        self.__server.taskme_server = self
+        logger.info(f"TaskMe daemon listening on {self.__socket_path}")
+        try:
+            if ready is not None:
+                ready.set()
+            self.__server.serve_forever()
+        finally:
+            self.__server.server_close()
+            if os.path.exists(self.__socket_path):
+                os.remove(self.__socket_path)
+            logger.info("TaskMe daemon stopped")
+
+    # -----------------------------------------------------------------------------
+    # shutdown
+    # -----------------------------------------------------------------------------
+    def shutdown(self) -> None:
+        """Stops serve_forever, must be called from another thread."""
+        if self.__server is not None:
+            self.__server.shutdown()
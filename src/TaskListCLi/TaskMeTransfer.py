@@ -0,0 +1,238 @@
+import csv
+import io
+import json
+import os
+
+from src import logger
+from src.Common.utils import TRANSFER_FORMATS
+from src.System.TaskMeFileHandler.TaskMeFileHandler import JSON_LAYOUTS, encode_json_task_list
+from src.TaskList.TaskList import TaskList
+
+# Columns of the CSV files, one row per task
+CSV_FIELDS = ["task_list", "id", "assignee", "name", "due_date", "priority", "description", "progress_status"]
+
+# Size (in characters) of the export writes, and number of tasks handed over at once by the import
+TRANSFER_CHUNK_SIZE = 1024 * 1024
+IMPORT_CHUNK_SIZE = 10000
+
+
+# -----------------------------------------------------------------------------
+# detect_format
+# -----------------------------------------------------------------------------
+def detect_format(file_path) -> str:
+    """ Format of an import / export file, from its extension
+
+    Args:
+        file_path: path of the file
+
+    Returns:
+        str: one of TRANSFER_FORMATS, json for unknown extensions
+    """
+    extension = os.path.splitext(str(file_path))[1].lower().lstrip(".")
+    return extension if extension in TRANSFER_FORMATS else "json"
+
+
+# -----------------------------------------------------------------------------
+# _iter_json
+# -----------------------------------------------------------------------------
+def _iter_json(task_lists, pretty: bool):
+    """ Serializes the TaskLists as a TaskMe JSON data file, one TaskList at a time
+
+    Args:
+        task_lists: TaskList dictionaries
+        pretty (bool): indented JSON
+
+    Yields:
+        str: the parts of the document
+    """
+    layout = "pretty" if pretty else "compact"
+    head, separator, tail, empty = JSON_LAYOUTS[layout]
+    is_empty = True
+    for task_list in task_lists:
+        yield head if is_empty else separator
+        is_empty = False
+        yield encode_json_task_list(task_list, layout)
+    yield empty if is_empty else tail
+
+
+# -----------------------------------------------------------------------------
+# _iter_jsonl
+# -----------------------------------------------------------------------------
+def _iter_jsonl(task_lists):
+    """ Serializes the TaskLists as JSON lines: each TaskList (without its tasks) followed by its tasks
+
+    Task lines carry the name of their TaskList in a "task_list" field.
+
+    Args:
+        task_lists: TaskList dictionaries
+
+    Yields:
+        str: the lines
+    """
+    for task_list_data in task_lists:
+        task_list = TaskList.from_dict(task_list_data).to_dict()
+        tasks = task_list.pop("tasks")
+        yield json.dumps(task_list) + "\n"
+        for task in tasks:
+            yield json.dumps(dict(task_list=task_list["taskListName"], **task)) + "\n"
+
+
+# -----------------------------------------------------------------------------
+# _iter_csv
+# -----------------------------------------------------------------------------
+def _iter_csv(task_lists):
+    """ Serializes the tasks of the TaskLists as CSV rows, TaskLists themselves (owners, tags) aren't kept
+
+    Args:
+        task_lists: TaskList dictionaries
+
+    Yields:
+        str: the rows, several at a time
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, CSV_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for task_list_data in task_lists:
+        task_list = TaskList.from_dict(task_list_data).to_dict()
+        for task in task_list["tasks"]:
+            writer.writerow(dict(task_list=task_list["taskListName"], **task))
+            if buffer.tell() >= TRANSFER_CHUNK_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+    yield buffer.getvalue()
+
+
+# -----------------------------------------------------------------------------
+# export_to_file
+# -----------------------------------------------------------------------------
+def export_to_file(task_lists, file, data_format: str, pretty: bool = False) -> int:
+    """ Writes TaskLists to a file as they are streamed, in chunks of TRANSFER_CHUNK_SIZE characters
+
+    Only the current TaskList and one chunk are held in memory, whatever the number of TaskLists.
+
+    Args:
+        task_lists: TaskList dictionaries, e.g. a file handler iter_task_lists
+        file: text file object, opened with newline=""
+        data_format (str): one of TRANSFER_FORMATS
+        pretty (bool): indented JSON, json format only
+
+    Returns:
+        int: the number of exported TaskLists
+
+    Raises:
+        ValueError: if the format is unknown
+    """
+    if data_format not in TRANSFER_FORMATS:
+        logger.error(f"Invalid transfer format. Expected one of the following: {TRANSFER_FORMATS} and got {data_format}")
+        raise ValueError(f"Invalid transfer format. Expected one of the following: {TRANSFER_FORMATS}"
+                         f" and got {data_format}")
+
+    task_list_count = 0
+
+    def counted(task_list_dicts):
+        nonlocal task_list_count
+        for task_list_dict in task_list_dicts:
+            task_list_count += 1
+            yield task_list_dict
+
+    if data_format == "json":
+        parts = _iter_json(counted(task_lists), pretty)
+    elif data_format == "jsonl":
+        parts = _iter_jsonl(counted(task_lists))
+    else:
+        parts = _iter_csv(counted(task_lists))
+
+    chunk = []
+    chunk_size = 0
+    for part in parts:
+        chunk.append(part)
+        chunk_size += len(part)
+        if chunk_size >= TRANSFER_CHUNK_SIZE:
+            file.write("".join(chunk))
+            chunk = []
+            chunk_size = 0
+    if chunk_size:
+        file.write("".join(chunk))
+    return task_list_count
+
+
+# -----------------------------------------------------------------------------
+# _iter_records
+# -----------------------------------------------------------------------------
+def _iter_records(file, data_format: str):
+    """ Parses an import file one record at a time
+
+    Args:
+        file: text file object, opened with newline=""
+        data_format (str): jsonl or csv
+
+    Yields:
+        dict: the records (TaskLists without tasks or tasks), CSV cells past the header left out
+
+    Raises:
+        ValueError: if the format can't be imported
+    """
+    if data_format == "jsonl":
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+    elif data_format == "csv":
+        for row in csv.DictReader(file):
+            yield {key: value for key, value in row.items() if key is not None}
+    else:
+        logger.error(f"Invalid import format. Expected one of the following: ['jsonl', 'csv'] and got {data_format}")
+        raise ValueError(f"Invalid import format. Expected one of the following: ['jsonl', 'csv']"
+                         f" and got {data_format}")
+
+
+# -----------------------------------------------------------------------------
+# iter_import_chunks
+# -----------------------------------------------------------------------------
+def iter_import_chunks(file, data_format: str, task_list_name: str = None, chunk_size: int = IMPORT_CHUNK_SIZE):
+    """ Streams the tasks of an import file, grouped by TaskList in chunks of at most chunk_size tasks
+
+    JSON lines holding a "taskListName" describe a TaskList (as written by export), the other records are
+    tasks naming their TaskList in a "task_list" field. Only one chunk is held in memory at a time.
+
+    Args:
+        file: text file object, opened with newline=""
+        data_format (str): jsonl or csv
+        task_list_name (str): TaskList receiving every task, TaskList records are then skipped
+        chunk_size (int): maximum number of tasks per chunk
+
+    Yields:
+        tuple: (TaskList name, TaskList record or None, task dictionaries), the TaskList record coming with
+        an empty chunk of tasks
+
+    Raises:
+        ValueError: if the format can't be imported or a task doesn't name its TaskList
+    """
+    current_name = None
+    chunk = []
+    for record_number, record in enumerate(_iter_records(file, data_format), 1):
+        if "taskListName" in record:
+            if task_list_name is None:
+                if chunk:
+                    yield current_name, None, chunk
+                    chunk = []
+                current_name = record["taskListName"]
+                yield current_name, record, []
+            continue
+
+        name = record.pop("task_list", None) or None
+        if task_list_name is not None:
+            name = task_list_name
+        if name is None:
+            logger.error(f"Record #{record_number} doesn't name its task list")
+            raise ValueError(f"Record #{record_number} doesn't name its task list")
+
+        if name != current_name or len(chunk) >= chunk_size:
+            if chunk:
+                yield current_name, None, chunk
+                chunk = []
+            current_name = name
+        chunk.append(record)
+
+    if chunk:
+        yield current_name, None, chunk
@@ -0,0 +1,120 @@
+import os
+import time
+
+import pytest
+from unittest.mock import patch
+from src.System.DurabilityPolicy.DurabilityPolicy import DurabilityPolicy
+from src.System.TaskMeFileHandler.TaskMeFileHandler import TaskMeFileHandler
+
+
+# -----------------------------------------------------------------------------
+# test_atomic_write
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize('mode', ["always", "interval", "never"])
+def test_atomic_write_replaces_content(tmp_path, mode):
+    path = tmp_path / "data.json"
+    path.write_bytes(b"old")
+
+    DurabilityPolicy(mode).atomic_write(path, b"new")
+
+    assert path.read_bytes() == b"new"
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+def test_atomic_write_failure_keeps_previous_content(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_bytes(b"old")
+
+    with patch("os.replace", side_effect=OSError("Simulated crash")):
+        with pytest.raises(OSError, match="Simulated crash"):
+            DurabilityPolicy().atomic_write(path, b"new")
+
+    assert path.read_bytes() == b"old"
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+def test_file_handler_failed_write_keeps_data_file(tmp_path):
+    path = tmp_path / ".taskme_data.json"
+    handler = TaskMeFileHandler(path)
+    handler.write({"taskListName": "TestTaskList", "owners": [], "tags": [], "tasks": []})
+
+    with patch("os.replace", side_effect=OSError("Simulated crash")):
+        with pytest.raises(OSError):
+            handler.write({"taskListName": "Other", "owners": [], "tags": [], "tasks": []})
+
+    assert [task_list["taskListName"] for task_list in TaskMeFileHandler(path).read_all()] == ["TestTaskList"]
+
+
+# -----------------------------------------------------------------------------
+# test_fsync_policy
+# -----------------------------------------------------------------------------
+def test_always_fsyncs_every_write(tmp_path):
+    policy = DurabilityPolicy("always")
+    with patch("os.fsync") as mock_fsync:
+        policy.atomic_write(tmp_path / "data.json", b"1")
+        policy.append(tmp_path / "data.journal", b"2")
+
+    # File + directory for the replace, file for the append
+    assert mock_fsync.call_count == 3
+
+
+def test_never_does_not_fsync(tmp_path):
+    policy = DurabilityPolicy("never")
+    with patch("os.fsync") as mock_fsync:
+        policy.atomic_write(tmp_path / "data.json", b"1")
+        policy.append(tmp_path / "data.journal", b"2")
+        policy.flush()
+
+    mock_fsync.assert_not_called()
+
+
+def test_interval_groups_fsyncs(tmp_path):
+    # Long interval: the group commit only happens on the explicit flush
+    policy = DurabilityPolicy("interval", interval_ms=60 * 1000)
+    with patch("os.fsync") as mock_fsync:
+        for idx in range(10):
+            policy.atomic_write(tmp_path / "data.json", str(idx).encode())
+            policy.append(tmp_path / "data.journal", str(idx).encode())
+        # Only the temporary files are fsynced right away
+        assert mock_fsync.call_count == 10
+
+        policy.flush()
+
+    # Directory for the replaced file, file + directory for the appended one
+    assert mock_fsync.call_count == 13
+
+
+@pytest.mark.parametrize('mode', ["always", "interval"])
+def test_fsyncs_content_before_rename(tmp_path, mode):
+    calls = []
+    policy = DurabilityPolicy(mode, interval_ms=60 * 1000)
+    with patch("os.fsync", side_effect=lambda fd: calls.append("fsync")), \
+            patch("os.replace", side_effect=lambda src, dst: calls.append("replace")):
+        policy.atomic_write(tmp_path / "data.json", b"1")
+
+    assert calls[:2] == ["fsync", "replace"]
+
+
+def test_interval_flushes_after_delay(tmp_path):
+    policy = DurabilityPolicy("interval", interval_ms=1)
+    with patch.object(DurabilityPolicy, "flush", autospec=True) as mock_flush:
+        policy.append(tmp_path / "data.journal", b"1")
+        for _ in range(100):
+            if mock_flush.called:
+                break
+            time.sleep(0.01)
+
+    mock_flush.assert_called_with(policy)
+
+
+def test_force_fsync(tmp_path):
+    policy = DurabilityPolicy("never")
+    with patch("os.fsync") as mock_fsync:
+        policy.atomic_write(tmp_path / "data.json", b"1", force_fsync=True)
+
+    assert mock_fsync.call_count == 2
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError, match="Invalid durability mode"):
+        DurabilityPolicy("sometimes")
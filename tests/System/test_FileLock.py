@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+from src.System.FileLock import FileLock as file_lock_module
+from src.System.FileLock.FileLock import FileLock
+
+pytestmark = pytest.mark.skipif(file_lock_module.fcntl is None, reason="fcntl isn't available")
+
+
+# -----------------------------------------------------------------------------
+# test_shared
+# -----------------------------------------------------------------------------
+def test_shared_locks_are_compatible(tmp_path):
+    lock_path = tmp_path / "data.lock"
+
+    with FileLock(lock_path).shared():
+        with FileLock(lock_path, timeout=0.05).shared():
+            pass
+
+
+def test_shared_lock_blocks_writers(tmp_path):
+    lock_path = tmp_path / "data.lock"
+
+    with FileLock(lock_path).shared():
+        with pytest.raises(TimeoutError):
+            with FileLock(lock_path, timeout=0.05).exclusive():
+                pass
+
+
+# -----------------------------------------------------------------------------
+# test_exclusive
+# -----------------------------------------------------------------------------
+def test_exclusive_lock_blocks_readers(tmp_path):
+    lock_path = tmp_path / "data.lock"
+
+    with FileLock(lock_path).exclusive():
+        with pytest.raises(TimeoutError):
+            with FileLock(lock_path, timeout=0.05).shared():
+                pass
+
+
+def test_exclusive_lock_retries_until_released(tmp_path):
+    lock_path = tmp_path / "data.lock"
+    holder = FileLock(lock_path)
+    acquired = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with holder.exclusive():
+            acquired.set()
+            release.wait()
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    acquired.wait()
+    threading.Timer(0.05, release.set).start()
+
+    with FileLock(lock_path, timeout=5).exclusive():
+        assert release.is_set()
+    thread.join()
+
+
+# -----------------------------------------------------------------------------
+# test_reentrancy
+# -----------------------------------------------------------------------------
+def test_nested_acquisitions_reuse_the_lock(tmp_path):
+    lock = FileLock(tmp_path / "data.lock", timeout=0.05)
+
+    with lock.exclusive():
+        with lock.shared():
+            with lock.exclusive():
+                pass
+
+    # Released by the outermost acquisition
+    with FileLock(tmp_path / "data.lock", timeout=0.05).exclusive():
+        pass
+
+
+def test_shared_lock_cannot_be_upgraded(tmp_path):
+    lock = FileLock(tmp_path / "data.lock")
+
+    with lock.shared():
+        with pytest.raises(RuntimeError):
+            with lock.exclusive():
+                pass
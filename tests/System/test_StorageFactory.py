@@ -0,0 +1,31 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.System.StorageFactory.StorageFactory import create_file_handler, initialize_storage_backends
+from src.System.TaskMeSQLiteHandler.TaskMeSQLiteHandler import TaskMeSQLiteHandler
+
+
+# -----------------------------------------------------------------------------
+# test_create_file_handler
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize('storage', initialize_storage_backends().keys())
+def test_create_file_handler_for_all_backends(storage):
+    mock_backend = MagicMock()
+    with patch("src.System.StorageFactory.StorageFactory.initialize_storage_backends",
+               return_value={storage: mock_backend}):
+        file_handler = create_file_handler(storage)
+
+    mock_backend.assert_called_once_with()
+    assert file_handler is mock_backend.return_value
+
+
+def test_create_file_handler_unknown_storage():
+    with pytest.raises(ValueError, match="Unknown storage backend: xml"):
+        create_file_handler("xml")
+
+
+def test_create_file_handler_creates_backend(tmp_path):
+    file_handler = create_file_handler("sqlite", db_path=tmp_path / "taskme.db")
+
+    assert isinstance(file_handler, TaskMeSQLiteHandler)
+    file_handler.close()
@@ -1,20 +1,21 @@
+import json
+import multiprocessing
+
 import pytest
-from unittest.mock import mock_open, patch, MagicMock
-from src.System.TaskMeFileHandler.TaskMeFileHandler import TaskMeFileHandler
+from unittest.mock import patch, MagicMock
+from src.System.DurabilityPolicy.DurabilityPolicy import DurabilityPolicy
+from src.System.FileLock import FileLock as file_lock_module
+from src.System.FileLock.FileLock import FileLock
+from src.System.TaskMeFileHandler.TaskMeFileHandler import TaskMeFileHandler, TaskMeConflictError
 
 
 class TestTaskMeFileHandler:
 
     @pytest.fixture(autouse=True)
-    def setup_method(self, mocker):
-        self.file_data = {"taskLists": []}
-
-        # Mock open and json.load/.dump
-        mocker.patch('builtins.open', mock_open())
-        mocker.patch('json.load', side_effect=self.json_load_side_effect)
-        mocker.patch('json.dump', side_effect=self.json_dump_side_effect)
+    def setup_method(self, tmp_path):
+        self.file_path = tmp_path / ".taskme_data.json"
 
-        self.handler = TaskMeFileHandler()
+        self.handler = TaskMeFileHandler(self.file_path)
         self.sample_task_list = {
             "taskListName": "Task List Name n1",
             "owners": ["Bob"],
@@ -22,31 +23,31 @@ class TestTaskMeFileHandler:
             "tasks": []
         }
 
-    def json_load_side_effect(self, fp):
-        return self.file_data
-
-    def json_dump_side_effect(self, data, fp, indent):
-        self.file_data = data
+    def read_file_data(self):
+        with open(self.file_path) as file:
+            return json.load(file)
 
     # -----------------------------------------------------------------------------
     # test_file_handler_init_file
     # -----------------------------------------------------------------------------
     def test_file_handler_init_file_exists(self):
+        self.handler.write(self.sample_task_list)
         with patch("os.path.isfile", return_value=True):
             with patch("src.TaskListCLi.TaskListCli.logger", new_callable=MagicMock) as _:
                 # File exists -> __initialize_data_file should not be called
-                self.handler = TaskMeFileHandler()
+                self.handler = TaskMeFileHandler(self.file_path)
 
                 # File contents should remain unchanged
-                assert self.file_data == {"taskLists": []}
+                assert self.read_file_data() == {"taskLists": [self.sample_task_list]}
 
     def test_file_handler_init_file_does_not_exist(self):
+        self.file_path.unlink()
         with patch("os.path.isfile", return_value=False):
             with patch("src.TaskListCLi.TaskListCli.logger", new_callable=MagicMock) as _:
                 # File doesn't exist -> __initialize_data_file should be called
-                self.handler = TaskMeFileHandler()
+                self.handler = TaskMeFileHandler(self.file_path)
 
-                assert self.file_data == {"taskLists": []}
+                assert self.read_file_data() == {"taskLists": []}
 
     # -----------------------------------------------------------------------------
     # test_write_and_read_all
@@ -67,6 +68,22 @@ class TestTaskMeFileHandler:
 
         assert retrieved_task_list["taskListName"] == "Task List Name n1"
 
+    # -----------------------------------------------------------------------------
+    # test_write_many
+    # -----------------------------------------------------------------------------
+    def test_write_many_rewrites_file_once(self):
+        self.handler.write(self.sample_task_list)
+        updated_task_list = dict(self.sample_task_list, tags=["personal"])
+        new_task_list = dict(self.sample_task_list, taskListName="Task List Name n2")
+
+        with patch.object(DurabilityPolicy, "atomic_write", autospec=True,
+                          side_effect=DurabilityPolicy.atomic_write) as spy_atomic_write:
+            self.handler.write_many([updated_task_list, new_task_list])
+
+        data_file_writes = [call for call in spy_atomic_write.call_args_list if call.args[1] == self.file_path]
+        assert len(data_file_writes) == 1
+        assert self.read_file_data() == {"taskLists": [updated_task_list, new_task_list]}
+
     # -----------------------------------------------------------------------------
     # test_update_task_list
     # -----------------------------------------------------------------------------
@@ -105,3 +122,280 @@ class TestTaskMeFileHandler:
 
         retrieved_task_list = self.handler.read("Task n1")
         assert retrieved_task_list["taskListName"] == "Task n1"
+
+
+    # -----------------------------------------------------------------------------
+    # test_file_format
+    # -----------------------------------------------------------------------------
+    def test_default_file_is_compact_json(self):
+        self.handler.write(self.sample_task_list)
+
+        with open(self.file_path) as file:
+            assert file.read() == json.dumps({"taskLists": [self.sample_task_list]}, separators=(",", ":"))
+
+    def test_pretty_file_is_pretty_printed_json(self):
+        handler = TaskMeFileHandler(self.file_path, data_format="pretty")
+        handler.write(self.sample_task_list)
+
+        with open(self.file_path) as file:
+            assert file.read() == json.dumps({"taskLists": [self.sample_task_list]}, indent=4)
+
+    @pytest.mark.parametrize('written_format', ["compact", "pretty", "msgpack"])
+    @pytest.mark.parametrize('reading_format', ["compact", "pretty", "msgpack"])
+    def test_format_is_detected_when_reading(self, written_format, reading_format):
+        pytest.importorskip("msgpack")
+        second_task_list = {"taskListName": "Task n1", "owners": ["Bobby"], "tags": ["vacation"], "tasks": []}
+        writer = TaskMeFileHandler(self.file_path, data_format=written_format)
+        writer.write(self.sample_task_list)
+        writer.write(second_task_list)
+
+        # Through the index
+        assert TaskMeFileHandler(self.file_path, data_format=reading_format).read("Task n1") == second_task_list
+
+        # Through a full parse, then rewritten in the reading format
+        reader = TaskMeFileHandler(self.file_path, data_format=reading_format)
+        assert reader.read_all() == [self.sample_task_list, second_task_list]
+        reader.write(second_task_list)
+        assert TaskMeFileHandler(self.file_path).read_all() == [self.sample_task_list, second_task_list]
+
+    def test_reading_msgpack_requires_msgpack(self):
+        pytest.importorskip("msgpack")
+        TaskMeFileHandler(self.file_path, data_format="msgpack").write(self.sample_task_list)
+
+        reader = TaskMeFileHandler(self.file_path)
+        with patch("src.System.TaskMeFileHandler.TaskMeFileHandler.msgpack", None):
+            # Through the index, then through a full parse
+            with pytest.raises(ValueError, match="The msgpack data format requires the 'msgpack' package."):
+                reader.read("Task List Name n1")
+            with pytest.raises(ValueError, match="The msgpack data format requires the 'msgpack' package."):
+                reader.read_all()
+
+    def test_invalid_data_format(self):
+        with pytest.raises(ValueError, match="Invalid data format"):
+            TaskMeFileHandler(self.file_path, data_format="xml")
+
+    # -----------------------------------------------------------------------------
+    # test_read_with_index
+    # -----------------------------------------------------------------------------
+    def test_read_only_parses_requested_task_list(self):
+        second_task_list = {"taskListName": "Task n1", "owners": ["Bobby"], "tags": ["vacation"], "tasks": []}
+        self.handler.write(self.sample_task_list)
+        self.handler.write(second_task_list)
+
+        # Fresh handler: nothing cached, lookup goes through the persisted index
+        handler = TaskMeFileHandler(self.file_path)
+        with patch("json.load", wraps=json.load) as mock_load:
+            with patch("json.loads", wraps=json.loads) as mock_loads:
+                assert handler.read("Task n1") == second_task_list
+                assert not handler.read("Non-existent Tasks")
+
+        # Only the index was fully loaded, the data file was sliced to the requested TaskList
+        mock_load.assert_called_once()
+        parsed_data = mock_loads.call_args_list[-1].args[0]
+        assert b"Task n1" in parsed_data and b"Task List Name n1" not in parsed_data
+
+    def test_read_returns_first_duplicate(self):
+        first = dict(self.sample_task_list, owners=["First"])
+        second = dict(self.sample_task_list, owners=["Second"])
+        with open(self.file_path, 'w') as file:
+            json.dump({"taskLists": [first, second]}, file)
+
+        # File written by another tool: index is stale, read falls back to a scan
+        assert TaskMeFileHandler(self.file_path).read("Task List Name n1") == first
+
+
+class TestTaskMeFileHandlerCache:
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, tmp_path):
+        self.file_path = tmp_path / ".taskme_data.json"
+        self.handler = TaskMeFileHandler(self.file_path)
+        self.sample_task_list = {
+            "taskListName": "Task List Name n1",
+            "owners": ["Bob"],
+            "tags": ["work"],
+            "tasks": []
+        }
+
+    # -----------------------------------------------------------------------------
+    # test_read_uses_cache
+    # -----------------------------------------------------------------------------
+    def test_read_does_not_reparse_unchanged_file(self):
+        self.handler.write(self.sample_task_list)
+
+        with patch("json.load") as mock_load:
+            assert self.handler.read("Task List Name n1") == self.sample_task_list
+            assert self.handler.read_all() == [self.sample_task_list]
+            mock_load.assert_not_called()
+
+    # -----------------------------------------------------------------------------
+    # test_cache_invalidation
+    # -----------------------------------------------------------------------------
+    def test_read_reparses_file_changed_by_another_process(self):
+        self.handler.write(self.sample_task_list)
+
+        other_handler = TaskMeFileHandler(self.file_path)
+        other_handler.write({"taskListName": "Task n2", "owners": ["Bobby"], "tags": [], "tasks": []})
+
+        assert [task_list["taskListName"] for task_list in self.handler.read_all()] == ["Task List Name n1",
+                                                                                       "Task n2"]
+
+
+class TestTaskMeFileHandlerStreaming:
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, tmp_path):
+        self.file_path = tmp_path / ".taskme_data.json"
+        self.task_lists = [
+            {"taskListName": f"Task List {idx}", "owners": ["Bob"], "tags": ["work", 12.5, None, True],
+             "tasks": [{"name": "é" * idx, "description": "x" * 5000}]}
+            for idx in range(20)
+        ]
+
+    # -----------------------------------------------------------------------------
+    # test_iter_task_lists
+    # -----------------------------------------------------------------------------
+    @pytest.mark.parametrize('indent', [None, 4])
+    def test_iter_task_lists_on_external_file(self, indent):
+        with open(self.file_path, 'w') as file:
+            json.dump({"version": [1, {"a": 2}], "taskLists": self.task_lists, "other": 3}, file,
+                      indent=indent, ensure_ascii=False)
+
+        handler = TaskMeFileHandler(self.file_path)
+        with patch("src.System.TaskMeFileHandler.TaskMeFileHandler._STREAM_CHUNK_SIZE", 7):
+            assert list(handler.iter_task_lists()) == self.task_lists
+
+    @pytest.mark.parametrize('data_format', ["compact", "pretty", "msgpack"])
+    def test_iter_task_lists_for_all_formats(self, data_format):
+        pytest.importorskip("msgpack")
+        handler = TaskMeFileHandler(self.file_path, data_format=data_format)
+        for task_list in self.task_lists:
+            handler.write(task_list)
+
+        assert list(TaskMeFileHandler(self.file_path).iter_task_lists()) == self.task_lists
+
+    def test_iter_task_lists_empty_file(self):
+        assert list(TaskMeFileHandler(self.file_path).iter_task_lists()) == []
+
+    def test_iter_task_lists_truncated_file(self):
+        with open(self.file_path, 'w') as file:
+            file.write(json.dumps({"taskLists": self.task_lists})[:-100])
+
+        with pytest.raises(ValueError):
+            list(TaskMeFileHandler(self.file_path).iter_task_lists())
+
+    # -----------------------------------------------------------------------------
+    # test_read_stops_on_first_match
+    # -----------------------------------------------------------------------------
+    def test_read_without_index_stops_on_first_match(self):
+        with open(self.file_path, 'w') as file:
+            json.dump({"taskLists": self.task_lists}, file)
+
+        consumed = []
+
+        def iter_task_lists(_):
+            for task_list in self.task_lists:
+                consumed.append(task_list)
+                yield task_list
+
+        handler = TaskMeFileHandler(self.file_path)
+        with patch("src.System.TaskMeFileHandler.TaskMeFileHandler._iter_json_task_lists",
+                   side_effect=iter_task_lists) as _:
+            assert handler.read("Task List 3") == self.task_lists[3]
+        assert len(consumed) == 4
+
+
+def _add_task_lists(file_path, worker, count):
+    handler = TaskMeFileHandler(file_path, durability=DurabilityPolicy("never"))
+    for idx in range(count):
+        handler.write({"taskListName": f"{worker}-{idx}", "owners": [], "tags": [], "tasks": []})
+
+
+def _add_tasks(file_path, worker, count):
+    handler = TaskMeFileHandler(file_path, durability=DurabilityPolicy("never"))
+    for idx in range(count):
+        with handler.transaction():
+            task_list = handler.read("shared")
+            handler.write(dict(task_list, tasks=task_list["tasks"] + [{"name": f"{worker}-{idx}"}]))
+
+
+@pytest.mark.skipif(file_lock_module.fcntl is None, reason="fcntl isn't available")
+class TestTaskMeFileHandlerConcurrency:
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, tmp_path):
+        self.file_path = tmp_path / ".taskme_data.json"
+        self.handler = TaskMeFileHandler(self.file_path)
+        self.handler.write({"taskListName": "shared", "owners": ["Bob"], "tags": [], "tasks": []})
+
+    @staticmethod
+    def run_processes(target, *args):
+        processes = [multiprocessing.Process(target=target, args=(*args[:1], worker, *args[1:]))
+                     for worker in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            assert process.exitcode == 0
+
+    # -----------------------------------------------------------------------------
+    # test_concurrent_writers
+    # -----------------------------------------------------------------------------
+    def test_concurrent_writers_dont_lose_task_lists(self):
+        self.run_processes(_add_task_lists, self.file_path, 10)
+
+        names = {task_list["taskListName"] for task_list in TaskMeFileHandler(self.file_path).read_all()}
+        assert names == {"shared"} | {f"{worker}-{idx}" for worker in range(4) for idx in range(10)}
+
+    def test_concurrent_transactions_dont_lose_tasks(self):
+        self.run_processes(_add_tasks, self.file_path, 10)
+
+        tasks = TaskMeFileHandler(self.file_path).read("shared")["tasks"]
+        assert len(tasks) == 40
+
+    def test_write_waits_for_readers(self):
+        with FileLock(f"{self.file_path}.lock").shared():
+            with pytest.raises(TimeoutError):
+                TaskMeFileHandler(self.file_path, lock_timeout=0.05).write(
+                    {"taskListName": "other", "owners": [], "tags": [], "tasks": []})
+
+    # -----------------------------------------------------------------------------
+    # test_optimistic
+    # -----------------------------------------------------------------------------
+    def test_optimistic_write_detects_conflicts(self):
+        first = TaskMeFileHandler(self.file_path, concurrency="optimistic")
+        second = TaskMeFileHandler(self.file_path, concurrency="optimistic")
+        first_list, second_list = first.read("shared"), second.read("shared")
+
+        first.write(dict(first_list, tasks=[{"name": "first"}]))
+
+        with pytest.raises(TaskMeConflictError):
+            second.write(dict(second_list, tasks=[{"name": "second"}]))
+        assert self.handler.read("shared")["tasks"] == [{"name": "first"}]
+
+        # Once read again, the write goes through
+        second_list = second.read("shared")
+        second.write(dict(second_list, tasks=second_list["tasks"] + [{"name": "second"}]))
+        assert self.handler.read("shared")["tasks"] == [{"name": "first"}, {"name": "second"}]
+
+    def test_optimistic_successive_writes_dont_conflict(self):
+        handler = TaskMeFileHandler(self.file_path, concurrency="optimistic")
+        task_list = handler.read("shared")
+        for idx in range(3):
+            task_list = dict(task_list, tasks=task_list["tasks"] + [{"name": str(idx)}])
+            handler.write(task_list)
+
+        assert len(self.handler.read("shared")["tasks"]) == 3
+
+    def test_optimistic_concurrent_creations_conflict(self):
+        first = TaskMeFileHandler(self.file_path, concurrency="optimistic")
+        second = TaskMeFileHandler(self.file_path, concurrency="optimistic")
+        assert first.read("new") is None and second.read("new") is None
+
+        first.write({"taskListName": "new", "owners": ["Bob"], "tags": [], "tasks": []})
+        with pytest.raises(TaskMeConflictError):
+            second.write({"taskListName": "new", "owners": ["Alice"], "tags": [], "tasks": []})
+
+    def test_invalid_concurrency_mode(self):
+        with pytest.raises(ValueError):
+            TaskMeFileHandler(self.file_path, concurrency="invalid")
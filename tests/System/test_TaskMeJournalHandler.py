@@ -0,0 +1,324 @@
+import json
+import multiprocessing
+
+import pytest
+from src.System.DurabilityPolicy.DurabilityPolicy import DurabilityPolicy
+from src.System.FileLock import FileLock as file_lock_module
+from src.System.TaskMeFileHandler.TaskMeFileHandler import TaskMeFileHandler
+from src.System.TaskMeJournalHandler.TaskMeJournalHandler import TaskMeJournalHandler
+
+
+def make_task(name, status="PENDING"):
+    return {"assignee": "Bob", "name": name, "due_date": "25/10/2023", "priority": "LOW",
+            "description": f"{name} description", "progress_status": status}
+
+
+class TestTaskMeJournalHandler:
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, tmp_path):
+        self.snapshot_path = tmp_path / "snapshot.json"
+        self.journal_path = tmp_path / "data.journal"
+        self.handler = self.new_handler()
+        self.sample_task_list = {
+            "taskListName": "Task List Name n1",
+            "owners": ["Bob"],
+            "tags": ["work"],
+            "tasks": [make_task("Task 1"), make_task("Task 2"), make_task("Task 3")]
+        }
+
+    def new_handler(self, **kwargs):
+        return TaskMeJournalHandler(self.snapshot_path, self.journal_path, **kwargs)
+
+    def journal_records(self):
+        with open(self.journal_path) as file:
+            return [json.loads(line) for line in file]
+
+    @staticmethod
+    def copy(task_list):
+        return json.loads(json.dumps(task_list))
+
+    # -----------------------------------------------------------------------------
+    # test_write_and_read
+    # -----------------------------------------------------------------------------
+    def test_write_and_read(self):
+        self.handler.write(self.sample_task_list)
+
+        assert self.handler.read("Task List Name n1") == self.sample_task_list
+        assert self.handler.read_all() == [self.sample_task_list]
+        assert list(self.handler.iter_task_lists()) == [self.sample_task_list]
+        assert not self.handler.read("Non-existent Tasks")
+
+    # -----------------------------------------------------------------------------
+    # test_next_task_id_is_journaled
+    # -----------------------------------------------------------------------------
+    def test_next_task_id_is_journaled(self):
+        self.handler.write(dict(self.copy(self.sample_task_list), nextTaskId=4))
+        self.handler.write(dict(self.copy(self.sample_task_list), nextTaskId=6))
+
+        assert self.journal_records()[-1]["fields"] == {"nextTaskId": 6}
+        assert self.new_handler().read("Task List Name n1")["nextTaskId"] == 6
+
+    # -----------------------------------------------------------------------------
+    # test_validated_marker_is_dropped
+    # -----------------------------------------------------------------------------
+    def test_validated_marker_is_dropped(self):
+        # Journal written by an older version
+        records = [{"op": "create_list", "list": "Work", "owners": [], "tags": [], "validated": True},
+                   {"op": "update_list", "list": "Work", "fields": {"tags": ["office"], "validated": True}}]
+        self.journal_path.write_text("".join(json.dumps(dict(record, seq=seq)) + "\n"
+                                             for seq, record in enumerate(records, 1)))
+
+        assert self.new_handler().read("Work") == {"taskListName": "Work", "owners": [], "tags": ["office"],
+                                                   "tasks": []}
+
+    # -----------------------------------------------------------------------------
+    # test_write_delta
+    # -----------------------------------------------------------------------------
+    def test_write_delta_journals_the_changes_only(self):
+        tasks = [dict(make_task(f"Task {task_id}"), id=task_id) for task_id in range(1, 4)]
+        self.handler.write(dict(self.copy(self.sample_task_list), tasks=tasks, nextTaskId=4))
+        records_count = len(self.journal_records())
+
+        assert self.handler.write_delta({
+            "taskListName": "Task List Name n1",
+            "fields": {"nextTaskId": 5},
+            "addedTasks": [dict(make_task("Task 4"), id=4)],
+            "updatedTasks": [{"progress_status": "COMPLETED", "id": 3}],
+            "removedTaskIds": [1]
+        })
+
+        expected = dict(self.copy(self.sample_task_list), nextTaskId=5,
+                        tasks=[tasks[1], dict(tasks[2], progress_status="COMPLETED"), dict(make_task("Task 4"), id=4)])
+        assert [record["op"] for record in self.journal_records()[records_count:]] == \
+               ["update_list", "update_task", "remove_task", "add_task"]
+        assert self.handler.read("Task List Name n1") == expected
+        assert self.new_handler().read("Task List Name n1") == expected
+
+        # Nothing to journal
+        assert not self.handler.write_delta({"taskListName": "Task List Name n1", "fields": {"nextTaskId": 5},
+                                             "addedTasks": [], "updatedTasks": [], "removedTaskIds": []})
+        with pytest.raises(ValueError, match="TaskList Task List Name n1 doesn't store the tasks changed by the delta"):
+            self.handler.write_delta({"taskListName": "Task List Name n1", "fields": {}, "addedTasks": [],
+                                      "updatedTasks": [], "removedTaskIds": [1]})
+
+    # -----------------------------------------------------------------------------
+    # test_write_many
+    # -----------------------------------------------------------------------------
+    def test_write_many_single_append(self):
+        second_task_list = dict(self.copy(self.sample_task_list), taskListName="Task n2")
+        updated = self.copy(self.sample_task_list)
+        updated["tasks"].append(make_task("Task 4"))
+
+        self.handler.write_many([self.sample_task_list, second_task_list, updated])
+
+        assert self.handler.read_all() == [updated, second_task_list]
+        assert self.new_handler().read_all() == [updated, second_task_list]
+
+    # -----------------------------------------------------------------------------
+    # test_write_appends_deltas
+    # -----------------------------------------------------------------------------
+    def test_update_task_appends_single_record(self):
+        task_list = dict(self.sample_task_list, tasks=[dict(make_task(f"Task {task_id}"), id=task_id)
+                                                       for task_id in range(1, 4)])
+        self.handler.write(task_list)
+        updated = self.copy(task_list)
+        updated["tasks"][1]["progress_status"] = "COMPLETED"
+        self.handler.write(updated)
+
+        last_record = self.journal_records()[-1]
+        assert last_record["op"] == "update_task"
+        assert last_record["id"] == 2
+        assert last_record["fields"] == {"progress_status": "COMPLETED"}
+
+    def test_remove_and_add_tasks_append_id_keyed_records(self):
+        task_list = dict(self.sample_task_list, tasks=[dict(make_task(f"Task {task_id}"), id=task_id)
+                                                       for task_id in range(1, 4)])
+        self.handler.write(task_list)
+        updated = self.copy(task_list)
+        updated["tasks"].pop(0)
+        updated["tasks"].append(dict(make_task("Task 4"), id=4))
+        records_before = len(self.journal_records())
+        self.handler.write(updated)
+
+        records = self.journal_records()[records_before:]
+        assert [(record["op"], record.get("id")) for record in records] == [("remove_task", 1), ("add_task", None)]
+        assert self.handler.read("Task List Name n1") == updated
+        assert self.new_handler().read("Task List Name n1") == updated
+
+    def test_tasks_without_id_are_rewritten_at_once(self):
+        self.handler.write(self.sample_task_list)
+        updated = self.copy(self.sample_task_list)
+        updated["tasks"].pop(0)
+        records_before = len(self.journal_records())
+        self.handler.write(updated)
+
+        records = self.journal_records()[records_before:]
+        assert [record["op"] for record in records] == ["set_tasks"]
+        assert self.new_handler().read("Task List Name n1") == updated
+
+    def test_reordered_tasks(self):
+        task_list = dict(self.sample_task_list, tasks=[dict(make_task(f"Task {task_id}"), id=task_id)
+                                                       for task_id in range(1, 4)])
+        self.handler.write(task_list)
+        reordered = dict(task_list, tasks=task_list["tasks"][::-1])
+        self.handler.write(reordered)
+
+        assert self.handler.read("Task List Name n1") == reordered
+        assert self.new_handler().read("Task List Name n1") == reordered
+
+    def test_unchanged_write_appends_nothing(self):
+        self.handler.write(self.sample_task_list)
+        records_before = len(self.journal_records())
+        self.handler.write(self.copy(self.sample_task_list))
+
+        assert len(self.journal_records()) == records_before
+
+    # -----------------------------------------------------------------------------
+    # test_read_returns_copies
+    # -----------------------------------------------------------------------------
+    def test_read_returns_copies(self):
+        self.handler.write(self.sample_task_list)
+
+        task_list = self.handler.read("Task List Name n1")
+        task_list["tags"].append("personal")
+        task_list["tasks"][0]["name"] = "Renamed"
+        task_list["tasks"].pop()
+        self.handler.read_all()[0]["owners"].clear()
+
+        assert self.handler.read("Task List Name n1") == self.sample_task_list
+
+    # -----------------------------------------------------------------------------
+    # test_replay
+    # -----------------------------------------------------------------------------
+    def test_replay_rebuilds_state(self):
+        self.handler.write(self.sample_task_list)
+        updated = self.copy(self.sample_task_list)
+        updated["tags"] = ["personal"]
+        updated["tasks"].insert(1, make_task("Task 1.5"))
+        updated["tasks"][3]["progress_status"] = "IN_PROGRESS"
+        del updated["tasks"][0]
+        self.handler.write(updated)
+
+        assert self.new_handler().read_all() == [updated]
+
+    def test_replay_position_keyed_records(self):
+        # Journal written before the records addressed tasks by ID
+        records = [{"op": "create_list", "list": "Work", "owners": [], "tags": []},
+                   {"op": "add_task", "list": "Work", "task_id": 1, "fields": make_task("Task 1")},
+                   {"op": "add_task", "list": "Work", "task_id": 1, "fields": make_task("Task 0")},
+                   {"op": "update_task", "list": "Work", "task_id": 2, "fields": {"progress_status": "COMPLETED"}},
+                   {"op": "remove_task", "list": "Work", "task_id": 1}]
+        self.journal_path.write_text("".join(json.dumps(dict(record, seq=seq)) + "\n"
+                                             for seq, record in enumerate(records, 1)))
+
+        assert self.new_handler().read("Work")["tasks"] == [make_task("Task 1", status="COMPLETED")]
+
+    def test_replay_discards_torn_record(self):
+        self.handler.write(self.sample_task_list)
+        with open(self.journal_path, 'a') as file:
+            file.write('{"seq": 99, "op": "remove_ta')
+
+        handler = self.new_handler()
+        assert handler.read("Task List Name n1") == self.sample_task_list
+
+        # Journal was truncated to its last valid record and can be appended again
+        handler.write({"taskListName": "Other", "owners": [], "tags": [], "tasks": []})
+        assert len(self.new_handler().read_all()) == 2
+
+    def test_replay_skips_records_of_unknown_task_lists_and_tasks(self):
+        records = [{"op": "create_list", "list": "Work", "owners": [], "tags": []},
+                   {"op": "add_task", "list": "Work", "fields": dict(make_task("Task 1"), id=1)},
+                   {"op": "update_task", "list": "Missing", "id": 1, "fields": {"name": "Renamed"}},
+                   {"op": "remove_task", "list": "Work", "id": 42},
+                   {"op": "update_task", "list": "Work", "id": 1, "fields": {"progress_status": "COMPLETED"}}]
+        self.journal_path.write_text("".join(json.dumps(dict(record, seq=seq)) + "\n"
+                                             for seq, record in enumerate(records, 1)))
+
+        handler = self.new_handler()
+        assert handler.read_all() == [{"taskListName": "Work", "owners": [], "tags": [],
+                                       "tasks": [dict(make_task("Task 1", status="COMPLETED"), id=1)]}]
+
+        handler.write({"taskListName": "Other", "owners": [], "tags": [], "tasks": []})
+        assert self.journal_records()[-1]["seq"] == 6
+
+    # -----------------------------------------------------------------------------
+    # test_shared_storage
+    # -----------------------------------------------------------------------------
+    def test_records_of_other_handlers_are_replayed(self):
+        other_handler = self.new_handler()
+        self.handler.write(self.sample_task_list)
+        assert other_handler.read("Task List Name n1") == self.sample_task_list
+
+        updated = self.copy(self.sample_task_list)
+        updated["tags"] = ["personal"]
+        other_handler.write(updated)
+        self.handler.write({"taskListName": "Other", "owners": [], "tags": [], "tasks": []})
+
+        records = self.journal_records()
+        assert [record["seq"] for record in records] == list(range(1, len(records) + 1))
+        assert self.handler.read("Task List Name n1") == updated
+        assert len(self.new_handler().read_all()) == 2
+
+    def test_compaction_keeps_records_of_other_handlers(self):
+        other_handler = self.new_handler()
+        self.handler.write(self.sample_task_list)
+        other_handler.write({"taskListName": "Other", "owners": [], "tags": [], "tasks": []})
+        self.handler.compact()
+
+        # The other handler reloads the new snapshot
+        other_handler.write({"taskListName": "Third", "owners": [], "tags": [], "tasks": []})
+        assert [task_list["taskListName"] for task_list in self.new_handler().read_all()] == \
+               ["Task List Name n1", "Other", "Third"]
+
+    @pytest.mark.skipif(file_lock_module.fcntl is None, reason="fcntl isn't available")
+    def test_concurrent_writers_dont_lose_records(self):
+        processes = [multiprocessing.Process(target=_add_task_lists,
+                                             args=(self.snapshot_path, self.journal_path, worker, 10))
+                     for worker in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            assert process.exitcode == 0
+
+        names = {task_list["taskListName"] for task_list in self.new_handler().read_all()}
+        assert names == {f"{worker}-{idx}" for worker in range(4) for idx in range(10)}
+
+    # -----------------------------------------------------------------------------
+    # test_compaction
+    # -----------------------------------------------------------------------------
+    def test_compaction_on_threshold(self):
+        handler = self.new_handler(compaction_threshold=1)
+        handler.write(self.sample_task_list)
+
+        assert self.journal_path.stat().st_size == 0
+        assert json.loads(self.snapshot_path.read_text())["taskLists"] == [self.sample_task_list]
+        assert self.new_handler().read_all() == [self.sample_task_list]
+
+    def test_replay_skips_records_already_in_snapshot(self):
+        self.handler.write(self.sample_task_list)
+        journal = self.journal_path.read_text()
+        self.handler.compact()
+
+        # Simulates a crash between the snapshot write and the journal truncation
+        self.journal_path.write_text(journal)
+        assert self.new_handler().read_all() == [self.sample_task_list]
+
+    # -----------------------------------------------------------------------------
+    # test_migrate_from_json
+    # -----------------------------------------------------------------------------
+    @pytest.mark.parametrize('data_format', ["compact", "pretty", "msgpack"])
+    def test_migrate_from_json(self, tmp_path, data_format):
+        json_file = tmp_path / ".taskme_data.json"
+        TaskMeFileHandler(json_file, data_format=data_format, search_index=False).write(self.sample_task_list)
+
+        assert self.handler.migrate_from_json(json_file) == 1
+        assert self.new_handler().read_all() == [self.sample_task_list]
+
+
+def _add_task_lists(snapshot_path, journal_path, worker, count):
+    handler = TaskMeJournalHandler(snapshot_path, journal_path, compaction_threshold=2048,
+                                   durability=DurabilityPolicy("never"))
+    for idx in range(count):
+        handler.write({"taskListName": f"{worker}-{idx}", "owners": [], "tags": [], "tasks": []})
@@ -0,0 +1,256 @@
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from unittest.mock import patch
+from src.System.TaskMeFileHandler.TaskMeFileHandler import TaskMeFileHandler
+from src.System.TaskMeSQLiteHandler.TaskMeSQLiteHandler import TaskMeSQLiteHandler
+
+
+class TestTaskMeSQLiteHandler:
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, tmp_path):
+        self.tmp_path = tmp_path
+        self.handler = TaskMeSQLiteHandler(tmp_path / "taskme.db")
+        self.sample_task_list = {
+            "taskListName": "Task List Name n1",
+            "owners": ["Bob"],
+            "tags": ["work"],
+            "tasks": [
+                {"assignee": "Bob", "name": "Task 1", "due_date": "25/10/2023", "priority": "LOW",
+                 "description": "First task", "progress_status": "PENDING"},
+                {"assignee": "Alice", "name": "Task 2", "due_date": "26/10/2023", "priority": "HIGH",
+                 "description": "Second task", "progress_status": "COMPLETED"}
+            ]
+        }
+        yield
+        self.handler.close()
+
+    # -----------------------------------------------------------------------------
+    # test_write_and_read_all
+    # -----------------------------------------------------------------------------
+    def test_write_and_read_all(self):
+        self.handler.write(self.sample_task_list)
+        all_task_lists = self.handler.read_all()
+
+        assert all_task_lists == [self.sample_task_list]
+
+    # -----------------------------------------------------------------------------
+    # test_next_task_id_round_trip
+    # -----------------------------------------------------------------------------
+    def test_next_task_id_round_trip(self):
+        task_list = dict(self.sample_task_list, nextTaskId=3)
+        self.handler.write(task_list)
+        assert self.handler.read("Task List Name n1") == task_list
+
+        task_list["nextTaskId"] = 5
+        self.handler.write(task_list)
+        assert self.handler.read_all() == [task_list]
+        assert list(self.handler.iter_task_lists()) == [task_list]
+
+    # -----------------------------------------------------------------------------
+    # test_validated_marker_is_dropped
+    # -----------------------------------------------------------------------------
+    def test_validated_marker_is_dropped(self):
+        self.handler.write(dict(self.sample_task_list, validated=True))
+
+        assert self.handler.read("Task List Name n1") == self.sample_task_list
+        assert list(self.handler.iter_task_lists()) == [self.sample_task_list]
+
+    # -----------------------------------------------------------------------------
+    # test_write_and_read_specific
+    # -----------------------------------------------------------------------------
+    def test_write_and_read_specific(self):
+        self.handler.write(self.sample_task_list)
+        retrieved_task_list = self.handler.read("Task List Name n1")
+
+        assert retrieved_task_list == self.sample_task_list
+
+    # -----------------------------------------------------------------------------
+    # test_write_many
+    # -----------------------------------------------------------------------------
+    def test_write_many(self):
+        second_task_list = dict(self.sample_task_list, taskListName="Task List Name n2", tasks=[])
+        self.handler.write_many([self.sample_task_list, second_task_list])
+
+        assert self.handler.read_all() == [self.sample_task_list, second_task_list]
+
+    # -----------------------------------------------------------------------------
+    # test_threads
+    # -----------------------------------------------------------------------------
+    def test_write_from_threads(self):
+        task_lists = [dict(self.sample_task_list, taskListName=f"Task List {idx}") for idx in range(20)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(self.handler.write, task_lists))
+
+        assert sorted(task_list["taskListName"] for task_list in self.handler.read_all()) == \
+               sorted(task_list["taskListName"] for task_list in task_lists)
+
+    # -----------------------------------------------------------------------------
+    # test_read_non_existent_task_list
+    # -----------------------------------------------------------------------------
+    def test_read_non_existent_task_list(self):
+        assert not self.handler.read("Non-existent Tasks")
+
+    # -----------------------------------------------------------------------------
+    # test_update_task_list
+    # -----------------------------------------------------------------------------
+    def test_update_task_list(self):
+        self.handler.write(self.sample_task_list)
+
+        updated_task_list = json.loads(json.dumps(self.sample_task_list))
+        updated_task_list["tags"].append("personal")
+        updated_task_list["tasks"][1]["progress_status"] = "IN_PROGRESS"
+        self.handler.write(updated_task_list)
+
+        assert self.handler.read("Task List Name n1") == updated_task_list
+        assert len(self.handler.read_all()) == 1
+
+    def test_remove_task_shrinks_task_list(self):
+        self.handler.write(self.sample_task_list)
+
+        updated_task_list = json.loads(json.dumps(self.sample_task_list))
+        updated_task_list["tasks"].pop(0)
+        self.handler.write(updated_task_list)
+
+        assert self.handler.read("Task List Name n1")["tasks"] == updated_task_list["tasks"]
+
+    def test_write_only_touches_changed_tasks(self):
+        tasks = [{"name": f"Task {task_id}", "priority": "LOW", "id": task_id} for task_id in range(1, 5)]
+        self.handler.write(dict(self.sample_task_list, tasks=tasks))
+
+        updated_tasks = [tasks[0], dict(tasks[2], priority="HIGH"), tasks[3], {"name": "Task 5", "id": 5}]
+        statements = []
+        self.handler._TaskMeSQLiteHandler__connection.set_trace_callback(statements.append)
+        self.handler.write(dict(self.sample_task_list, tasks=updated_tasks))
+        self.handler._TaskMeSQLiteHandler__connection.set_trace_callback(None)
+
+        assert self.handler.read("Task List Name n1")["tasks"] == updated_tasks
+        # Task 2 removed, task 3 updated, task 5 added: tasks 1 and 4 aren't rewritten
+        assert len([statement for statement in statements if statement.startswith(("INSERT", "UPDATE tasks", "DELETE"))]) == 3
+
+    def test_write_reordered_tasks(self):
+        tasks = [{"name": f"Task {task_id}", "id": task_id} for task_id in range(1, 4)]
+        self.handler.write(dict(self.sample_task_list, tasks=tasks))
+
+        self.handler.write(dict(self.sample_task_list, tasks=tasks[::-1]))
+        assert self.handler.read("Task List Name n1")["tasks"] == tasks[::-1]
+
+    # -----------------------------------------------------------------------------
+    # test_write_delta
+    # -----------------------------------------------------------------------------
+    def test_write_delta(self):
+        tasks = [{"name": f"Task {task_id}", "priority": "LOW", "id": task_id} for task_id in range(1, 4)]
+        self.handler.write(dict(self.sample_task_list, tasks=tasks, nextTaskId=4))
+
+        assert self.handler.write_delta({
+            "taskListName": "Task List Name n1",
+            "fields": {"tags": ["personal"], "nextTaskId": 5},
+            "addedTasks": [{"name": "Task 4", "priority": "LOW", "id": 4}],
+            "updatedTasks": [{"priority": "HIGH", "id": 3}],
+            "removedTaskIds": [2]
+        })
+
+        assert self.handler.read("Task List Name n1") == dict(self.sample_task_list, tags=["personal"], nextTaskId=5, tasks=[
+            tasks[0], {"name": "Task 3", "priority": "HIGH", "id": 3}, {"name": "Task 4", "priority": "LOW", "id": 4}])
+
+    def test_write_empty_delta(self):
+        self.handler.write(self.sample_task_list)
+        delta = {"taskListName": "Task List Name n1", "fields": {}, "addedTasks": [], "updatedTasks": [],
+                 "removedTaskIds": []}
+
+        with patch.object(self.handler, "_TaskMeSQLiteHandler__connection") as mock_connection:
+            assert not self.handler.write_delta(delta)
+        mock_connection.execute.assert_not_called()
+
+    def test_write_delta_of_unknown_tasks(self):
+        tasks = [{"name": "Task 1", "id": 1}]
+        self.handler.write(dict(self.sample_task_list, tasks=tasks))
+        delta = {"taskListName": "Task List Name n1", "fields": {"tags": []}, "addedTasks": [],
+                 "updatedTasks": [{"name": "Renamed", "id": 1}], "removedTaskIds": [2]}
+
+        with pytest.raises(ValueError, match="TaskList Task List Name n1 doesn't store the tasks changed by the delta"):
+            self.handler.write_delta(delta)
+        with pytest.raises(ValueError, match="TaskList Unknown wasn't found, its delta can't be written"):
+            self.handler.write_delta(dict(delta, taskListName="Unknown"))
+        # The partial changes are rolled back
+        assert self.handler.read_all() == [dict(self.sample_task_list, tasks=tasks)]
+
+    # -----------------------------------------------------------------------------
+    # test_multiple_task_lists
+    # -----------------------------------------------------------------------------
+    def test_multiple_task_lists(self):
+        second_task_list = {
+            "taskListName": "Task n1",
+            "owners": ["Bobby"],
+            "tags": ["vacation"],
+            "tasks": []
+        }
+
+        self.handler.write(self.sample_task_list)
+        self.handler.write(second_task_list)
+
+        all_task_lists = self.handler.read_all()
+        assert [task_list["taskListName"] for task_list in all_task_lists] == ["Task List Name n1", "Task n1"]
+        assert self.handler.read("Task n1") == second_task_list
+
+    def test_iter_task_lists(self):
+        second_task_list = {"taskListName": "Task n1", "owners": ["Bobby"], "tags": [], "tasks": []}
+        self.handler.write(self.sample_task_list)
+        self.handler.write(second_task_list)
+
+        assert list(self.handler.iter_task_lists()) == [self.sample_task_list, second_task_list]
+
+    # -----------------------------------------------------------------------------
+    # test_persistence
+    # -----------------------------------------------------------------------------
+    def test_data_persists_across_handlers(self):
+        self.handler.write(self.sample_task_list)
+        self.handler.close()
+
+        self.handler = TaskMeSQLiteHandler(self.tmp_path / "taskme.db")
+        assert self.handler.read("Task List Name n1") == self.sample_task_list
+
+    # -----------------------------------------------------------------------------
+    # test_migrate_from_json
+    # -----------------------------------------------------------------------------
+    @pytest.mark.parametrize('data_format', ["compact", "pretty", "msgpack"])
+    def test_migrate_from_json(self, data_format):
+        json_file = self.tmp_path / ".taskme_data.json"
+        TaskMeFileHandler(json_file, data_format=data_format, search_index=False).write(self.sample_task_list)
+
+        assert self.handler.migrate_from_json(json_file) == 1
+        assert self.handler.read_all() == [self.sample_task_list]
+
+    def test_migrate_from_missing_file(self):
+        with pytest.raises(ValueError, match="wasn't found"):
+            self.handler.migrate_from_json(self.tmp_path / "missing.json")
+        assert not (self.tmp_path / "missing.json").exists()
+
+    # -----------------------------------------------------------------------------
+    # test_position_keyed_database
+    # -----------------------------------------------------------------------------
+    def test_position_keyed_database_is_upgraded(self):
+        db_path = self.tmp_path / "old.db"
+        connection = sqlite3.connect(db_path)
+        with connection:
+            connection.execute("CREATE TABLE task_lists (list_id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                               "name TEXT NOT NULL UNIQUE, owners TEXT NOT NULL, tags TEXT NOT NULL)")
+            connection.execute("CREATE TABLE tasks (list_id INTEGER NOT NULL, position INTEGER NOT NULL, "
+                               "payload TEXT NOT NULL, PRIMARY KEY (list_id, position)) WITHOUT ROWID")
+            connection.execute("INSERT INTO task_lists (name, owners, tags) VALUES ('Work', '[]', '[]')")
+            tasks = [{"name": "Task 2", "id": 2}, {"name": "Task 1", "id": 1}, {"name": "Legacy"}]
+            connection.executemany("INSERT INTO tasks VALUES (1, ?, ?)",
+                                   [(position, json.dumps(task)) for position, task in enumerate(tasks, 1)])
+        connection.close()
+
+        handler = TaskMeSQLiteHandler(db_path)
+        try:
+            assert handler.read("Work")["tasks"] == tasks
+            handler.write_delta({"taskListName": "Work", "fields": {}, "addedTasks": [],
+                                 "updatedTasks": [{"name": "Renamed", "id": 1}], "removedTaskIds": [2]})
+            assert handler.read("Work")["tasks"] == [{"name": "Renamed", "id": 1}, {"name": "Legacy"}]
+        finally:
+            handler.close()
@@ -0,0 +1,274 @@
+import json
+import sqlite3
+from unittest.mock import Mock, patch
+
+import pytest
+from src.System.FileLock.FileLock import FileLock
+from src.System.TaskMeFileHandler.TaskMeFileHandler import TaskMeFileHandler
+from src.System.TaskMeSearchIndex.TaskMeSearchIndex import TaskMeSearchIndex, parse_query, search_storage, tokenize
+
+
+def make_task(task_id, assignee, name, description=""):
+    return {"assignee": assignee, "name": name, "due_date": "25/10/2023", "priority": "LOW",
+            "description": description, "progress_status": "PENDING", "id": task_id}
+
+
+class TestTaskMeSearchIndex:
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, tmp_path):
+        self.tmp_path = tmp_path
+        self.index = TaskMeSearchIndex(tmp_path / "search.db")
+        self.work = {
+            "taskListName": "Work",
+            "owners": ["Bob"],
+            "tags": ["office", "Q4"],
+            "tasks": [make_task(1, "Bob", "Write report", "Quarterly sales report"),
+                      make_task(2, "Alice", "Review report", "Check the figures")]
+        }
+        self.home = {
+            "taskListName": "Home",
+            "owners": ["Alice"],
+            "tags": ["personal"],
+            "tasks": [make_task(1, "Alice", "Buy milk", "Fat milk from the store")]
+        }
+        yield
+        self.index.close()
+
+    # -----------------------------------------------------------------------------
+    # test_tokenize
+    # -----------------------------------------------------------------------------
+    def test_tokenize(self):
+        assert tokenize("Buy fat-milk, NOW!") == ["buy", "fat", "milk", "now"]
+
+    # -----------------------------------------------------------------------------
+    # test_parse_query
+    # -----------------------------------------------------------------------------
+    def test_parse_query(self):
+        assert parse_query("Rep* sales rep* *") == [("rep", True), ("sales", False)]
+
+    # -----------------------------------------------------------------------------
+    # test_search_by_field
+    # -----------------------------------------------------------------------------
+    def test_search_by_field(self):
+        self.index.update([self.work, self.home])
+
+        assert self.index.search(assignee="alice") == [("Work", self.work["tasks"][1]),
+                                                       ("Home", self.home["tasks"][0])]
+        assert self.index.search(owner="Bob") == [("Work", task) for task in self.work["tasks"]]
+        assert self.index.search(tag="q4") == [("Work", task) for task in self.work["tasks"]]
+        assert self.index.search(words="REPORT") == [("Work", task) for task in self.work["tasks"]]
+        assert self.index.search(words="nothing") == []
+
+    # -----------------------------------------------------------------------------
+    # test_search_criteria_are_combined
+    # -----------------------------------------------------------------------------
+    def test_search_criteria_are_combined(self):
+        self.index.update([self.work, self.home])
+
+        assert self.index.search(assignee="Alice", owner="Bob") == [("Work", self.work["tasks"][1])]
+        assert self.index.search(words="sales report") == [("Work", self.work["tasks"][0])]
+        assert self.index.search(assignee="Alice", task_list="Home") == [("Home", self.home["tasks"][0])]
+
+    # -----------------------------------------------------------------------------
+    # test_search_without_criteria
+    # -----------------------------------------------------------------------------
+    def test_search_without_criteria(self):
+        with pytest.raises(ValueError, match="At least one search criterion is required."):
+            self.index.search(words="  !! ", task_list="Work")
+
+    # -----------------------------------------------------------------------------
+    # test_search_prefix
+    # -----------------------------------------------------------------------------
+    def test_search_prefix(self):
+        self.index.update([self.work, self.home])
+
+        assert [task["id"] for _, task in self.index.search(words="re*")] == [2, 1]
+        assert self.index.search(words="figure*") == [("Work", self.work["tasks"][1])]
+        assert self.index.search(words="fig") == []
+        assert self.index.search(words="zz*") == []
+
+    # -----------------------------------------------------------------------------
+    # test_search_ranking
+    # -----------------------------------------------------------------------------
+    def test_search_ranking(self):
+        tasks = [make_task(1, "Bob", "Plan", "Meeting about the budget and the roadmap of next year"),
+                 make_task(2, "Bob", "Budget", "Yearly figures"),
+                 make_task(3, "Bob", "Budget review", "Budget, budget"),
+                 make_task(4, "Bob", "Roadmap", "Draft the roadmap")]
+        self.index.update([dict(self.work, tasks=tasks)])
+
+        # Name words and repeated words weigh more, long descriptions less
+        assert [task["id"] for _, task in self.index.search(words="budget")] == [3, 2, 1]
+        assert [task["id"] for _, task in self.index.search(words="budget", limit=2)] == [3, 2]
+
+        assert [task["id"] for _, task in self.index.search(words="the roadmap")] == [4, 1]
+        assert [task["id"] for _, task in self.index.search(words="road* budg*")] == [1]
+
+        # Filters apply to ranked searches as well
+        assert self.index.search(words="budget", task_list="Home") == []
+        with pytest.raises(ValueError, match="Search limit must be positive."):
+            self.index.search(words="budget", limit=-1)
+
+    # -----------------------------------------------------------------------------
+    # test_statistics_follow_updates
+    # -----------------------------------------------------------------------------
+    def test_statistics_follow_updates(self):
+        self.index.update([self.work, self.home])
+        self.work["tasks"][0] = make_task(1, "Bob", "Write", "")
+        self.work["tasks"].pop(1)
+        self.index.update([self.work])
+        self.index.sync([self.work])
+
+        connection = sqlite3.connect(self.tmp_path / "search.db")
+        statistics = json.loads(connection.execute("SELECT value FROM meta WHERE key = 'statistics'").fetchone()[0])
+        terms = dict(connection.execute("SELECT term, documents FROM terms"))
+        connection.close()
+
+        # Only "Write" is left, counted twice as a name word
+        assert statistics == [1, 2]
+        assert terms == {"write": 1}
+
+    # -----------------------------------------------------------------------------
+    # test_update_only_reindexes_changed_tasks
+    # -----------------------------------------------------------------------------
+    def test_update_only_reindexes_changed_tasks(self):
+        assert self.index.update([self.work]) == 2
+
+        self.work["tasks"][1] = make_task(2, "Carol", "Review report", "Check the figures")
+        self.work["tasks"].append(make_task(3, "Carol", "Send report"))
+        assert self.index.update([self.work]) == 2
+        assert self.index.update([self.work]) == 0
+
+        assert self.index.search(assignee="Alice") == []
+        assert [task["id"] for _, task in self.index.search(assignee="Carol")] == [2, 3]
+
+    # -----------------------------------------------------------------------------
+    # test_update_removes_tasks_and_list_fields
+    # -----------------------------------------------------------------------------
+    def test_update_removes_tasks_and_list_fields(self):
+        self.index.update([self.work])
+
+        self.work["tasks"].pop(0)
+        self.work["tags"] = ["archive"]
+        self.index.update([self.work])
+
+        assert self.index.search(words="sales") == []
+        assert self.index.search(tag="office") == []
+        assert self.index.search(tag="archive") == [("Work", self.work["tasks"][0])]
+
+    # -----------------------------------------------------------------------------
+    # test_sync_drops_missing_task_lists
+    # -----------------------------------------------------------------------------
+    def test_sync_drops_missing_task_lists(self):
+        self.index.update([self.work, self.home])
+        self.index.sync(iter([self.home]), stamp=(1, 2, 3))
+
+        assert self.index.search(assignee="Alice") == [("Home", self.home["tasks"][0])]
+        assert self.index.is_current((1, 2, 3))
+        assert not self.index.is_current((1, 2, 4))
+        assert not self.index.is_current(None)
+
+    # -----------------------------------------------------------------------------
+    # test_index_is_persisted
+    # -----------------------------------------------------------------------------
+    def test_index_is_persisted(self):
+        self.index.update([self.work], stamp=(1, 2, 3))
+        self.index.close()
+
+        self.index = TaskMeSearchIndex(self.tmp_path / "search.db")
+        assert self.index.is_current((1, 2, 3))
+        assert self.index.search(assignee="bob") == [("Work", self.work["tasks"][0])]
+
+    # -----------------------------------------------------------------------------
+    # test_tasks_without_id_are_identified_by_position
+    # -----------------------------------------------------------------------------
+    def test_tasks_without_id_are_identified_by_position(self):
+        for task in self.work["tasks"]:
+            del task["id"]
+        self.index.update([self.work])
+
+        assert self.index.search(assignee="Alice") == [("Work", self.work["tasks"][1])]
+
+
+class TestTaskMeFileHandlerSearch:
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, tmp_path):
+        self.file_path = tmp_path / "taskme.json"
+        self.handler = TaskMeFileHandler(self.file_path)
+        self.work = {"taskListName": "Work", "owners": ["Bob"], "tags": [],
+                     "tasks": [make_task(1, "Bob", "Write report")]}
+        self.home = {"taskListName": "Home", "owners": ["Alice"], "tags": [],
+                     "tasks": [make_task(1, "Bob", "Buy milk")]}
+
+    # -----------------------------------------------------------------------------
+    # test_writes_update_the_index
+    # -----------------------------------------------------------------------------
+    def test_writes_update_the_index(self):
+        self.handler.write(self.work)
+        self.handler.write(self.home)
+        assert self.handler.search(assignee="Bob") == [("Work", self.work["tasks"][0]),
+                                                       ("Home", self.home["tasks"][0])]
+
+        # Answered by the index, the data file isn't parsed
+        other_handler = TaskMeFileHandler(self.file_path)
+        other_handler.read_all = Mock(side_effect=AssertionError("read_all called"))
+        other_handler.iter_task_lists = Mock(side_effect=AssertionError("iter_task_lists called"))
+        assert other_handler.search(owner="alice") == [("Home", self.home["tasks"][0])]
+
+    # -----------------------------------------------------------------------------
+    # test_stale_index_is_synchronized
+    # -----------------------------------------------------------------------------
+    def test_stale_index_is_synchronized(self):
+        self.handler.write(self.work)
+
+        # Data file rewritten by a handler not maintaining the index
+        TaskMeFileHandler(self.file_path, search_index=False).write(self.home)
+        assert self.handler.search(words="milk") == [("Home", self.home["tasks"][0])]
+
+        # Next write without index: the index is synchronized on write as well
+        TaskMeFileHandler(self.file_path, search_index=False).write(dict(self.home, tasks=[]))
+        self.handler.write(dict(self.work, tasks=[]))
+        assert self.handler.search(assignee="Bob") == []
+
+    def test_stale_index_is_synchronized_with_the_exclusive_lock(self):
+        self.handler.write(self.work)
+        TaskMeFileHandler(self.file_path, search_index=False).write(self.home)
+        search_index = self.handler._TaskMeFileHandler__get_search_index()
+
+        def sync(task_lists, stamp):
+            # Neither a writer nor another search can get the lock meanwhile
+            with pytest.raises(TimeoutError):
+                with FileLock(f"{self.file_path}.lock", timeout=0).shared():
+                    pass
+            return TaskMeSearchIndex.sync(search_index, task_lists, stamp)
+
+        with patch.object(search_index, "sync", side_effect=sync) as mock_sync:
+            assert self.handler.search(words="milk") == [("Home", self.home["tasks"][0])]
+        mock_sync.assert_called_once()
+
+    def test_failed_synchronization_falls_back_to_a_scan(self):
+        self.handler.write(self.work)
+        TaskMeFileHandler(self.file_path, search_index=False).write(self.home)
+        search_index = self.handler._TaskMeFileHandler__get_search_index()
+
+        with patch.object(search_index, "sync", side_effect=sqlite3.OperationalError("database is locked")):
+            assert self.handler.search(words="milk") == [("Home", self.home["tasks"][0])]
+
+    # -----------------------------------------------------------------------------
+    # test_search_disabled
+    # -----------------------------------------------------------------------------
+    def test_search_disabled(self):
+        handler = TaskMeFileHandler(self.file_path, search_index=False)
+        with pytest.raises(ValueError, match="The search index is disabled for this data file."):
+            handler.search(assignee="Bob")
+
+    # -----------------------------------------------------------------------------
+    # test_search_storage_without_index
+    # -----------------------------------------------------------------------------
+    def test_search_storage_without_index(self):
+        file_handler = Mock(spec=["iter_task_lists"])
+        file_handler.iter_task_lists.return_value = iter([self.work, self.home])
+
+        assert search_storage(file_handler, words="milk") == [("Home", self.home["tasks"][0])]
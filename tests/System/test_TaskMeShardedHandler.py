@@ -0,0 +1,118 @@
+import json
+import multiprocessing
+
+import pytest
+from unittest.mock import patch
+from src.System.DurabilityPolicy.DurabilityPolicy import DurabilityPolicy
+from src.System.FileLock import FileLock as file_lock_module
+from src.System.TaskMeFileHandler.TaskMeFileHandler import TaskMeFileHandler
+from src.System.TaskMeShardedHandler.TaskMeShardedHandler import TaskMeShardedHandler
+
+
+class TestTaskMeShardedHandler:
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, tmp_path):
+        self.shards_dir = tmp_path / "shards"
+        self.handler = TaskMeShardedHandler(self.shards_dir)
+        self.sample_task_list = {
+            "taskListName": "Task List Name n1",
+            "owners": ["Bob"],
+            "tags": ["work"],
+            "tasks": []
+        }
+        self.second_task_list = {
+            "taskListName": "Task n1",
+            "owners": ["Bobby"],
+            "tags": ["vacation"],
+            "tasks": []
+        }
+
+    # -----------------------------------------------------------------------------
+    # test_write_and_read
+    # -----------------------------------------------------------------------------
+    def test_write_and_read(self):
+        self.handler.write(self.sample_task_list)
+        self.handler.write(self.second_task_list)
+
+        assert self.handler.read("Task n1") == self.second_task_list
+        assert self.handler.read_all() == [self.sample_task_list, self.second_task_list]
+        assert not self.handler.read("Non-existent Tasks")
+
+    def test_one_shard_per_task_list(self):
+        self.handler.write(self.sample_task_list)
+        self.handler.write(self.second_task_list)
+
+        shard_files = sorted(path.name for path in self.shards_dir.iterdir())
+        assert shard_files == sorted(["manifest.json", "manifest.json.lock",
+                                      TaskMeShardedHandler.get_shard_file_name("Task List Name n1"),
+                                      TaskMeShardedHandler.get_shard_file_name("Task n1")])
+
+    # -----------------------------------------------------------------------------
+    # test_write_many
+    # -----------------------------------------------------------------------------
+    def test_write_many_rewrites_manifest_once(self):
+        manifest_path = self.shards_dir / "manifest.json"
+        before = manifest_path.stat().st_ino
+
+        self.handler.write_many([self.sample_task_list, self.second_task_list])
+
+        assert manifest_path.stat().st_ino != before
+        assert self.handler.read_all() == [self.sample_task_list, self.second_task_list]
+
+    # -----------------------------------------------------------------------------
+    # test_update_task_list
+    # -----------------------------------------------------------------------------
+    def test_update_only_rewrites_its_shard(self):
+        self.handler.write(self.sample_task_list)
+        self.handler.write(self.second_task_list)
+
+        updated_task_list = dict(self.sample_task_list, tags=["work", "personal"])
+        with patch("os.replace", wraps=__import__("os").replace) as mock_replace:
+            self.handler.write(updated_task_list)
+
+        # Neither the manifest nor the other shard got rewritten
+        mock_replace.assert_called_once()
+        assert self.handler.read("Task List Name n1") == updated_task_list
+        assert self.handler.read("Task n1") == self.second_task_list
+
+    # -----------------------------------------------------------------------------
+    # test_migrate_from_json
+    # -----------------------------------------------------------------------------
+    @pytest.mark.parametrize('data_format', ["compact", "pretty", "msgpack"])
+    def test_migrate_from_json(self, tmp_path, data_format):
+        json_file = tmp_path / ".taskme_data.json"
+        TaskMeFileHandler(json_file, data_format=data_format, search_index=False).write_many(
+            [self.sample_task_list, self.second_task_list])
+
+        assert self.handler.migrate_from_json(json_file) == 2
+        assert TaskMeShardedHandler(self.shards_dir).read_all() == [self.sample_task_list, self.second_task_list]
+
+    def test_migrate_skips_duplicate_task_lists(self, tmp_path):
+        json_file = tmp_path / ".taskme_data.json"
+        json_file.write_text(json.dumps({"taskLists": [self.sample_task_list, dict(self.sample_task_list, tags=[])]}))
+
+        assert self.handler.migrate_from_json(json_file) == 1
+        assert self.handler.read_all() == [self.sample_task_list]
+
+    # -----------------------------------------------------------------------------
+    # test_concurrent_writers
+    # -----------------------------------------------------------------------------
+    @pytest.mark.skipif(file_lock_module.fcntl is None, reason="fcntl isn't available")
+    def test_concurrent_writers_dont_lose_task_lists(self):
+        processes = [multiprocessing.Process(target=_add_task_lists, args=(self.shards_dir, worker, 10))
+                     for worker in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            assert process.exitcode == 0
+
+        names = {task_list["taskListName"] for task_list in TaskMeShardedHandler(self.shards_dir).read_all()}
+        assert names == {f"{worker}-{idx}" for worker in range(4) for idx in range(10)}
+
+
+def _add_task_lists(shards_dir, worker, count):
+    handler = TaskMeShardedHandler(shards_dir, durability=DurabilityPolicy("never"))
+    for idx in range(count):
+        handler.write({"taskListName": f"{worker}-{idx}", "owners": [], "tags": [], "tasks": []})
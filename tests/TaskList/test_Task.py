@@ -1,5 +1,6 @@
 import pytest
 
+from src.Common.utils import NO_DUE_ORDINAL
 from src.TaskList.Task import Task
 
 
@@ -154,3 +155,110 @@ def test_from_dict():
     assert task.priority == "LOW"
     assert task.description == "This is a test task"
     assert task.progress_status == "PENDING"
+
+
+def test_from_dict_canonical_values():
+    task_dict = Task("Billy", "Test Task", "25/10/2023", "LOW", "This is a test task", "PENDING", 4).to_dict()
+    task = Task.from_dict(dict(task_dict, priority="".join(["LO", "W"])))
+    assert task.to_dict() == task_dict
+    assert task.priority is Task.from_dict(task_dict).priority
+
+    with pytest.raises(ValueError, match=r"Invalid priority value."):
+        Task.from_dict(dict(task_dict, priority="URGENT"))
+
+
+def test_from_dict_keeps_invalid_stored_due_date():
+    task_dict = Task("Billy", "Test Task", "25/10/2023", "LOW", "This is a test task", "PENDING", 4).to_dict()
+    task = Task.from_dict(dict(task_dict, due_date="2023-10-25"))
+
+    assert task.due_date == "2023-10-25"
+    assert task.due_ordinal == NO_DUE_ORDINAL
+    assert task.to_dict() == dict(task_dict, due_date="2023-10-25")
+
+    # Once set by the user, the due date is a valid one
+    task.due_date = "26/10/2023"
+    assert task.to_dict() == dict(task_dict, due_date="26/10/2023")
+    with pytest.raises(ValueError, match=r"Invalid due_date format."):
+        task.due_date = "2023-10-26"
+
+
+# -----------------------------------------------------------------------------
+# Task ID Testing
+# -----------------------------------------------------------------------------
+def test_task_id_round_trip():
+    task = Task("Billy", "Test Task", "25/10/2023", "LOW", "This is a test task", "PENDING", 7)
+
+    task_dict = task.to_dict()
+    assert task_dict["id"] == 7
+    assert Task.from_dict(task_dict).task_id == 7
+
+
+def test_task_id_assigned_once():
+    task = Task("Billy", "Test Task", "25/10/2023", "LOW", "This is a test task", "PENDING")
+    assert task.task_id is None
+    assert "id" not in task.to_dict()
+
+    task.task_id = 3
+    with pytest.raises(ValueError, match=r"Task 'Test Task' already has the ID #3."):
+        task.task_id = 4
+
+
+def test_changed_fields():
+    task = Task("Billy", "Test Task", "25/10/2023", "LOW", "This is a test task", "PENDING", 1)
+    assert task.changed_fields == frozenset()
+
+    # Setting the current value isn't a change
+    task.name = "Test Task"
+    task.due_date = "25-10-2023"
+    task.priority = "LOW"
+    assert task.changed_fields == frozenset()
+
+    task.priority = "HIGH"
+    task.progress_status = "COMPLETED"
+    assert task.changed_fields == {"priority", "progress_status"}
+
+    task.mark_clean()
+    assert task.changed_fields == frozenset()
+    assert Task.from_dict(task.to_dict()).changed_fields == frozenset()
+
+
+# -----------------------------------------------------------------------------
+# Task Memory Layout Testing
+# -----------------------------------------------------------------------------
+def test_task_has_no_instance_dict():
+    task = Task("Billy", "Test Task", "25/10/2023", "LOW", "This is a test task", "PENDING")
+    assert not hasattr(task, "__dict__")
+    with pytest.raises(AttributeError):
+        task.unknown_attribute = "value"
+
+
+def test_priority_and_status_values_are_shared():
+    # Values decoded from a data file are distinct string objects
+    low, completed = "".join(["LO", "W"]), "".join(["COMPLE", "TED"])
+    first = Task("Billy", "Task 1", "25/10/2023", low, "", "PENDING")
+    second = Task("Billy", "Task 2", "25/10/2023", "LOW", "", "PENDING")
+    second.progress_status = completed
+
+    assert first.priority is second.priority
+    assert second.progress_status is Task("Billy", "Task 3", "25/10/2023", "LOW", "", completed).progress_status
+
+
+# -----------------------------------------------------------------------------
+# Task Due Date Testing
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize("due_date", ["25/102023", "31/02/2024", "2024-01-01", "aa/bb/cccc", "25/10/23", None])
+def test_init_validates_due_date(due_date):
+    with pytest.raises(ValueError, match=r"Invalid due_date format. Expected format is 'dd/mm/yyyy'."):
+        Task("Billy", "Test Task", due_date, "LOW", "This is a test task", "PENDING")
+
+
+def test_due_date_is_parsed_once():
+    task = Task("Billy", "Test Task", "1-2-2024", "LOW", "This is a test task", "PENDING")
+
+    # Due dates are normalized to dd/mm/yyyy
+    assert task.due_date == "01/02/2024"
+    assert task.to_dict()["due_date"] == "01/02/2024"
+    assert task.due_ordinal == Task("Billy", "Other Task", "01/02/2024", "LOW", "", "PENDING").due_ordinal
+
+    task.due_date = "03/02/2024"
+    assert task.due_ordinal - Task("Billy", "Other Task", "31/01/2024", "LOW", "", "PENDING").due_ordinal == 3
@@ -0,0 +1,119 @@
+import pytest
+
+import src.TaskList.TaskColumnStore as column_store_module
+from src.TaskList.TaskColumnStore import TaskColumnStore, due_date_ordinal, NO_DUE_DATE
+from src.TaskList.TaskList import TaskList
+
+
+def make_task(name, assignee="Bob", due_date="25/10/2023", priority="LOW", status="PENDING", task_id=None):
+    task = {"assignee": assignee, "name": name, "due_date": due_date, "priority": priority,
+            "description": f"{name} description", "progress_status": status}
+    if task_id is not None:
+        task["id"] = task_id
+    return task
+
+
+# -----------------------------------------------------------------------------
+# Fixtures
+# -----------------------------------------------------------------------------
+@pytest.fixture(params=["numpy", "pure-python"])
+def store(request, monkeypatch):
+    # Every test runs against the NumPy and the pure Python implementations
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(column_store_module, "numpy", None)
+
+    return TaskColumnStore.from_task_lists([
+        {"taskListName": "Work", "owners": ["Bob"], "tags": [], "tasks": [
+            make_task("Report", due_date="01/01/2024", priority="HIGH", task_id=1),
+            make_task("Meeting", assignee="Alice", due_date="15/01/2024", status="COMPLETED", task_id=2),
+            make_task("Review", assignee="Alice", due_date="not a date", priority="HIGH", task_id=4)
+        ]},
+        {"taskListName": "Home", "owners": ["Bob"], "tags": [], "tasks": [
+            make_task("Groceries", due_date="10/01/2024", status="IN_PROGRESS")
+        ]},
+        {"taskListName": "Empty", "owners": ["Bob"], "tags": []}
+    ])
+
+
+# -----------------------------------------------------------------------------
+# test_due_date_ordinal
+# -----------------------------------------------------------------------------
+def test_due_date_ordinal():
+    assert due_date_ordinal("02/01/2024") - due_date_ordinal("31/12/2023") == 2
+    assert due_date_ordinal("31/02/2024") == NO_DUE_DATE
+    assert due_date_ordinal("2024-01-01") == NO_DUE_DATE
+    assert due_date_ordinal(None) == NO_DUE_DATE
+
+
+# -----------------------------------------------------------------------------
+# test_row_views
+# -----------------------------------------------------------------------------
+def test_row_views(store):
+    tasks = store.tasks
+
+    assert len(store) == len(tasks) == 4
+    assert [task.name for task in tasks] == ["Report", "Meeting", "Review", "Groceries"]
+    assert (tasks[1].task_list_name, tasks[1].task_id, tasks[1].assignee, tasks[1].progress_status) == \
+           ("Work", 2, "Alice", "COMPLETED")
+    assert tasks[0].to_dict() == make_task("Report", due_date="01/01/2024", priority="HIGH", task_id=1)
+    assert tasks[3].to_dict() == make_task("Groceries", due_date="10/01/2024", status="IN_PROGRESS")
+
+
+def test_invalid_task_is_rejected():
+    with pytest.raises(ValueError, match=r"Invalid task 'Report' in TaskList 'Work'."):
+        TaskColumnStore().extend([make_task("Report", priority="URGENT")], "Work")
+
+
+# -----------------------------------------------------------------------------
+# test_select
+# -----------------------------------------------------------------------------
+def test_select(store):
+    assert [task.name for task in store.select(assignee="Alice")] == ["Meeting", "Review"]
+    assert [task.name for task in store.select(task_list="Work", priority="HIGH")] == ["Report", "Review"]
+    assert [task.name for task in store.select(due_before="12/01/2024")] == ["Report", "Groceries"]
+    assert [task.name for task in store.select()] == ["Report", "Meeting", "Review", "Groceries"]
+
+
+def test_select_unknown_values(store):
+    assert store.select(assignee="Nobody") == []
+    assert store.select(progress_status="UNKNOWN") == []
+    assert TaskColumnStore().select(assignee="Bob") == []
+
+
+# -----------------------------------------------------------------------------
+# test_count_by
+# -----------------------------------------------------------------------------
+def test_count_by(store):
+    assert store.count_by("progress_status") == {"PENDING": 2, "IN_PROGRESS": 1, "COMPLETED": 1}
+    assert store.count_by("priority") == {"LOW": 2, "HIGH": 2}
+    assert store.count_by("assignee") == {"Bob": 2, "Alice": 2}
+    assert store.count_by("task_list") == {"Work": 3, "Home": 1}
+
+
+def test_count_by_with_criteria(store):
+    assert store.count_by("assignee", priority="HIGH") == {"Bob": 1, "Alice": 1}
+    assert store.count_by("progress_status", task_list="Work", due_before="10/01/2024") == {"PENDING": 1}
+    assert store.count_by("priority", assignee="Nobody") == {}
+    assert TaskColumnStore().count_by("priority") == {}
+
+
+def test_count_by_invalid_column(store):
+    with pytest.raises(ValueError, match=r"Invalid group by column."):
+        store.count_by("name")
+
+
+# -----------------------------------------------------------------------------
+# test_task_list_to_column_store
+# -----------------------------------------------------------------------------
+def test_task_list_to_column_store():
+    task_list = TaskList("Work", ["Bob"], [])
+    task_list.add_task(assignee="Bob", name="Report", due_date="01/01/2024", priority="HIGH", description="")
+    task_list.add_task(assignee="Alice", name="Meeting", due_date="15/01/2024", priority="LOW", description="")
+    task_list.remove_task(1)
+
+    store = task_list.to_column_store()
+
+    assert [task.to_dict() for task in store.tasks] == [task.to_dict() for task in task_list.tasks]
+    assert store.count_by("task_list") == {"Work": 1}
@@ -1,4 +1,5 @@
 import pytest
+from datetime import date
 from unittest.mock import patch
 
 from src.TaskList.TaskList import TaskList
@@ -37,6 +38,54 @@ def test_add_task():
     assert tasks[0].description == "This is a test task"
 
 
+# -----------------------------------------------------------------------------
+# test_add_tasks
+# -----------------------------------------------------------------------------
+def test_add_tasks():
+    task_list = TaskList("Test List", ["John"], ["Work"])
+    task_list.add_task(assignee="Billy", name="Task 1", due_date="25/10/2023", priority="LOW", description="")
+    assert task_list.query(priority="HIGH") == []
+
+    tasks = ({"assignee": "Billy", "name": f"Task {number}", "due_date": "24/10/2023", "priority": "HIGH",
+              "description": "", "id": 1} for number in (2, 3))
+    assert task_list.add_tasks(tasks) == range(2, 4)
+    assert task_list.add_tasks([{"assignee": "Bob", "name": "Task 4", "due_date": "01/01/2024", "priority": "LOW",
+                                 "description": "", "progress_status": "COMPLETED"}]) == range(4, 5)
+
+    assert [task.name for task in task_list.tasks] == ["Task 1", "Task 2", "Task 3", "Task 4"]
+    assert task_list.get_task(4).progress_status == "COMPLETED"
+    assert task_list.next_task_id == 5
+
+    # The indexes already built follow
+    assert [task.task_id for task in task_list.query(priority="HIGH")] == [2, 3]
+    assert [task.task_id for task in task_list.query(sort_by="due_date")] == [2, 3, 1, 4]
+
+
+@pytest.mark.parametrize("invalid_task, message", [
+    ({"priority": "URGENT"}, r"Invalid priority values\..* and got \['URGENT'\]"),
+    ({"progress_status": "DONE"}, r"Invalid progress_status values\..* and got \['DONE'\]"),
+    ({"due_date": "2024-01-01"}, r"Task 'Task 2' can't be added: Invalid due_date format"),
+    ({"assignee": None}, r"Task #2 has no assignee\."),
+    ({"name": 12}, r"Task #2 has no name\.")
+])
+def test_add_tasks_is_all_or_nothing(invalid_task, message):
+    task_list = TaskList("Test List", ["John"], ["Work"])
+    task = {"assignee": "Billy", "name": "Task 1", "due_date": "25/10/2023", "priority": "LOW", "description": ""}
+
+    with pytest.raises(ValueError, match=message):
+        task_list.add_tasks([task, {**task, "name": "Task 2", **invalid_task}])
+    assert task_list.tasks == []
+    assert task_list.next_task_id == 1
+
+
+def test_add_tasks_without_description():
+    task_list = TaskList("Test List", ["John"], ["Work"])
+    task_list.add_tasks([{"assignee": "Billy", "name": "Task 1", "due_date": "25/10/2023", "priority": "LOW"}])
+
+    assert task_list.get_task(1).description == ""
+    assert "Task 1" in task_list.render_tasklist()
+
+
 # -----------------------------------------------------------------------------
 # test_remove_task
 # -----------------------------------------------------------------------------
@@ -58,6 +107,24 @@ def test_remove_task():
         task_list.remove_task(1)
 
 
+def test_remove_task_keeps_other_ids():
+    task_list = TaskList("Test List", ["Jean"], ["Work"])
+    for name in ["Task 1", "Task 2", "Task 3"]:
+        task_list.add_task(assignee="Billy", name=name, due_date="25/10/2023", priority="LOW", description="")
+
+    task_list.remove_task(1)
+    task_list.update_task(3, progress_status="COMPLETED")
+
+    assert [task.task_id for task in task_list.tasks] == [2, 3]
+    assert task_list.get_task(3).name == "Task 3"
+    assert task_list.get_task(3).progress_status == "COMPLETED"
+
+    # IDs of removed tasks are never handed out again
+    task_list.remove_task(3)
+    assert task_list.add_task(assignee="Billy", name="Task 4", due_date="25/10/2023", priority="LOW",
+                              description="") == 4
+
+
 # -----------------------------------------------------------------------------
 # test_update_tasklist
 # -----------------------------------------------------------------------------
@@ -124,7 +191,7 @@ def test_update_task_invalid_id():
     }
     task_list.add_task(**kwargs)
 
-    with pytest.raises(ValueError, match=r"Task ID #100 is out of range.") as _:
+    with pytest.raises(ValueError, match=r"Task ID #100 doesn't exist.") as _:
         task_list.update_task(100, **kwargs)
 
 
@@ -166,6 +233,206 @@ def test_update_task_nonexistent_attribute():
         task_list.update_task(1, **kwargs_new)
 
 
+# -----------------------------------------------------------------------------
+# test_due_date_queries
+# -----------------------------------------------------------------------------
+def make_due_task_list(due_dates):
+    task_list = TaskList("Test List", ["Jean"], ["Work"])
+    for idx, due_date in enumerate(due_dates, 1):
+        task_list.add_task(assignee="Billy", name=f"Task {idx}", due_date=due_date, priority="LOW", description="")
+    return task_list
+
+
+def test_tasks_due_before():
+    task_list = make_due_task_list(["15/03/2024", "01/01/2024", "10/02/2024", "01/01/2024"])
+
+    assert [task.task_id for task in task_list.tasks_due_before("10/02/2024")] == [2, 4]
+    assert [task.task_id for task in task_list.tasks_due_between("01/01/2024", "01/03/2024")] == [2, 4, 3]
+    assert [task.task_id for task in task_list.tasks_due_between()] == [2, 4, 3, 1]
+
+
+def test_due_date_index_follows_modifications():
+    task_list = make_due_task_list(["15/03/2024", "01/01/2024", "10/02/2024"])
+    assert [task.task_id for task in task_list.tasks_due_between()] == [2, 3, 1]
+
+    task_list.remove_task(2)
+    task_list.update_task(1, due_date="05/01/2024")
+    task_list.add_task(assignee="Billy", name="Task 4", due_date="01/02/2024", priority="LOW", description="")
+    with pytest.raises(ValueError):
+        task_list.update_task(3, due_date="20/01/2024", nonexistent_attribute="value")
+
+    assert [task.task_id for task in task_list.tasks_due_between()] == [1, 3, 4]
+    assert [task.task_id for task in TaskList.from_dict(task_list.to_dict()).tasks_due_between()] == [1, 3, 4]
+
+
+def test_overdue_tasks():
+    task_list = make_due_task_list(["15/03/2024", "01/01/2024", "10/02/2024"])
+    task_list.update_task(2, progress_status="COMPLETED")
+
+    assert [task.task_id for task in task_list.overdue_tasks(today=date(2024, 3, 1))] == [3]
+    assert [task.task_id for task in task_list.overdue_tasks(today=date(2024, 1, 1))] == []
+
+
+def test_due_date_query_invalid_date():
+    task_list = make_due_task_list(["15/03/2024"])
+
+    with pytest.raises(ValueError, match=r"Invalid due_date format."):
+        task_list.tasks_due_before("2024-03-15")
+
+
+# -----------------------------------------------------------------------------
+# test_query
+# -----------------------------------------------------------------------------
+def make_query_task_list():
+    task_list = TaskList("Test List", ["Jean"], ["Work"])
+    for assignee, due_date, priority in [("Billy", "15/03/2024", "LOW"), ("Jean", "01/01/2024", "HIGH"),
+                                         ("Billy", "10/02/2024", "HIGH"), ("Paul", "01/02/2024", "MEDIUM"),
+                                         ("Billy", "05/01/2024", "HIGH")]:
+        task_list.add_task(assignee=assignee, name=f"Task {assignee}", due_date=due_date, priority=priority,
+                           description="")
+    return task_list
+
+
+def query_ids(task_list, **kwargs):
+    return [task.task_id for task in task_list.query(**kwargs)]
+
+
+def test_query_filters():
+    task_list = make_query_task_list()
+
+    assert query_ids(task_list) == [1, 2, 3, 4, 5]
+    assert query_ids(task_list, assignee="Billy") == [1, 3, 5]
+    assert query_ids(task_list, assignee="Billy", priority="HIGH") == [3, 5]
+    assert query_ids(task_list, assignee="Nobody") == []
+    assert query_ids(task_list, progress_status="COMPLETED") == []
+
+
+def test_query_due_date_range():
+    task_list = make_query_task_list()
+
+    assert query_ids(task_list, due_from="05/01/2024", due_before="10/02/2024") == [4, 5]
+    assert query_ids(task_list, due_from="05/01/2024", sort_by="due_date") == [5, 4, 3, 1]
+    assert query_ids(task_list, priority="HIGH", due_before="10/02/2024") == [2, 5]
+    assert query_ids(task_list, due_from="10/02/2024", due_before="05/01/2024") == []
+
+
+def test_query_sort_and_paginate():
+    task_list = make_query_task_list()
+
+    assert query_ids(task_list, sort_by="priority", descending=True) == [5, 3, 2, 4, 1]
+    assert query_ids(task_list, sort_by="due_date", limit=2) == [2, 5]
+    assert query_ids(task_list, sort_by="due_date", descending=True, limit=2, offset=1) == [3, 4]
+    assert query_ids(task_list, limit=2, offset=2) == [3, 4]
+    assert query_ids(task_list, assignee="Billy", sort_by="name", limit=0) == []
+
+
+def test_query_indexes_follow_modifications():
+    task_list = make_query_task_list()
+    assert query_ids(task_list, assignee="Billy") == [1, 3, 5]
+
+    task_list.update_task(1, assignee="Paul", progress_status="COMPLETED")
+    task_list.remove_task(3)
+    task_list.add_task(assignee="Billy", name="Task 6", due_date="01/01/2025", priority="HIGH", description="")
+
+    assert query_ids(task_list, assignee="Billy") == [5, 6]
+    assert query_ids(task_list, assignee="Paul", progress_status="COMPLETED") == [1]
+    assert query_ids(task_list, priority="HIGH", progress_status="PENDING") == [2, 5, 6]
+
+
+def test_query_legacy_task_order():
+    task = Task("Billy", "Test Task", "25/10/2023", "LOW", "This is a test task", "PENDING")
+    task_list = TaskList.from_dict({
+        "taskListName": "Test List",
+        "owners": ["Jean"],
+        "tags": ["Work"],
+        "tasks": [Task.to_dict(task), dict(Task.to_dict(task), id=1)]
+    })
+
+    assert [task.task_id for task in task_list.tasks] == [2, 1]
+    assert query_ids(task_list, limit=1) == [1]
+
+
+def test_query_invalid_arguments():
+    task_list = make_query_task_list()
+
+    with pytest.raises(ValueError, match=r"Invalid sort key."):
+        task_list.query(sort_by="description")
+    with pytest.raises(ValueError, match=r"Query limit and offset must be positive."):
+        task_list.query(limit=-1)
+    with pytest.raises(ValueError, match=r"Invalid due_date format."):
+        task_list.query(due_from="2024-01-01")
+
+
+def test_tasks_with_invalid_stored_due_date():
+    task = dict(Task("Billy", "Test Task", "25/10/2023", "LOW", "", "PENDING").to_dict(), id=1)
+    data = {"taskListName": "Test List", "owners": ["Jean"], "tags": [],
+            "tasks": [dict(task, due_date="2024-01-01"), dict(task, id=2)]}
+    task_list = TaskList.from_dict(data)
+
+    assert "2024-01-01" in task_list.render_tasklist()
+    assert task_list.to_dict()["tasks"] == [dict(task, due_date="2024-01-01"), dict(task, id=2)]
+
+    # Never due before a date, sorted after every dated task
+    assert [task.task_id for task in task_list.tasks_due_between(start="01/01/2000")] == [2]
+    assert [task.task_id for task in task_list.overdue_tasks(date(2030, 1, 1))] == [2]
+    assert query_ids(task_list, due_from="01/01/2000") == [2]
+    assert query_ids(task_list, priority="LOW", due_from="01/01/2000") == [2]
+    assert query_ids(task_list, sort_by="due_date") == [2, 1]
+    assert task_list.to_column_store().count_by("assignee") == {"Billy": 2}
+    assert task_list.to_column_store().count_by("assignee", due_before="01/01/2030") == {"Billy": 1}
+
+
+# -----------------------------------------------------------------------------
+# test_render_tasklist
+# -----------------------------------------------------------------------------
+def test_render_tasklist():
+    task_list = make_query_task_list()
+    task_list.update_task(2, name="A much longer task name")
+
+    lines = task_list.render_tasklist().splitlines()
+    assert lines[2:5] == ["Todo List: Test List", "Owner(s): Jean", "Tag(s): Work"]
+    assert lines[6] == "ID  Task                     Status   Assignee  Due date    Priority"
+    assert lines[8] == "1   Task Billy               PENDING  Billy     15/03/2024  LOW"
+    assert lines[9] == "2   A much longer task name  PENDING  Jean      01/01/2024  HIGH"
+    assert len(lines) == 14
+    assert lines[1] == lines[-1] == "-" * len(lines[6])
+
+
+def test_render_tasklist_pages():
+    task_list = make_query_task_list()
+
+    def rendered_ids(*args, **kwargs):
+        lines = task_list.render_tasklist(*args, **kwargs).splitlines()
+        header = next(number for number, line in enumerate(lines) if line.startswith("ID "))
+        return [int(line.split()[0]) for line in lines[header + 2:-1]]
+
+    assert rendered_ids(limit=2, page=2) == [3, 4]
+    assert rendered_ids(limit=2, page=4) == []
+    assert rendered_ids(sort_by="due_date", limit=3) == [2, 5, 4]
+    assert rendered_ids(task_list.query(priority="HIGH"), sort_by="name", limit=2, page=2) == [2]
+    assert "Page 2/3 - 5 task(s)" in task_list.render_tasklist(limit=2, page=2)
+
+    with pytest.raises(ValueError, match=r"Display page and limit must be positive."):
+        task_list.render_tasklist(page=0)
+    with pytest.raises(ValueError, match=r"Invalid sort key."):
+        task_list.render_tasklist(task_list.tasks, sort_by="description")
+
+
+def test_render_tasklist_only_builds_displayed_tasks():
+    task = dict(Task("Billy", "Test Task", "25/10/2023", "LOW", "", "PENDING").to_dict(), id=1)
+    task_list = TaskList.from_dict({"taskListName": "Test List", "owners": ["Jean"], "tags": [],
+                                    "tasks": [task, dict(task, id=2, priority="WRONG")]})
+
+    assert "Test Task" in task_list.render_tasklist(limit=1)
+    with pytest.raises(ValueError, match=r"Invalid priority value."):
+        task_list.render_tasklist(limit=1, page=2)
+
+    # Skipped pages aren't built either
+    task_list = TaskList.from_dict({"taskListName": "Test List", "owners": ["Jean"], "tags": [],
+                                    "tasks": [dict(task, id=1, priority="WRONG"), dict(task, id=2)]})
+    assert "Test Task" in task_list.render_tasklist(limit=1, page=2)
+
+
 # -----------------------------------------------------------------------------
 # test_to_dict
 # -----------------------------------------------------------------------------
@@ -190,6 +457,62 @@ def test_to_dict():
     assert task_list_dict["tasks"][0]["priority"] == "LOW"
     assert task_list_dict["tasks"][0]["description"] == "This is a test task"
     assert task_list_dict["tasks"][0]["progress_status"] == "PENDING"
+    assert task_list_dict["tasks"][0]["id"] == 1
+    assert task_list_dict["nextTaskId"] == 2
+
+
+# -----------------------------------------------------------------------------
+# test_get_delta
+# -----------------------------------------------------------------------------
+def test_get_delta():
+    task_list = TaskList("Test List", ["Jean"], ["Work"])
+    for name in ["Task 1", "Task 2", "Task 3"]:
+        task_list.add_task(assignee="Billy", name=name, due_date="25/10/2023", priority="LOW", description="")
+
+    # Never saved: written in full
+    assert task_list.has_changes
+    assert task_list.get_delta() is None
+
+    task_list = TaskList.from_dict(task_list.to_dict())
+    assert not task_list.has_changes
+
+    # Updates with the current values aren't changes
+    task_list.update_task(1, name="Task 1", priority="LOW")
+    task_list.update_tasklist(owners=["Jean"])
+    assert not task_list.has_changes
+
+    task_list.update_task(1, priority="HIGH")
+    task_list.remove_task(2)
+    task_list.add_task(assignee="Billy", name="Task 4", due_date="25/10/2023", priority="LOW", description="")
+    task_list.add_task(assignee="Billy", name="Task 5", due_date="25/10/2023", priority="LOW", description="")
+    task_list.remove_task(5)
+    task_list.update_task(4, description="New")
+    task_list.tags = ["Personal"]
+
+    assert task_list.has_changes
+    assert task_list.get_delta() == {
+        "taskListName": "Test List",
+        "fields": {"tags": ["Personal"], "nextTaskId": 6},
+        "addedTasks": [{"assignee": "Billy", "name": "Task 4", "due_date": "25/10/2023", "priority": "LOW",
+                        "description": "New", "progress_status": "PENDING", "id": 4}],
+        "updatedTasks": [{"priority": "HIGH", "id": 1}],
+        "removedTaskIds": [2]
+    }
+
+    task_list.mark_clean()
+    assert not task_list.has_changes
+    assert task_list.get_delta() == {"taskListName": "Test List", "fields": {}, "addedTasks": [], "updatedTasks": [],
+                                     "removedTaskIds": []}
+
+
+def test_get_delta_of_legacy_task_list():
+    task = Task("Billy", "Test Task", "25/10/2023", "LOW", "This is a test task", "PENDING")
+    task_list = TaskList.from_dict({"taskListName": "Test List", "owners": ["Jean"], "tags": [],
+                                    "tasks": [Task.to_dict(task)]})
+
+    # The assigned IDs aren't stored yet
+    assert task_list.has_changes
+    assert task_list.get_delta() is None
 
 
 # -----------------------------------------------------------------------------
@@ -215,6 +538,78 @@ def test_from_dict():
     assert task_list.tasks[0].progress_status == "PENDING"
 
 
+def test_from_dict_keeps_task_ids():
+    task_list = TaskList("Test List", ["Jean"], ["Work"])
+    for name in ["Task 1", "Task 2", "Task 3"]:
+        task_list.add_task(assignee="Billy", name=name, due_date="25/10/2023", priority="LOW", description="")
+    task_list.remove_task(3)
+    task_list.remove_task(1)
+
+    loaded = TaskList.from_dict(task_list.to_dict())
+    assert [task.task_id for task in loaded.tasks] == [2]
+    assert loaded.next_task_id == 4
+
+
+def test_from_dict_assigns_ids_to_legacy_tasks():
+    task = Task("Billy", "Test Task", "25/10/2023", "LOW", "This is a test task", "PENDING")
+    task_list_dict = {
+        "taskListName": "Test List",
+        "owners": ["Jean"],
+        "tags": ["Work"],
+        "tasks": [Task.to_dict(task), dict(Task.to_dict(task), id=1), Task.to_dict(task)]
+    }
+
+    task_list = TaskList.from_dict(task_list_dict)
+    assert [task.task_id for task in task_list.tasks] == [2, 1, 3]
+    assert task_list.next_task_id == 4
+
+
+def test_from_dict_builds_tasks_on_access():
+    task = Task("Billy", "Test Task", "25/10/2023", "LOW", "This is a test task", "PENDING")
+    task_list_dict = {
+        "taskListName": "Test List",
+        "owners": ["Jean"],
+        "tags": ["Work"],
+        "tasks": [Task.to_dict(task), dict(Task.to_dict(task), priority="URGENT")]
+    }
+
+    # The invalid task only gets validated once accessed
+    task_list = TaskList.from_dict(task_list_dict)
+    with patch('src.TaskList.TaskList.Task.from_dict', wraps=Task.from_dict) as from_dict:
+        assert task_list.get_task(1).name == "Test Task"
+        assert task_list.get_task(1).task_id == 1
+        assert from_dict.call_count == 1
+
+    with pytest.raises(ValueError, match=r"Invalid priority value."):
+        task_list.get_task(2)
+
+
+def test_to_dict_outputs_tasks_never_accessed_as_they_are():
+    task_list = TaskList("Test List", ["Jean"], ["Work"])
+    task_list.add_task(assignee="Billy", name="Test Task", due_date="25/10/2023", priority="LOW", description="")
+    task_list_dict = task_list.to_dict()
+
+    with patch('src.TaskList.TaskList.Task.from_dict') as from_dict:
+        assert TaskList.from_dict(task_list_dict).to_dict() == task_list_dict
+        from_dict.assert_not_called()
+
+    # Markers written by older versions are ignored
+    assert TaskList.from_dict(dict(task_list_dict, validated=True)).to_dict() == task_list_dict
+
+
+def test_from_dict_with_duplicated_task_ids():
+    task = Task("Billy", "Test Task", "25/10/2023", "LOW", "This is a test task", "PENDING", 1)
+    task_list_dict = {
+        "taskListName": "Test List",
+        "owners": ["Jean"],
+        "tags": ["Work"],
+        "tasks": [Task.to_dict(task), Task.to_dict(task)]
+    }
+
+    with pytest.raises(ValueError, match=r"Task ID #1 is already used."):
+        TaskList.from_dict(task_list_dict)
+
+
 def test_from_dict_with_invalid_task_object():
     # Create a valid TaskList object
     task_list_dict = {
@@ -224,7 +619,8 @@ def test_from_dict_with_invalid_task_object():
         "tasks": [{"dummy": "This is not a valid Task object"}]
     }
 
-    # Mock the Task.from_dict method to return an invalid object
+    # Mock the Task.from_dict method to return an invalid object, tasks are only built on access
     with patch('src.TaskList.TaskList.Task.from_dict', return_value="Invalid object"):
+        task_list = TaskList.from_dict(task_list_dict)
         with pytest.raises(ValueError, match=r"Expected a Task object.") as _:
-            TaskList.from_dict(task_list_dict)
+            task_list.get_task(1)
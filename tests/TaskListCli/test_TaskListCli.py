@@ -1,9 +1,15 @@
 # flake8: noqa: F405
 
+import json
+from argparse import Namespace
+
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 
+from src.System.TaskMeFileHandler.TaskMeFileHandler import TaskMeFileHandler
+from src.System.TaskMeJournalHandler.TaskMeJournalHandler import TaskMeJournalHandler
 from src.TaskListCLi.TaskListCli import *
+from src.TaskListCLi.TaskListParser import setup_parser
 
 # Initializing Cli Commands for help throughout the tests
 COMMANDS = initialize_commands()
@@ -127,7 +133,7 @@ def test_update_task_list():
             update_task_list(args, mock_file_handler)
 
         mock_logger.info.assert_called_with(f"Task list '{args.task_list_name}' updated and saved")
-        mock_file_handler.write.assert_called_once()
+        mock_file_handler.write_delta.assert_called_once_with(mock_sanity.return_value.get_delta())
 
 
 def test_update_task_list_failure():
@@ -225,10 +231,77 @@ def test_update_task_success():
             assert called_kwargs['priority'] == mock_args.priority
             assert called_kwargs['description'] == mock_args.description
             assert called_kwargs['progress_status'] == mock_args.progress_status
-            mock_file_handler.write.assert_called_once_with(mock_task_list.to_dict())
+            mock_file_handler.write_delta.assert_called_once_with(mock_task_list.get_delta())
             mock_logger.info.assert_called_with(f"Task '{mock_args.name}' updated and saved")
 
 
+def test_update_task_writes_changes_only(tmp_path):
+    file_handler = TaskMeJournalHandler(tmp_path / "taskme.json", tmp_path / "taskme.journal")
+    task_list = TaskList("Work", ["Bob"], [])
+    task_list.add_task(assignee="Bob", name="Task", due_date="01/01/2024", priority="LOW", description="")
+    file_handler.write(task_list.to_dict())
+
+    args = Namespace(task_list_name="Work", task_id=1, assignee=None, name="Task", due_date=None, priority="LOW",
+                     description=None, progress_status=None)
+    with patch.object(file_handler, "write_delta", wraps=file_handler.write_delta) as spy_write_delta:
+        with patch.object(file_handler, "write") as mock_write:
+            # Same values: nothing to write
+            update_task(args, file_handler)
+            spy_write_delta.assert_not_called()
+
+            args.priority = "HIGH"
+            update_task(args, file_handler)
+            mock_write.assert_not_called()
+
+    assert spy_write_delta.call_args[0][0]["updatedTasks"] == [{"priority": "HIGH", "id": 1}]
+    assert file_handler.read("Work")["tasks"][0]["priority"] == "HIGH"
+
+
+def test_update_task_without_delta_support(tmp_path):
+    file_handler = TaskMeFileHandler(tmp_path / "taskme.json")
+    task_list = TaskList("Work", ["Bob"], [])
+    task_list.add_task(assignee="Bob", name="Task", due_date="01/01/2024", priority="LOW", description="")
+    file_handler.write(task_list.to_dict())
+
+    args = Namespace(task_list_name="Work", task_id=1, assignee=None, name="Task", due_date=None, priority="LOW",
+                     description=None, progress_status=None)
+    with patch.object(file_handler, "write", wraps=file_handler.write) as spy_write:
+        # Same values: nothing to write
+        update_task(args, file_handler)
+        spy_write.assert_not_called()
+
+        # The JSON data file is rewritten as a whole anyway, the full task list is written
+        args.priority = "HIGH"
+        update_task(args, file_handler)
+        spy_write.assert_called_once()
+
+    assert file_handler.read("Work")["tasks"][0]["priority"] == "HIGH"
+
+
+def test_import_tasks(tmp_path):
+    file_handler = TaskMeFileHandler(tmp_path / "taskme.json")
+    file_handler.write(TaskList("Work", ["Bob"], []).to_dict())
+    tasks = [{"assignee": "Bob", "name": f"Task {number}", "due_date": "01/01/2024", "priority": "LOW",
+              "description": ""} for number in range(3)]
+    input_file = tmp_path / "tasks.json"
+    input_file.write_text(json.dumps(tasks))
+
+    args = setup_parser(["importtasks"]).parse_args(["importtasks", "Work", str(input_file)])
+    with patch.object(file_handler, "write", wraps=file_handler.write) as spy_write:
+        import_tasks(args, file_handler)
+    spy_write.assert_called_once()
+    assert [task["id"] for task in file_handler.read("Work")["tasks"]] == [1, 2, 3]
+
+    # A task list object is accepted as well
+    input_file.write_text(json.dumps({"taskListName": "Other", "tasks": tasks[:1]}))
+    import_tasks(args, file_handler)
+    assert len(file_handler.read("Work")["tasks"]) == 4
+
+    input_file.write_text(json.dumps({"taskListName": "Other"}))
+    with pytest.raises(Exception, match="No tasks found in"):
+        import_tasks(args, file_handler)
+
+
 def test_update_task_failure():
     mock_file_handler = Mock()
     mock_args = Mock()
@@ -293,6 +366,50 @@ def test_display_task_list():
         mock_task_list.display_tasklist.assert_called_once()
 
 
+@pytest.mark.parametrize("overdue, due_before, query", [(True, None, "overdue_tasks"),
+                                                       (False, "01/01/2024", "tasks_due_before")])
+def test_display_task_list_due_queries(overdue, due_before, query):
+    with patch("src.TaskListCLi.TaskListCli.task_list_sanity_check") as mock_sanity:
+        mock_task_list = Mock()
+        mock_sanity.return_value = mock_task_list
+
+        args = Namespace(task_list_name="TestTaskList", overdue=overdue, due_before=due_before, sort=None, page=None,
+                         limit=None)
+        display_task_list(args, Mock())
+
+        mock_task_list.display_tasklist.assert_called_once_with(getattr(mock_task_list, query).return_value,
+                                                                sort_by=None, limit=None, page=1)
+
+
+@pytest.mark.parametrize("options, limit, page", [(["--page", "3"], DISPLAY_PAGE_SIZE, 3),
+                                                  (["--page", "2", "--limit", "10"], 10, 2),
+                                                  (["--limit", "10"], 10, 1)])
+def test_display_task_list_pages(options, limit, page):
+    with patch("src.TaskListCLi.TaskListCli.task_list_sanity_check") as mock_sanity:
+        mock_task_list = Mock()
+        mock_sanity.return_value = mock_task_list
+
+        args = setup_parser(["display"]).parse_args(["display", "TestTaskList", "--sort", "name", *options])
+        display_task_list(args, Mock())
+
+        mock_task_list.display_tasklist.assert_called_once_with(None, sort_by="name", limit=limit, page=page)
+
+
+def test_query_tasks():
+    with patch("src.TaskListCLi.TaskListCli.task_list_sanity_check") as mock_sanity:
+        mock_task_list = Mock()
+        mock_sanity.return_value = mock_task_list
+
+        args = setup_parser(["query"]).parse_args(["query", "TestTaskList", "--assignee", "Bob", "--status", "PENDING",
+                                                   "--sort", "due_date", "--desc", "--limit", "10"])
+        query_tasks(args, Mock())
+
+        mock_task_list.query.assert_called_once_with(assignee="Bob", priority=None, progress_status="PENDING",
+                                                     due_from=None, due_before=None, sort_by="due_date",
+                                                     descending=True, limit=10, offset=0)
+        mock_task_list.display_tasklist.assert_called_once_with(mock_task_list.query.return_value)
+
+
 def test_display_task_list_failure():
     mock_file_handler = Mock()
 
@@ -337,3 +454,110 @@ def test_display_task_description_failure():
         # Assert that calling display_task_description raises the expected exception
         with pytest.raises(Exception, match="Task list 'NonExistentTaskList' not found"):
             display_task_description(args, mock_file_handler)
+
+
+# -----------------------------------------------------------------------------
+# test_export_task_lists
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize('pretty', [True, False])
+def test_export_task_lists(tmp_path, pretty):
+    task_lists = [{"taskListName": "TestTaskList", "owners": ["Owner1"], "tags": [], "tasks": []}]
+    mock_file_handler = Mock()
+    mock_file_handler.iter_task_lists.return_value = iter(task_lists)
+
+    args = Mock()
+    args.output_file = str(tmp_path / "export.json")
+    args.pretty = pretty
+    args.format = None
+
+    export_task_lists(args, mock_file_handler)
+
+    with open(args.output_file) as file:
+        content = file.read()
+    assert json.loads(content) == {"taskLists": task_lists}
+    assert ("\n" in content) == pretty
+
+
+# -----------------------------------------------------------------------------
+# test_import_task_data
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize('data_format', ["jsonl", "csv"])
+def test_export_and_import_task_data(tmp_path, data_format):
+    file_handler = TaskMeFileHandler(tmp_path / "taskme.json")
+    for task_list_name, assignee in [("Work", "Bob"), ("Home", "Alice")]:
+        task_list = TaskList(task_list_name, [assignee], ["tag"])
+        task_list.add_tasks([{"assignee": assignee, "name": f"Task {number}", "due_date": "01/01/2024",
+                              "priority": "LOW", "description": "", "progress_status": "COMPLETED"}
+                             for number in range(3)])
+        file_handler.write(task_list.to_dict())
+
+    parser = setup_parser(["export", "import"])
+    export_file = tmp_path / f"export.{data_format}"
+    export_task_lists(parser.parse_args(["export", str(export_file)]), file_handler)
+
+    # Imported into a new storage: JSON lines describe the task lists, CSV files need them to exist
+    other_file_handler = TaskMeFileHandler(tmp_path / "other.json")
+    if data_format == "csv":
+        other_file_handler.write(TaskList("Work", ["Bob"], ["tag"]).to_dict())
+        other_file_handler.write(TaskList("Home", ["Alice"], ["tag"]).to_dict())
+    import_task_data(parser.parse_args(["import", str(export_file)]), other_file_handler)
+
+    task_lists = file_handler.read_all()
+    assert other_file_handler.read_all() == task_lists
+
+    # Importing the same file again adds the tasks again, with new IDs
+    import_task_data(parser.parse_args(["import", str(export_file), "--list", "Work"]), file_handler)
+    assert [task["id"] for task in file_handler.read("Work")["tasks"]] == list(range(1, 10))
+
+
+def test_import_task_data_into_missing_task_list(tmp_path):
+    file_handler = TaskMeFileHandler(tmp_path / "taskme.json")
+    input_file = tmp_path / "tasks.csv"
+    input_file.write_text("task_list,name,assignee,due_date,priority,description\nWork,Task,Bob,01/01/2024,LOW,\n")
+
+    args = setup_parser(["import"]).parse_args(["import", str(input_file)])
+    with pytest.raises(Exception, match="Task list 'Work' not found"):
+        import_task_data(args, file_handler)
+
+
+# -----------------------------------------------------------------------------
+# test_report_tasks
+# -----------------------------------------------------------------------------
+def test_report_tasks(capsys):
+    tasks = [{"assignee": assignee, "name": "Task", "due_date": "01/01/2024", "priority": "LOW",
+              "description": "", "progress_status": status}
+             for assignee, status in [("Bob", "PENDING"), ("Alice", "PENDING"), ("Bob", "COMPLETED")]]
+    mock_file_handler = Mock()
+    mock_file_handler.read_all.return_value = [{"taskListName": "Work", "owners": ["Bob"], "tags": [], "tasks": tasks}]
+
+    args = Namespace(by=["status", "assignee"], report_task_list=None, assignee=None, priority=None,
+                     status=None, due_before=None)
+    report_tasks(args, mock_file_handler)
+    output = capsys.readouterr().out
+
+    assert "Tasks by status: 3" in output
+    assert [line.split() for line in output.splitlines() if line.startswith(("PENDING", "Bob"))] == \
+           [["PENDING", "2"], ["Bob", "2"]]
+
+    args.assignee = "Alice"
+    report_tasks(args, mock_file_handler)
+    assert "Tasks by assignee: 1" in capsys.readouterr().out
+
+
+# -----------------------------------------------------------------------------
+# test_search_tasks
+# -----------------------------------------------------------------------------
+def test_search_tasks(tmp_path, capsys):
+    file_handler = TaskMeFileHandler(tmp_path / "taskme.json")
+    for task_list_name, assignee in [("Work", "Bob"), ("Home", "Alice")]:
+        task_list = TaskList(task_list_name, [assignee], [])
+        task_list.add_task(assignee=assignee, name="Buy milk", due_date="01/01/2024", priority="LOW",
+                           description="")
+        file_handler.write(task_list.to_dict())
+
+    args = setup_parser(["search"]).parse_args(["search", "milk", "--assignee", "alice"])
+    search_tasks(args, file_handler)
+    output = capsys.readouterr().out
+
+    assert "1 matching task(s)" in output
+    assert [line.split()[:2] for line in output.splitlines() if "Buy milk" in line] == [["1", "Home"]]
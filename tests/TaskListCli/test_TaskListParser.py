@@ -0,0 +1,44 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.TaskListCLi.TaskListCli import initialize_commands
+from src.TaskListCLi.TaskListParser import initialize_command_parsers, setup_parser
+
+
+# -----------------------------------------------------------------------------
+# test_setup_parser
+# -----------------------------------------------------------------------------
+def test_every_command_has_a_parser():
+    assert set(initialize_command_parsers()) == set(initialize_commands())
+
+
+def test_setup_parser_builds_all_commands():
+    parser = setup_parser()
+
+    args = parser.parse_args(["rmtask", "My tasks", "5"])
+    assert (args.subcommand, args.task_list_name, args.task_id) == ("rmtask", "My tasks", 5)
+
+
+def test_setup_parser_builds_requested_commands_only():
+    parser = setup_parser(["display"])
+
+    assert parser.parse_args(["display", "My tasks"]).task_list_name == "My tasks"
+    with pytest.raises(SystemExit):
+        parser.parse_args(["rmtask", "My tasks", "5"])
+
+
+def test_setup_parser_only_imports_lightweight_modules():
+    # Run in a new interpreter, the modules of this one are already imported
+    code = ("import sys; from src.TaskListCLi.TaskListParser import setup_parser, setup_runner_parser;"
+            " setup_parser(); setup_runner_parser();"
+            " print(' '.join(name for name in sys.modules if name.startswith('src.')))")
+    modules = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).resolve().parents[2], check=True,
+                             capture_output=True, text=True).stdout.split()
+
+    assert "src.TaskListCLi.TaskListParser" in modules
+    for module in ["src.TaskList.TaskList", "src.TaskListCLi.TaskMeTransfer", "src.System.FileLock.FileLock",
+                   "src.System.DurabilityPolicy.DurabilityPolicy", "src.System.TaskMeFileHandler.TaskMeFileHandler"]:
+        assert module not in modules
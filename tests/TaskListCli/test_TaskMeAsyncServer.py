@@ -0,0 +1,240 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.TaskListCLi import TaskMeAsyncServer as async_server_module
+
+from src.System.TaskMeShardedHandler.TaskMeShardedHandler import TaskMeShardedHandler
+from src.TaskListCLi.TaskMeAsyncServer import TaskMeAsyncServer
+
+
+class SlowShardedHandler(TaskMeShardedHandler):
+    """Sharded storage whose writes take a while, like a slow fsync."""
+
+    def __init__(self, shards_dir, delay):
+        super().__init__(shards_dir)
+        self.delay = delay
+        self.writing = threading.Event()
+
+    def write(self, task_list_dict):
+        self.writing.set()
+        time.sleep(self.delay)
+        super().write(task_list_dict)
+
+
+def addtask(task_list_name, name):
+    return ["addtask", task_list_name, "Bob", name, "01/01/2024", "LOW", ""]
+
+
+class TestTaskMeAsyncServer:
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, tmp_path):
+        self.file_handler = SlowShardedHandler(tmp_path / "shards", delay=0)
+        self.socket_path = tmp_path / "taskme.sock"
+
+    def run(self, scenario):
+        async def run_server():
+            server = TaskMeAsyncServer(self.file_handler, self.socket_path)
+            try:
+                return await scenario(server)
+            finally:
+                await server.close()
+        return asyncio.run(run_server())
+
+    # -----------------------------------------------------------------------------
+    # test_execute
+    # -----------------------------------------------------------------------------
+    def test_execute_writes_through(self):
+        async def scenario(server):
+            assert await server.execute(["create", "My tasks", "Bob"]) == (True, "")
+            assert (await server.execute(addtask("My tasks", "Buy milk")))[0]
+            return await server.execute(["display", "My tasks"])
+
+        ok, output = self.run(scenario)
+
+        assert ok and "Buy milk" in output
+        assert [task["name"] for task in self.file_handler.read("My tasks")["tasks"]] == ["Buy milk"]
+
+    def test_execute_invalid_and_failed_commands(self):
+        async def scenario(server):
+            return (await server.execute(["rmtask", "My tasks", "not-an-id"]),
+                    await server.execute(["rmtask", "Missing", "1"]))
+
+        (invalid_ok, invalid_output), (failed_ok, failed_output) = self.run(scenario)
+
+        assert not invalid_ok and "invalid int value" in invalid_output
+        assert not failed_ok and "Failed to execute command rmtask" in failed_output
+
+    def test_export(self, tmp_path):
+        async def scenario(server):
+            await server.execute(["create", "My tasks", "Bob"])
+            return await server.execute(["export", str(tmp_path / "export.json")])
+
+        assert self.run(scenario) == (True, "")
+        with open(tmp_path / "export.json") as file:
+            assert [task_list["taskListName"] for task_list in json.load(file)["taskLists"]] == ["My tasks"]
+
+    def test_report_output_is_captured(self):
+        async def scenario(server):
+            await server.execute(["create", "My tasks", "Bob"])
+            await server.execute(addtask("My tasks", "Buy milk"))
+            return await server.execute(["report", "--by", "assignee"])
+
+        ok, output = self.run(scenario)
+
+        assert ok and "Tasks by assignee: 1" in output
+
+    # -----------------------------------------------------------------------------
+    # test_concurrency
+    # -----------------------------------------------------------------------------
+    def test_independent_task_lists_are_written_in_parallel(self):
+        names = [f"List {idx}" for idx in range(4)]
+
+        async def scenario(server):
+            await asyncio.gather(*(server.execute(["create", name, "Bob"]) for name in names))
+            self.file_handler.delay = 0.2
+            start = time.monotonic()
+            results = await asyncio.gather(*(server.execute(addtask(name, "Task")) for name in names))
+            return results, time.monotonic() - start
+
+        results, elapsed = self.run(scenario)
+
+        assert all(ok for ok, _ in results)
+        assert elapsed < 0.6
+        assert all(len(self.file_handler.read(name)["tasks"]) == 1 for name in names)
+
+    def test_modifications_of_a_task_list_are_queued_in_order(self):
+        async def scenario(server):
+            await server.execute(["create", "My tasks", "Bob"])
+            self.file_handler.delay = 0.01
+            return await asyncio.gather(*(server.execute(addtask("My tasks", f"Task {idx}")) for idx in range(10)))
+
+        assert all(ok for ok, _ in self.run(scenario))
+        assert [task["name"] for task in self.file_handler.read("My tasks")["tasks"]] == \
+               [f"Task {idx}" for idx in range(10)]
+
+    def test_reads_dont_wait_for_writes(self):
+        async def scenario(server):
+            await server.execute(["create", "My tasks", "Bob"])
+            self.file_handler.delay = 0.5
+            self.file_handler.writing.clear()
+            write = asyncio.ensure_future(server.execute(addtask("My tasks", "Slow")))
+            while not self.file_handler.writing.is_set():
+                await asyncio.sleep(0.01)
+
+            start = time.monotonic()
+            ok, _ = await server.execute(["display", "My tasks"])
+            elapsed = time.monotonic() - start
+            await write
+            return ok, elapsed
+
+        ok, elapsed = self.run(scenario)
+
+        assert ok
+        assert elapsed < 0.25
+
+    def test_slow_commands_dont_block_the_event_loop(self):
+        handle_command = async_server_module.handle_command
+
+        def slow_handle_command(args, file_handler):
+            if args.task_list_name == "Big list":
+                time.sleep(0.5)
+            return handle_command(args, file_handler)
+
+        async def scenario(server):
+            await server.execute(["create", "Big list", "Bob"])
+            await server.execute(["create", "My tasks", "Bob"])
+            with patch.object(async_server_module, "handle_command", slow_handle_command):
+                start = time.monotonic()
+                slow_read = asyncio.ensure_future(server.execute(["display", "Big list"]))
+                slow_write = asyncio.ensure_future(server.execute(addtask("Big list", "Slow")))
+                await asyncio.sleep(0.05)
+                results = [await server.execute(addtask("My tasks", "Fast")),
+                           await server.execute(["display", "My tasks"])]
+                elapsed = time.monotonic() - start
+                results += [await slow_read, await slow_write]
+            return results, elapsed
+
+        results, elapsed = self.run(scenario)
+
+        assert all(ok for ok, _ in results)
+        assert elapsed < 0.25
+
+    def test_task_list_locks_are_dropped_once_unused(self):
+        async def scenario(server):
+            await server.execute(["create", "My tasks", "Bob"])
+            await server.execute(addtask("My tasks", "Buy milk"))
+            await server.execute(["display", "My tasks"])
+            return dict(server._TaskMeAsyncServer__task_list_locks)
+
+        assert self.run(scenario) == {}
+
+    def test_import_waits_for_and_blocks_task_list_writes(self, tmp_path):
+        input_file = tmp_path / "tasks.csv"
+        input_file.write_text("task_list,name,assignee,due_date,priority,description\n"
+                              + "".join(f"My tasks,Imported {idx},Bob,01/01/2024,LOW,\n" for idx in range(50)))
+
+        async def scenario(server):
+            await server.execute(["create", "My tasks", "Bob"])
+            await server.execute(addtask("My tasks", "Before"))
+            self.file_handler.delay = 0.05
+            results = await asyncio.gather(server.execute(addtask("My tasks", "First")),
+                                           server.execute(["import", str(input_file)]),
+                                           server.execute(addtask("My tasks", "Last")))
+            return results, await server.execute(["display", "My tasks"])
+
+        results, (ok, output) = self.run(scenario)
+
+        assert all(ok for ok, _ in results)
+        tasks = self.file_handler.read("My tasks")["tasks"]
+        assert [task["id"] for task in tasks] == list(range(1, 54))
+        assert [tasks[idx]["name"] for idx in (0, 1, 2, 52)] == ["Before", "First", "Imported 0", "Last"]
+        assert ok and "Imported 49" in output and "Last" in output
+
+    def test_failed_import_leaves_no_change(self, tmp_path):
+        input_file = tmp_path / "tasks.csv"
+        input_file.write_text("task_list,name,assignee,due_date,priority,description\n"
+                              "My tasks,Imported,Bob,01/01/2024,LOW,\n"
+                              "Missing,Imported,Bob,01/01/2024,LOW,\n")
+
+        async def scenario(server):
+            await server.execute(["create", "My tasks", "Bob"])
+            await server.execute(addtask("My tasks", "Before"))
+            result = await server.execute(["import", str(input_file)])
+            return result, await server.execute(["display", "My tasks"])
+
+        (import_ok, import_output), (ok, output) = self.run(scenario)
+
+        assert not import_ok and "Failed to execute command import" in import_output
+        assert [task["name"] for task in self.file_handler.read("My tasks")["tasks"]] == ["Before"]
+        assert ok and "Imported" not in output
+
+    # -----------------------------------------------------------------------------
+    # test_serve
+    # -----------------------------------------------------------------------------
+    @pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix-domain sockets aren't available")
+    def test_client_round_trip(self):
+        async def request(argv):
+            reader, writer = await asyncio.open_unix_connection(str(self.socket_path))
+            writer.write((json.dumps({"argv": argv}) + "\n").encode("utf-8"))
+            response = json.loads(await reader.readline())
+            writer.close()
+            return response
+
+        async def scenario(server):
+            await server.start()
+            responses = await asyncio.gather(*(request(["create", f"List {idx}", "Bob"]) for idx in range(5)))
+            responses.append(await request(["display", "List 3"]))
+            return responses
+
+        responses = self.run(scenario)
+
+        assert all(response["ok"] for response in responses)
+        assert "Todo List: List 3" in responses[-1]["output"]
+        assert not self.socket_path.exists()
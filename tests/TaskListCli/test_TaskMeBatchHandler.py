@@ -0,0 +1,105 @@
+import pytest
+from unittest.mock import Mock
+
+from src.TaskList.TaskList import TaskList
+from src.TaskListCLi.TaskMeBatchHandler import TaskMeBatchHandler
+
+
+@pytest.fixture
+def mock_file_handler():
+    file_handler = Mock()
+    file_handler.read.side_effect = lambda name: (
+        {"taskListName": name, "owners": ["Owner1"], "tags": [], "tasks": []} if name == "Existing" else None)
+    return file_handler
+
+
+# -----------------------------------------------------------------------------
+# test_get_task_list
+# -----------------------------------------------------------------------------
+def test_get_task_list_loads_once(mock_file_handler):
+    batch_handler = TaskMeBatchHandler(mock_file_handler)
+
+    task_list = batch_handler.get_task_list("Existing")
+
+    assert isinstance(task_list, TaskList)
+    assert batch_handler.get_task_list("Existing") is task_list
+    mock_file_handler.read.assert_called_once_with("Existing")
+
+
+def test_get_task_list_missing(mock_file_handler):
+    batch_handler = TaskMeBatchHandler(mock_file_handler)
+
+    assert batch_handler.get_task_list("Missing") is None
+    assert batch_handler.read("Missing") is None
+
+
+# -----------------------------------------------------------------------------
+# test_flush
+# -----------------------------------------------------------------------------
+def test_flush_writes_staged_task_lists_at_once(mock_file_handler):
+    batch_handler = TaskMeBatchHandler(mock_file_handler)
+    task_list = batch_handler.get_task_list("Existing")
+    task_list.add_task(assignee="Bob", name="Task", due_date="01/01/2024", priority="LOW", description="")
+    batch_handler.stage(task_list)
+    batch_handler.stage(task_list)
+    batch_handler.write({"taskListName": "New", "owners": ["Owner2"], "tags": [], "tasks": []})
+
+    mock_file_handler.write_many.assert_not_called()
+    assert batch_handler.flush() == 2
+
+    mock_file_handler.write_many.assert_called_once()
+    written = mock_file_handler.write_many.call_args[0][0]
+    assert [task_list_dict["taskListName"] for task_list_dict in written] == ["Existing", "New"]
+    assert len(written[0]["tasks"]) == 1
+
+    # Nothing left to write
+    assert batch_handler.flush() == 0
+    mock_file_handler.write_many.assert_called_once()
+
+
+def test_flush_skips_unchanged_task_lists(mock_file_handler):
+    batch_handler = TaskMeBatchHandler(mock_file_handler)
+    task_list = batch_handler.get_task_list("Existing")
+    task_list.update_tasklist(owners=["Owner1"])
+    batch_handler.stage(task_list)
+
+    assert batch_handler.flush() == 0
+    assert batch_handler.pop_staged("Existing") is None
+    mock_file_handler.write_many.assert_not_called()
+
+
+def test_flush_without_write_many(mock_file_handler):
+    del mock_file_handler.write_many
+    batch_handler = TaskMeBatchHandler(mock_file_handler)
+    batch_handler.stage(TaskList("First", ["Owner1"], []))
+    batch_handler.stage(TaskList("Second", ["Owner1"], []))
+
+    batch_handler.flush()
+
+    assert mock_file_handler.write.call_count == 2
+
+
+def test_read_all_flushes_first(mock_file_handler):
+    batch_handler = TaskMeBatchHandler(mock_file_handler)
+    batch_handler.stage(TaskList("New", ["Owner1"], []))
+
+    batch_handler.read_all()
+
+    mock_file_handler.write_many.assert_called_once()
+    mock_file_handler.read_all.assert_called_once()
+
+
+# -----------------------------------------------------------------------------
+# test_invalidate
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize('task_list_name', ["Existing", None])
+def test_invalidate_reloads_task_list(mock_file_handler, task_list_name):
+    batch_handler = TaskMeBatchHandler(mock_file_handler)
+    task_list = batch_handler.get_task_list("Existing")
+    batch_handler.stage(task_list)
+
+    batch_handler.invalidate(task_list_name)
+
+    assert batch_handler.flush() == 0
+    assert batch_handler.get_task_list("Existing") is not task_list
+    assert mock_file_handler.read.call_count == 2
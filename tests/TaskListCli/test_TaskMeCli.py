@@ -0,0 +1,113 @@
+import json
+
+import pytest
+from unittest.mock import patch
+
+from src.System.TaskMeFileHandler.TaskMeFileHandler import TaskMeFileHandler
+from src.TaskListCLi.TaskListCli import add_task
+from src.TaskListCLi.TaskMeCli import main
+
+
+@pytest.fixture
+def file_handler(tmp_path):
+    file_handler = TaskMeFileHandler(tmp_path / "data.json")
+    with patch("src.TaskListCLi.TaskMeCli.create_file_handler_from_args", return_value=file_handler):
+        yield file_handler
+
+
+# -----------------------------------------------------------------------------
+# test_main
+# -----------------------------------------------------------------------------
+def test_main_runs_single_command(file_handler):
+    assert main(["create", "My tasks", "Bob", "--tags", "work"]) == 0
+    assert main(["addtask", "My tasks", "Bob", "Buy milk", "01/01/2024", "LOW", "Fat milk"]) == 0
+
+    task_list = file_handler.read("My tasks")
+    assert task_list["tags"] == ["work"]
+    assert [task["name"] for task in task_list["tasks"]] == ["Buy milk"]
+
+
+def test_main_with_runner_options(file_handler):
+    assert main(["--durability", "never", "create", "My tasks", "Bob"]) == 0
+    assert file_handler.read("My tasks") is not None
+
+
+def test_main_failed_command(file_handler, capsys):
+    assert main(["rmtask", "Missing", "1"]) == 1
+    assert "Failed to execute command rmtask" in capsys.readouterr().err
+
+
+def test_main_invalid_arguments(file_handler):
+    with pytest.raises(SystemExit) as exit_info:
+        main(["rmtask", "My tasks", "not-an-id"])
+    assert exit_info.value.code == 2
+
+
+def test_main_unknown_subcommand(file_handler):
+    with pytest.raises(SystemExit):
+        main(["unknown"])
+
+
+def test_main_without_subcommand(file_handler, capsys):
+    assert main([]) == 1
+    assert "Subcommands" in capsys.readouterr().out
+
+
+def test_main_only_builds_requested_parser(file_handler):
+    with patch("src.TaskListCLi.TaskMeCli.setup_parser") as mock_setup_parser:
+        mock_setup_parser.return_value.parse_args.return_value.subcommand = "display"
+        main(["display", "My tasks"])
+    mock_setup_parser.assert_called_once_with(["display"])
+
+
+# -----------------------------------------------------------------------------
+# test_main_batch
+# -----------------------------------------------------------------------------
+def test_main_batch(file_handler, tmp_path):
+    batch_file = tmp_path / "commands.txt"
+    batch_file.write_text("# Comment\ncreate 'My tasks' Bob\n\naddtask 'My tasks' Bob Task 01/01/2024 LOW ''\n")
+
+    assert main(["--batch", str(batch_file)]) == 0
+    assert len(file_handler.read("My tasks")["tasks"]) == 1
+
+
+def test_main_batch_rolls_back_failed_commands(file_handler, tmp_path):
+    batch_file = tmp_path / "commands.txt"
+    batch_file.write_text("create 'My tasks' Bob\n"
+                          "addtask 'My tasks' Bob Task 01/01/2024 LOW ''\n"
+                          "updatetask 'My tasks' 1 --name Renamed --due_date 2024/13/45\n"
+                          "addtask 'My tasks' Bob Other 02/01/2024 LOW ''\n")
+
+    assert main(["--batch", str(batch_file)]) == 1
+    assert [(task["id"], task["name"]) for task in file_handler.read("My tasks")["tasks"]] == [(1, "Task"), (2, "Other")]
+
+
+def test_main_batch_doesnt_run_succeeded_commands_again(file_handler, tmp_path):
+    batch_file = tmp_path / "commands.txt"
+    batch_file.write_text("create 'My tasks' Bob\n"
+                          "addtask 'My tasks' Bob Task 01/01/2024 LOW ''\n"
+                          "rmtask 'My tasks' 42\n"
+                          "rmtask 'My tasks' 43\n")
+
+    with patch("src.TaskListCLi.TaskListCli.add_task", wraps=add_task) as mock_add_task:
+        assert main(["--batch", str(batch_file)]) == 1
+    mock_add_task.assert_called_once()
+    assert [task["name"] for task in file_handler.read("My tasks")["tasks"]] == ["Task"]
+
+
+def test_main_batch_runs_commands_in_order(file_handler, tmp_path):
+    batch_file = tmp_path / "commands.txt"
+    batch_file.write_text(f"create 'My tasks' Bob\n"
+                          f"addtask 'My tasks' Bob First 01/01/2024 LOW ''\n"
+                          f"export {tmp_path / 'export.json'}\n"
+                          f"addtask 'My tasks' Bob Second 02/01/2024 LOW ''\n")
+
+    assert main(["--batch", str(batch_file)]) == 0
+    with open(tmp_path / "export.json") as file:
+        assert [task["name"] for task in json.load(file)["taskLists"][0]["tasks"]] == ["First"]
+    assert [task["name"] for task in file_handler.read("My tasks")["tasks"]] == ["First", "Second"]
+
+
+def test_main_batch_with_subcommand(file_handler):
+    with pytest.raises(SystemExit):
+        main(["--batch", "-", "display", "My tasks"])
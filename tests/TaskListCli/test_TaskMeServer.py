@@ -0,0 +1,90 @@
+import socket
+import threading
+
+import pytest
+from unittest.mock import patch
+
+from src.System.TaskMeFileHandler.TaskMeFileHandler import TaskMeFileHandler
+from src.TaskListCLi.TaskMeClient import send_command
+from src.TaskListCLi.TaskMeServer import TaskMeServer
+
+
+class TestTaskMeServer:
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, tmp_path):
+        self.file_handler = TaskMeFileHandler(tmp_path / "data.json")
+        self.server = TaskMeServer(self.file_handler, tmp_path / "taskme.sock")
+
+    # -----------------------------------------------------------------------------
+    # test_execute
+    # -----------------------------------------------------------------------------
+    def test_execute_writes_through(self):
+        assert self.server.execute(["create", "My tasks", "Bob"]) == (True, "")
+        assert self.server.execute(["addtask", "My tasks", "Bob", "Buy milk", "01/01/2024", "LOW", ""])[0]
+
+        assert [task["name"] for task in self.file_handler.read("My tasks")["tasks"]] == ["Buy milk"]
+
+    def test_execute_keeps_task_lists_resident(self):
+        self.server.execute(["create", "My tasks", "Bob"])
+
+        with patch.object(self.file_handler, "read", wraps=self.file_handler.read) as spy_read:
+            for idx in range(3):
+                self.server.execute(["addtask", "My tasks", "Bob", f"Task {idx}", "01/01/2024", "LOW", ""])
+            ok, output = self.server.execute(["display", "My tasks"])
+
+        spy_read.assert_not_called()
+        assert ok and "Task 2" in output
+
+    def test_execute_invalid_arguments(self):
+        ok, output = self.server.execute(["rmtask", "My tasks", "not-an-id"])
+
+        assert not ok
+        assert "invalid int value" in output
+
+    def test_execute_failed_command_reloads_task_list(self):
+        self.server.execute(["create", "My tasks", "Bob"])
+
+        ok, output = self.server.execute(["updatetask", "My tasks", "1", "--name", "Renamed"])
+
+        assert not ok
+        assert "Failed to execute command updatetask" in output
+        with patch.object(self.file_handler, "read", wraps=self.file_handler.read) as spy_read:
+            self.server.execute(["display", "My tasks"])
+        spy_read.assert_called_once_with("My tasks")
+
+    # -----------------------------------------------------------------------------
+    # test_serve_forever
+    # -----------------------------------------------------------------------------
+    @pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix-domain sockets aren't available")
+    def test_client_round_trip(self):
+        ready = threading.Event()
+        thread = threading.Thread(target=self.server.serve_forever, args=(ready,))
+        thread.start()
+        try:
+            ready.wait(5)
+            assert send_command(["create", "My tasks", "Bob"], self.server.socket_path) == (True, "")
+            ok, output = send_command(["display", "My tasks"], self.server.socket_path)
+            assert ok and "Todo List: My tasks" in output
+        finally:
+            self.server.shutdown()
+            thread.join()
+
+        assert not self.server.socket_path.exists()
+        assert self.file_handler.read("My tasks") is not None
+
+    @pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix-domain sockets aren't available")
+    def test_stale_socket_is_replaced(self):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(str(self.server.socket_path))
+        stale.close()
+
+        ready = threading.Event()
+        thread = threading.Thread(target=self.server.serve_forever, args=(ready,))
+        thread.start()
+        try:
+            assert ready.wait(5)
+            assert send_command(["create", "My tasks", "Bob"], self.server.socket_path)[0]
+        finally:
+            self.server.shutdown()
+            thread.join()
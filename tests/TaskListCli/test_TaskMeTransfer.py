@@ -0,0 +1,118 @@
+import io
+import json
+
+import pytest
+
+from src.System.TaskMeFileHandler.TaskMeFileHandler import TaskMeFileHandler
+from src.TaskListCLi import TaskMeTransfer
+from src.TaskListCLi.TaskMeTransfer import detect_format, export_to_file, iter_import_chunks
+
+
+def make_task(task_id, name):
+    return {"assignee": "Bob", "name": name, "due_date": "25/10/2023", "priority": "LOW",
+            "description": "a, \"quoted\"\nline", "progress_status": "PENDING", "id": task_id}
+
+
+@pytest.fixture
+def task_lists():
+    return [{"taskListName": "Work", "owners": ["Bob"], "tags": ["office"], "nextTaskId": 3,
+             "tasks": [make_task(1, "Write report"), make_task(2, "Review report")]},
+            {"taskListName": "Home", "owners": ["Alice"], "tags": [], "tasks": []}]
+
+
+# -----------------------------------------------------------------------------
+# test_detect_format
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize('file_path, expected', [("out.CSV", "csv"), ("out.jsonl", "jsonl"), ("out.json", "json"),
+                                                 ("out.txt", "json"), ("out", "json")])
+def test_detect_format(file_path, expected):
+    assert detect_format(file_path) == expected
+
+
+# -----------------------------------------------------------------------------
+# test_export_to_file
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize('pretty', [True, False])
+def test_export_to_file_json(task_lists, pretty):
+    output = io.StringIO()
+    assert export_to_file(iter(task_lists), output, "json", pretty) == 2
+
+    assert json.loads(output.getvalue()) == {"taskLists": task_lists}
+    assert output.getvalue() == json.dumps({"taskLists": task_lists}, indent=4 if pretty else None,
+                                           separators=None if pretty else (",", ":"))
+
+
+@pytest.mark.parametrize('data_format', ["pretty", "compact"])
+def test_export_to_file_json_matches_data_file(tmp_path, task_lists, data_format):
+    file_handler = TaskMeFileHandler(tmp_path / "taskme.json", data_format=data_format, search_index=False)
+    file_handler.write_many(task_lists)
+
+    output = io.StringIO()
+    export_to_file(file_handler.iter_task_lists(), output, "json", pretty=data_format == "pretty")
+    assert output.getvalue() == (tmp_path / "taskme.json").read_text()
+
+
+def test_export_to_file_in_chunks(monkeypatch, task_lists):
+    monkeypatch.setattr(TaskMeTransfer, "TRANSFER_CHUNK_SIZE", 10)
+    writes = []
+    output = io.StringIO()
+    output.write = writes.append
+
+    export_to_file(iter(task_lists), output, "csv")
+    assert len(writes) > 1
+    assert all(writes)
+    assert "".join(writes).count("Work,") == 2
+
+
+def test_export_to_file_invalid_format(task_lists):
+    with pytest.raises(ValueError, match="Invalid transfer format."):
+        export_to_file(iter(task_lists), io.StringIO(), "xml")
+
+
+# -----------------------------------------------------------------------------
+# test_iter_import_chunks
+# -----------------------------------------------------------------------------
+def test_jsonl_round_trip(task_lists):
+    output = io.StringIO()
+    export_to_file(iter(task_lists), output, "jsonl")
+    output.seek(0)
+
+    chunks = list(iter_import_chunks(output, "jsonl"))
+    assert [(name, header is not None, tasks) for name, header, tasks in chunks] == [
+        ("Work", True, []),
+        ("Work", False, task_lists[0]["tasks"]),
+        ("Home", True, [])
+    ]
+    assert chunks[0][1] == {"taskListName": "Work", "owners": ["Bob"], "tags": ["office"], "nextTaskId": 3}
+
+
+def test_csv_round_trip(task_lists):
+    output = io.StringIO(newline="")
+    export_to_file(iter(task_lists), output, "csv")
+    output.seek(0)
+
+    chunks = list(iter_import_chunks(output, "csv", chunk_size=1))
+    expected_tasks = [{key: str(value) for key, value in task.items()} for task in task_lists[0]["tasks"]]
+    assert chunks == [("Work", None, [expected_tasks[0]]), ("Work", None, [expected_tasks[1]])]
+
+
+def test_iter_import_chunks_into_task_list(task_lists):
+    output = io.StringIO()
+    export_to_file(iter(task_lists), output, "jsonl")
+    output.seek(0)
+
+    assert [(name, header, len(tasks)) for name, header, tasks in iter_import_chunks(output, "jsonl", "Other")] == [
+        ("Other", None, 2)
+    ]
+
+
+def test_iter_import_chunks_without_task_list():
+    input_file = io.StringIO('{"name": "Task", "task_list": "Work"}\n{"name": "Task", "task_list": ""}\n')
+
+    with pytest.raises(ValueError, match="Record #2 doesn't name its task list"):
+        list(iter_import_chunks(input_file, "jsonl"))
+
+
+def test_iter_import_chunks_invalid_format():
+    with pytest.raises(ValueError, match="Invalid import format."):
+        list(iter_import_chunks(io.StringIO(), "json"))